@@ -4,6 +4,7 @@
 
 use Illuminate\Http\Request;
 use Illuminate\Support\Facades\Storage;
+use Illuminate\Support\Facades\Http;
 use Illuminate\Support\Facades\Log;
 use Symfony\Component\Process\Process;
 
@@ -27,7 +28,71 @@ public function start(Request $request)
             'email' => $validated['email'],
             'app_password' => $validated['appPassword'],
             'products' => $validated['products'],
-            'check_interval' => (int) env('FIYAT_TAKIP_CHECK_INTERVAL', 600) // 10 dakika varsayılan
+            'check_interval' => (int) env('FIYAT_TAKIP_CHECK_INTERVAL', 600), // 10 dakika varsayılan
+            'workers' => (int) env('FIYAT_TAKIP_WORKERS', 1), // Paralel Chrome işçi sayısı
+            'wait_caps' => [ // Mağaza başına azami fiyat bekleme süresi (saniye)
+                'zara' => (int) env('FIYAT_TAKIP_WAIT_CAP_ZARA', 20),
+                'pull&bear' => (int) env('FIYAT_TAKIP_WAIT_CAP_PULL_AND_BEAR', 20)
+            ],
+            'http_first' => (bool) env('FIYAT_TAKIP_HTTP_FIRST', true), // Önce tarayıcısız HTTP ile dene
+            'jitter' => (float) env('FIYAT_TAKIP_JITTER', 0.1), // Kontrol aralığına eklenen rastgele sapma oranı
+            'history_db' => storage_path('app/fiyat_takip_history.sqlite'), // Kalıcı fiyat geçmişi
+            'stats_window' => (int) env('FIYAT_TAKIP_STATS_WINDOW_DAYS', 90), // Bildirimlerdeki geçmiş fiyat bağlamı (gün)
+            'smtp' => [ // Bildirim emailleri için SMTP ayarları
+                'host' => env('FIYAT_TAKIP_SMTP_HOST', 'smtp.gmail.com'),
+                'port' => (int) env('FIYAT_TAKIP_SMTP_PORT', 465),
+                'ssl' => (bool) env('FIYAT_TAKIP_SMTP_SSL', true),
+                'digest' => (bool) env('FIYAT_TAKIP_EMAIL_DIGEST', false), // Uyarıları tek emailde topla
+                'digest_window' => (int) env('FIYAT_TAKIP_EMAIL_DIGEST_WINDOW', 60)
+            ],
+            'resource_blocking' => [ // Görsel, font ve izleme betiklerini yükleme
+                'enabled' => (bool) env('FIYAT_TAKIP_BLOCK_RESOURCES', true)
+            ],
+            'driver' => [ // Chrome driver yaşam döngüsü
+                'driver_path' => env('FIYAT_TAKIP_CHROMEDRIVER_PATH'),
+                'browser_path' => env('FIYAT_TAKIP_CHROME_PATH'),
+                'cache_file' => storage_path('app/fiyat_takip_driver.json'),
+                'max_page_loads' => (int) env('FIYAT_TAKIP_DRIVER_MAX_PAGE_LOADS', 200),
+                'max_rss_mb' => (int) env('FIYAT_TAKIP_DRIVER_MAX_RSS_MB', 1500),
+                'rss_interval' => (int) env('FIYAT_TAKIP_DRIVER_RSS_INTERVAL', 30) // Bellek ölçümleri arası en kısa süre (sn)
+            ],
+            'control' => [ // Çalışan takipçiyi yeniden başlatmadan güncellemek için yerel kanal
+                'enabled' => (bool) env('FIYAT_TAKIP_CONTROL_ENABLED', true),
+                'port' => (int) env('FIYAT_TAKIP_CONTROL_PORT', 8765),
+                'token' => $this->controlToken()
+            ],
+            'status_file' => storage_path('app/fiyat_takip_status.json'), // Makine tarafından okunabilir durum
+            'adaptive' => [ // Kontrol aralığını fiyat oynaklığına göre ayarla
+                'enabled' => (bool) env('FIYAT_TAKIP_ADAPTIVE_ENABLED', false),
+                'min_interval' => env('FIYAT_TAKIP_ADAPTIVE_MIN_INTERVAL') ? (int) env('FIYAT_TAKIP_ADAPTIVE_MIN_INTERVAL') : null,
+                'max_interval' => env('FIYAT_TAKIP_ADAPTIVE_MAX_INTERVAL') ? (int) env('FIYAT_TAKIP_ADAPTIVE_MAX_INTERVAL') : null,
+                'budget_per_hour' => env('FIYAT_TAKIP_PAGE_LOADS_PER_HOUR') ? (int) env('FIYAT_TAKIP_PAGE_LOADS_PER_HOUR') : null // Saatlik sayfa yükü bütçesi
+            ],
+            'queue' => [ // Kontrolleri kira kuyruğu üzerinden birden çok işçi sürecine dağıt
+                'enabled' => (bool) env('FIYAT_TAKIP_QUEUE_ENABLED', false),
+                'db' => env('FIYAT_TAKIP_QUEUE_DB') ?: storage_path('app/fiyat_takip_queue.sqlite'),
+                'local_workers' => (int) env('FIYAT_TAKIP_QUEUE_LOCAL_WORKERS', 1), // Bu makinede başlatılacak işçi süreci
+                'lease_seconds' => (int) env('FIYAT_TAKIP_QUEUE_LEASE_SECONDS', 120),
+                'max_attempts' => (int) env('FIYAT_TAKIP_QUEUE_MAX_ATTEMPTS', 3)
+            ],
+            'store_limits' => [ // Mağaza başına hız sınırı ve devre kesici
+                'default' => [
+                    'rate_per_minute' => env('FIYAT_TAKIP_STORE_RATE_PER_MINUTE') ? (int) env('FIYAT_TAKIP_STORE_RATE_PER_MINUTE') : null,
+                    'failure_threshold' => (int) env('FIYAT_TAKIP_STORE_FAILURE_THRESHOLD', 5), // Devreyi açan art arda hata sayısı
+                    'cooldown' => (int) env('FIYAT_TAKIP_STORE_COOLDOWN', 300) // Açık devrenin ilk bekleme süresi (sn)
+                ]
+            ],
+            'listings' => [ // Kategori/arama sayfalarından toplu fiyat okuma
+                'pages' => array_values(array_filter(array_map('trim', explode(',', env('FIYAT_TAKIP_LISTING_URLS', ''))))),
+                'grace' => (int) env('FIYAT_TAKIP_LISTING_GRACE', 120) // İlk liste taraması için ürün kontrollerini geciktir (sn)
+            ],
+            'snapshots' => [ // Seçicileri çevrimdışı doğrulamak için sayfa görüntüleri (--reextract)
+                'enabled' => (bool) env('FIYAT_TAKIP_SNAPSHOTS_ENABLED', false),
+                'dir' => storage_path('app/fiyat_takip_snapshots'),
+                'max_mb' => (int) env('FIYAT_TAKIP_SNAPSHOTS_MAX_MB', 500), // Disk sınırı; aşılınca en eskiler silinir
+                'failures_only' => (bool) env('FIYAT_TAKIP_SNAPSHOTS_FAILURES_ONLY', false)
+            ],
+            'stores' => $this->storeDefinitions() // Kod yazmadan mağaza eklemek ya da fiyat kurallarını değiştirmek için
         ];
         
         // Tam yollar oluştur - burada absolute path kullanacağız
@@ -108,6 +173,21 @@ public function start(Request $request)
             if (file_exists($pidPath)) {
                 $pid = trim(file_get_contents($pidPath));
                 if ($this->isProcessRunning($pid)) {
+                    // Ürün listesini çalışan takipçiye uygula; Chrome yeniden başlatılmaz
+                    $result = $this->sendControlCommand('PUT', '/products', [
+                        'products' => $validated['products']
+                    ]);
+
+                    if ($result !== null) {
+                        Log::info('Ürün listesi çalışan fiyat takibine uygulandı', ['result' => $result]);
+                        return response()->json([
+                            'status' => 'success',
+                            'message' => 'Ürün listesi çalışan fiyat takibine uygulandı',
+                            'pid' => $pid,
+                            'result' => $result
+                        ]);
+                    }
+
                     return response()->json([
                         'status' => 'warning',
                         'message' => 'Fiyat takibi zaten çalışıyor',
@@ -121,11 +201,14 @@ public function start(Request $request)
 
             // Arka planda çalıştırma komutu oluştur
             $cmd = sprintf(
-                'nohup python3 %s --config=%s --log=%s --base-dir=%s > /dev/null 2>&1 & echo $!',
+                'nohup python3 %s --config=%s --log=%s --base-dir=%s --log-format=%s --log-max-bytes=%d --log-level=%s > /dev/null 2>&1 & echo $!',
                 escapeshellarg($absolutePythonPath),
                 escapeshellarg($absoluteConfigPath),
                 escapeshellarg($absoluteLogPath),
-                escapeshellarg($absoluteBasePath)
+                escapeshellarg($absoluteBasePath),
+                escapeshellarg(env('FIYAT_TAKIP_LOG_FORMAT', 'json')),
+                (int) env('FIYAT_TAKIP_LOG_MAX_BYTES', 10485760),
+                escapeshellarg('price_tracker.browser=' . env('FIYAT_TAKIP_BROWSER_LOG_LEVEL', 'WARNING'))
             );
             
             Log::info('Arka planda çalıştırma komutu:', ['cmd' => $cmd]);
@@ -164,6 +247,138 @@ public function start(Request $request)
         }
     }
 
+    /**
+     * Çalışan takipçiye kontrol komutu gönderir (duraklat, devam et, hemen kontrol et)
+     */
+    public function control(Request $request, string $action)
+    {
+        $routes = [
+            'pause' => ['POST', '/pause'],
+            'resume' => ['POST', '/resume'],
+            'check' => ['POST', '/check'],
+        ];
+
+        if (!isset($routes[$action])) {
+            return response()->json([
+                'status' => 'error',
+                'message' => 'Bilinmeyen komut'
+            ], 404);
+        }
+
+        [$method, $path] = $routes[$action];
+        $result = $this->sendControlCommand($method, $path, $request->only(['url', 'store']));
+
+        if ($result === null) {
+            return response()->json([
+                'status' => 'error',
+                'message' => 'Fiyat takibine ulaşılamadı'
+            ], 503);
+        }
+
+        return response()->json($result);
+    }
+
+    /**
+     * Fiyat geçmişinden ürün başına istatistikleri döndürür (en düşük, ortalama, yüzdelikler, indirim)
+     *
+     * Takipçinin çalışıyor olması gerekmez; hesaplama price-tracker.py --analytics ile yapılır.
+     */
+    public function analytics(Request $request)
+    {
+        $command = [
+            'python3',
+            base_path('python/price-tracker.py'),
+            '--analytics',
+            '--history-db=' . storage_path('app/fiyat_takip_history.sqlite'),
+            '--days=' . max(1, (int) $request->query('days', env('FIYAT_TAKIP_STATS_WINDOW_DAYS', 90))),
+        ];
+        if ($request->filled('url')) {
+            $command[] = '--url=' . $request->query('url');
+        }
+
+        $process = new Process($command);
+        $process->setTimeout(60);
+        $process->run();
+
+        $result = json_decode($process->getOutput(), true);
+        if (!$process->isSuccessful() || $result === null) {
+            Log::error('Fiyat istatistikleri hesaplanamadı', [
+                'exit_code' => $process->getExitCode(),
+                'error' => $process->getErrorOutput()
+            ]);
+
+            return response()->json([
+                'status' => 'error',
+                'message' => 'Fiyat istatistikleri hesaplanamadı'
+            ], 500);
+        }
+
+        return response()->json([
+            'status' => 'success',
+            'analytics' => $result
+        ]);
+    }
+
+    /**
+     * Takipçinin yerel kontrol kanalına istek gönderir, başarısızsa null döner
+     */
+    private function sendControlCommand(string $method, string $path, array $payload = [])
+    {
+        if (!env('FIYAT_TAKIP_CONTROL_ENABLED', true)) {
+            return null;
+        }
+
+        $url = 'http://127.0.0.1:' . (int) env('FIYAT_TAKIP_CONTROL_PORT', 8765) . $path;
+
+        try {
+            $response = Http::timeout(20)
+                ->withHeaders(['X-Control-Token' => $this->controlToken()])
+                // Boş dizi JSON'da [] olur; takipçi her zaman bir nesne bekler
+                ->send($method, $url, ['json' => $payload ?: new \stdClass()]);
+
+            if ($response->successful()) {
+                return $response->json();
+            }
+
+            Log::warning('Kontrol komutu başarısız', [
+                'path' => $path,
+                'status' => $response->status(),
+                'body' => $response->body()
+            ]);
+        } catch (\Exception $e) {
+            Log::warning('Kontrol kanalına bağlanılamadı: ' . $e->getMessage(), ['path' => $path]);
+        }
+
+        return null;
+    }
+
+    /**
+     * Kontrol kanalı için uygulama anahtarından türetilen erişim anahtarı
+     */
+    private function controlToken()
+    {
+        return hash_hmac('sha256', 'fiyat-takip-control', (string) config('app.key'));
+    }
+
+    /**
+     * Mağaza tanımları dosyasındaki (FIYAT_TAKIP_STORES_FILE) fiyat kuralları
+     */
+    private function storeDefinitions()
+    {
+        $path = env('FIYAT_TAKIP_STORES_FILE') ?: storage_path('app/fiyat_takip_stores.json');
+        if (!is_file($path)) {
+            return new \stdClass();
+        }
+
+        $stores = json_decode(file_get_contents($path));
+        if (!is_object($stores)) {
+            Log::warning('Mağaza tanımları okunamadı', ['path' => $path]);
+            return new \stdClass();
+        }
+
+        return $stores;
+    }
+
     /**
      * Process'in çalışıp çalışmadığını kontrol eder
      */
@@ -241,6 +456,7 @@ public function getStatus()
     {
         $pidFile = storage_path('app/fiyat_takip_pid.txt');
         $logFile = storage_path('logs/price-tracker.log');
+        $statusFile = storage_path('app/fiyat_takip_status.json');
         
         $pid = null;
         $isRunning = false;
@@ -255,17 +471,94 @@ public function getStatus()
             }
         }
         
-        $lastLogLines = [];
-        if (file_exists($logFile)) {
-            $logContent = file_get_contents($logFile);
-            $logLines = explode("\n", $logContent);
-            $lastLogLines = array_slice($logLines, -20); // Son 20 satır
+        // Takipçinin atomik olarak yazdığı durum dosyası; boyutu ürün sayısıyla sınırlı
+        $status = null;
+        if (file_exists($statusFile)) {
+            $status = json_decode(file_get_contents($statusFile), true);
         }
         
         return response()->json([
             'isRunning' => $isRunning,
             'pid' => $pid,
-            'lastLogs' => $lastLogLines
+            'status' => $status,
+            'lastLogs' => $this->tailRecords($logFile, 20) // Son 20 kayıt
         ]);
     }
+
+    /**
+     * Takipçinin kuyruk indeksiyle son kayıtları sabit sürede okur
+     *
+     * İndeks dosyası (<log>.idx): 16 baytlık başlık (toplam kayıt, kapasite)
+     * ve ardından son kayıtların log dosyasındaki başlangıç ofsetleri.
+     */
+    private function tailRecords($logFile, $count)
+    {
+        $indexFile = $logFile . '.idx';
+        if (!file_exists($indexFile) || !file_exists($logFile)) {
+            return $this->tailLines($logFile, $count);
+        }
+
+        $index = fopen($indexFile, 'rb');
+        $header = unpack('Ptotal/Pcapacity', fread($index, 16));
+        $wanted = min($count, $header['total'], $header['capacity']);
+        if ($wanted <= 0) {
+            fclose($index);
+            return [];
+        }
+
+        $slot = ($header['total'] - $wanted) % $header['capacity'];
+        fseek($index, 16 + $slot * 8);
+        $offset = unpack('P', fread($index, 8))[1];
+        fclose($index);
+
+        $content = file_get_contents($logFile, false, null, $offset);
+        if ($content === false) {
+            return [];
+        }
+
+        // JSON kayıtları arayüzün beklediği düz metin satırlarına çevrilir
+        $lines = [];
+        foreach (explode("\n", $content) as $line) {
+            if (trim($line) === '') {
+                continue;
+            }
+            $record = json_decode($line, true);
+            $lines[] = is_array($record)
+                ? sprintf('%s - %s - %s', $record['ts'] ?? '', $record['level'] ?? '', trim($record['msg'] ?? ''))
+                : $line;
+        }
+
+        return array_slice($lines, -$count);
+    }
+
+    /**
+     * Dosyanın tamamını okumadan sondaki satırları döndürür
+     */
+    private function tailLines($path, $count, $chunkSize = 8192)
+    {
+        if (!file_exists($path)) {
+            return [];
+        }
+
+        $handle = fopen($path, 'rb');
+        if (!$handle) {
+            return [];
+        }
+
+        fseek($handle, 0, SEEK_END);
+        $position = ftell($handle);
+        $buffer = '';
+
+        // Yeterli satır toplanana kadar dosyanın sonundan geriye doğru oku
+        while ($position > 0 && substr_count($buffer, "\n") <= $count) {
+            $read = min($chunkSize, $position);
+            $position -= $read;
+            fseek($handle, $position);
+            $buffer = fread($handle, $read) . $buffer;
+        }
+
+        fclose($handle);
+
+        return array_slice(explode("\n", $buffer), -$count);
+    }
 }
\ No newline at end of file
@@ -0,0 +1,396 @@
+"""Fiyat takipçisinin kontrol hattını canlı mağazalara gitmeden ölçer
+
+Takipçi gerçek haliyle (price-tracker.py) ayrı süreçte çalıştırılır; ürün
+sayfaları yerel fixture sunucusundan, e-postalar sahte SMTP alıcısına gider.
+Her ürün sayısı için üç tur ölçülür:
+
+  cold  - süreç başlangıcından ilk turun bitişine kadar
+  warm  - fiyatlar değişmeden tekrar kontrol
+  drop  - sayfaların bir kısmında fiyat düşmüşken kontrol (bildirimler)
+
+Örnek:
+  python benchmarks/run.py --sizes 10,100,1000 --latency 0.05 --output bench.json
+  python benchmarks/run.py --compare bench.json
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import re
+import secrets
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PYTHON_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PYTHON_DIR)
+
+from fiyat_takip.drivers import process_tree_rss  # noqa: E402
+from servers import FixtureServer, SmtpSink  # noqa: E402
+
+# Sonuç dosyası biçimi değişirse artırılır; karşılaştırma aynı biçimi bekler
+FORMAT_VERSION = 1
+TRACKER = os.path.join(PYTHON_DIR, "price-tracker.py")
+CHECKS_PATTERN = re.compile(r"^fiyat_takip_checks_total\{([^}]*)\} (\S+)$", re.M)
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def round_or_none(value, digits=4):
+    return None if value is None else round(value, digits)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_version():
+    try:
+        return subprocess.run(
+            ["git", "-C", PYTHON_DIR, "describe", "--always", "--dirty"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class TrackerProcess:
+    """Kontrol kanalı üzerinden yönetilen takipçi süreci"""
+
+    def __init__(self, config, workdir):
+        self.port = config["control"]["port"]
+        self.token = config["control"]["token"]
+        self.status_file = config["status_file"]
+        self.peak_rss = 0
+        self.last_sample = 0.0
+        config_path = os.path.join(workdir, "config.json")
+        with open(config_path, "w") as f:
+            json.dump(config, f)
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                TRACKER,
+                "--config",
+                config_path,
+                "--log",
+                os.path.join(workdir, "tracker.log"),
+                "--log-format",
+                "json",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def request(self, method, path, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{self.port}{path}",
+            data=data,
+            method=method,
+            headers={"X-Control-Token": self.token, "Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.read().decode("utf-8")
+
+    def sample_rss(self):
+        # /proc taraması ucuz değil; ölçümü etkilememesi için seyrek örneklenir
+        if time.monotonic() - self.last_sample < 0.25:
+            return
+        self.last_sample = time.monotonic()
+        rss = process_tree_rss(self.process.pid)
+        if rss:
+            self.peak_rss = max(self.peak_rss, rss)
+
+    def checks(self):
+        """Tamamlanan (toplam, başarısız) kontrol sayısı; kanal hazır değilse None"""
+        try:
+            text = self.request("GET", "/metrics")
+        except (urllib.error.URLError, OSError):
+            return None
+        total = failures = 0
+        for labels, value in CHECKS_PATTERN.findall(text):
+            total += int(float(value))
+            if 'result="failure"' in labels:
+                failures += int(float(value))
+        return total, failures
+
+    def wait_checks(self, target, timeout):
+        """Toplam kontrol sayısı target'a ulaşana kadar bekler"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(
+                    f"Takipçi süreci beklenmedik şekilde kapandı ({self.process.returncode})"
+                )
+            self.sample_rss()
+            counts = self.checks()
+            if counts is not None and counts[0] >= target:
+                return counts
+            time.sleep(0.05)
+        raise TimeoutError(f"{timeout} sn içinde {target} kontrol tamamlanmadı")
+
+    def durations(self, after, timeout=30):
+        """Tur bittikten sonra yazılan durum dosyasından sayfa başına kontrol süreleri"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self.sample_rss()
+            try:
+                with open(self.status_file) as f:
+                    status = json.load(f)
+            except (OSError, ValueError):
+                status = None
+            if status and datetime.fromisoformat(status["generated_at"]) >= after:
+                pages = {}
+                for product in status["products"]:
+                    if product.get("last_duration") is not None:
+                        key = (product["store"], product["url"])
+                        pages[key] = product["last_duration"]
+                return list(pages.values())
+            time.sleep(0.2)
+        return []
+
+    def stop(self):
+        if self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+            try:
+                self.process.wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+def build_catalog(fixtures, products, watchers):
+    """Ürün listesini ve sayfa başına taban fiyatları üretir
+
+    Her sayfayı `watchers` ürün takip eder; çift numaralı takipçilerin hedefi
+    %20'lik bir düşüşle aşılır, diğerleri yalnızca fiyat düşüşü bildirimi alır.
+    """
+    pages = math.ceil(products / watchers)
+    stores = ["zara", "pull&bear"]
+    catalog = []
+    for page in range(pages):
+        store = stores[page % len(stores)]
+        name = f"p{page}"
+        base = 100 + (page % 50) * 10 + 0.95
+        fixtures.set_price(store, name, base)
+        catalog.append({"store": store, "name": name, "base": base})
+
+    entries = []
+    for index in range(products):
+        page = catalog[index % pages]
+        watcher = index // pages
+        ratio = 0.85 if (index + watcher) % 2 == 0 else 0.5
+        entries.append(
+            {
+                "url": fixtures.url_for(page["store"], page["name"]),
+                "store": page["store"],
+                "target_price": round(page["base"] * ratio, 2),
+            }
+        )
+    return catalog, entries
+
+
+def measure_pass(tracker, sink, started, target, timeout):
+    notifications = sink.count
+    total, failures = tracker.wait_checks(target, timeout)
+    duration = time.monotonic() - started
+    finished = datetime.now()
+    durations = tracker.durations(finished)
+    return {
+        "duration_s": round(duration, 3),
+        "checks": total,
+        "failures": failures,
+        "latency_p50_s": round_or_none(percentile(durations, 0.5)),
+        "latency_p95_s": round_or_none(percentile(durations, 0.95)),
+        "notifications": sink.wait_idle() - notifications,
+    }
+
+
+def run_size(products, args, fixtures, sink):
+    catalog, entries = build_catalog(fixtures, products, args.watchers)
+    pages = len(catalog)
+    host, port = sink.address
+    with tempfile.TemporaryDirectory(prefix="fiyat-takip-bench-") as workdir:
+        config = {
+            "email": "bench@localhost",
+            "app_password": "",
+            "products": entries,
+            "check_interval": 86400,
+            "workers": args.workers,
+            "http_first": not args.browser,
+            "jitter": 0,
+            "history_db": os.path.join(workdir, "history.sqlite"),
+            "smtp": {"host": host, "port": port, "ssl": False, "digest": False},
+            "control": {
+                "enabled": True,
+                "port": free_port(),
+                "token": secrets.token_hex(16),
+            },
+            "status_file": os.path.join(workdir, "status.json"),
+        }
+        requests_before = fixtures.requests
+        started = time.monotonic()
+        tracker = TrackerProcess(config, workdir)
+        try:
+            passes = {}
+            passes["cold"] = measure_pass(tracker, sink, started, pages, args.timeout)
+            base_checks = passes["cold"]["checks"]
+
+            # Komut kontrol döngüsünde uygulanınca yanıt döner; tur o an başlar
+            tracker.request("POST", "/check", {})
+            started = time.monotonic()
+            passes["warm"] = measure_pass(
+                tracker, sink, started, base_checks + pages, args.timeout
+            )
+
+            # Her drop_every sayfadan birinde fiyat %20 düşer
+            for index, page in enumerate(catalog):
+                if index % args.drop_every == 0:
+                    fixtures.set_price(
+                        page["store"],
+                        page["name"],
+                        round(page["base"] * 0.8, 2),
+                        old=page["base"],
+                    )
+            # Komut kontrol döngüsünde uygulanınca yanıt döner; tur o an başlar
+            tracker.request("POST", "/check", {})
+            started = time.monotonic()
+            passes["drop"] = measure_pass(
+                tracker, sink, started, base_checks + 2 * pages, args.timeout
+            )
+        finally:
+            tracker.stop()
+
+    for result in passes.values():
+        result["throughput"] = round(pages / result["duration_s"], 2)
+    return {
+        "products": products,
+        "pages": pages,
+        "passes": passes,
+        "peak_rss_mb": round(tracker.peak_rss / (1024 * 1024), 1),
+        "page_requests": fixtures.requests - requests_before,
+    }
+
+
+def compare(previous, current, stream=sys.stderr):
+    """İki sonuç dosyasını ürün sayısı ve tur bazında karşılaştırır"""
+    if previous.get("format") != current.get("format"):
+        print("Sonuç biçimleri farklı, karşılaştırılamıyor", file=stream)
+        return
+    before = {result["products"]: result for result in previous["results"]}
+    print(f"{previous['label']} -> {current['label']}", file=stream)
+    for result in current["results"]:
+        old = before.get(result["products"])
+        if old is None:
+            continue
+        for name, values in result["passes"].items():
+            old_values = old["passes"].get(name, {})
+            changes = []
+            for metric in ("duration_s", "latency_p95_s"):
+                a, b = old_values.get(metric), values.get(metric)
+                if a and b is not None:
+                    changes.append(f"{metric} {a} -> {b} ({(b - a) / a * 100:+.1f}%)")
+            print(
+                f"  {result['products']:>5} ürün {name:<5} " + ", ".join(changes),
+                file=stream,
+            )
+        a, b = old.get("peak_rss_mb"), result.get("peak_rss_mb")
+        if a and b is not None:
+            print(
+                f"  {result['products']:>5} ürün RSS  {a} -> {b} MB ({(b - a) / a * 100:+.1f}%)",
+                file=stream,
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fiyat takipçisi benchmark'ı")
+    parser.add_argument(
+        "--sizes", default="10,100,1000", help="Virgülle ayrılmış ürün sayıları"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Sayfa yanıt gecikmesi (saniye)"
+    )
+    parser.add_argument(
+        "--latency-jitter",
+        type=float,
+        default=0.0,
+        help="Gecikmeye eklenen 0..N saniye rastgele sapma",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Takipçi işçi sayısı")
+    parser.add_argument(
+        "--watchers", type=int, default=1, help="Sayfa başına takipçi ürün sayısı"
+    )
+    parser.add_argument(
+        "--drop-every", type=int, default=5, help="Her N sayfadan birinde fiyat düşer"
+    )
+    parser.add_argument(
+        "--browser",
+        action="store_true",
+        help="Hızlı yolu kapatıp her sayfayı Chrome ile yükle",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=900, help="Tur başına en uzun bekleme"
+    )
+    parser.add_argument("--label", help="Sonuç etiketi (varsayılan: git sürümü)")
+    parser.add_argument("--output", help="JSON sonucunun yazılacağı dosya")
+    parser.add_argument("--compare", help="Karşılaştırılacak önceki sonuç dosyası")
+    args = parser.parse_args()
+
+    fixtures = FixtureServer(args.latency, args.latency_jitter).start()
+    sink = SmtpSink().start()
+    try:
+        results = []
+        for size in (int(value) for value in args.sizes.split(",") if value.strip()):
+            print(f"{size} ürün ölçülüyor...", file=sys.stderr)
+            results.append(run_size(size, args, fixtures, sink))
+    finally:
+        fixtures.shutdown()
+        sink.shutdown()
+
+    report = {
+        "format": FORMAT_VERSION,
+        "label": args.label or git_version(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "latency_s": args.latency,
+            "latency_jitter_s": args.latency_jitter,
+            "workers": args.workers,
+            "watchers_per_page": args.watchers,
+            "drop_every": args.drop_every,
+            "mode": "browser" if args.browser else "http",
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
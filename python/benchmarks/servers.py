@@ -0,0 +1,234 @@
+"""Benchmark için yerel mağaza sayfası sunucusu ve sahte SMTP alıcısı"""
+
+import os
+import random
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Mağaza -> (URL yolu öneki, fixture dosyası)
+STORES = {
+    "zara": ("zara", "zara.html"),
+    "pull&bear": ("pullandbear", "pull_and_bear.html"),
+}
+
+ZARA_OLD_BLOCK = (
+    '<span class="price-old" data-qa-qualifier="price-amount-old">'
+    '<span class="money-amount"><span class="money-amount__main">$old TL</span></span>'
+    "</span>"
+)
+
+
+def format_price(value):
+    """1299.95 -> '1.299,95' (mağazaların gösterdiği biçim)"""
+    text = f"{value:,.2f}"
+    return text.replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    # Mağazalar gibi bağlantıyı açık tutar; hızlı yol havuzu yeniden kullanır
+    protocol_version = "HTTP/1.1"
+    # Başlık ve gövde ayrı yazılıyor; Nagle gecikmesi ölçüme eklenmesin
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server.fixtures
+        if server.latency or server.latency_jitter:
+            time.sleep(server.latency + random.uniform(0, server.latency_jitter))
+        location = server.redirect_for(self.path)
+        if location is not None:
+            status, target = location
+            self.send_response(status)
+            self.send_header("Location", target)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = server.render(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    # Varsayılan 5'lik bekleme kuyruğu taşınca bağlantılar 1 sn gecikir
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class FixtureServer:
+    """Kayıtlı Zara/Pull&Bear sayfalarını ürün başına fiyatla sunar
+
+    Her istek latency (+0..latency_jitter) saniye geciktirilir. Fiyatlar
+    set_price ile değiştirilebilir; eski fiyatı olan Zara ürünleri indirimli
+    görünür. set_page şablon dışı sayfa (ör. yalnızca JSON-LD), set_redirect
+    yönlendirme ekler.
+    """
+
+    def __init__(self, latency=0.0, latency_jitter=0.0, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.templates = {}
+        for store, (prefix, filename) in STORES.items():
+            with open(os.path.join(FIXTURE_DIR, filename), encoding="utf-8") as f:
+                self.templates[prefix] = Template(f.read())
+        self.prices = {}
+        self.pages = {}
+        self.redirects = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.httpd = _Server((host, port), _PageHandler)
+        self.httpd.fixtures = self
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, store, name):
+        return f"{self.base_url}/{STORES[store][0]}/{name}.html"
+
+    def set_price(self, store, name, current, old=None):
+        with self.lock:
+            self.prices[(STORES[store][0], name)] = (current, old)
+
+    def set_page(self, path, body):
+        """path'te (ör. "/ld/urun.html") body'yi olduğu gibi sunar"""
+        with self.lock:
+            self.pages[path] = body
+
+    def set_redirect(self, path, target, status=302):
+        """path'e gelen isteği target'a (yol ya da tam adres) yönlendirir"""
+        with self.lock:
+            self.redirects[path] = (status, target)
+
+    def redirect_for(self, path):
+        with self.lock:
+            return self.redirects.get(path.split("?", 1)[0])
+
+    def render(self, path):
+        with self.lock:
+            page = self.pages.get(path.split("?", 1)[0])
+            if page is not None:
+                self.requests += 1
+                return page
+        parts = path.split("?", 1)[0].strip("/").split("/")
+        if len(parts) != 2 or not parts[1].endswith(".html"):
+            return None
+        prefix, name = parts[0], parts[1][: -len(".html")]
+        with self.lock:
+            self.requests += 1
+            price = self.prices.get((prefix, name))
+        if price is None or prefix not in self.templates:
+            return None
+        current, old = price
+        old_block = ""
+        if old is not None and prefix == STORES["zara"][0]:
+            old_block = Template(ZARA_OLD_BLOCK).substitute(old=format_price(old))
+        return self.templates[prefix].substitute(
+            name=name, current=format_price(current), old_block=old_block
+        )
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    """Gönderimi kabul edip mesajı sayan en küçük SMTP diyaloğu"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        sink = self.server.sink
+        self.reply("220 localhost fiyat-takip benchmark SMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line.decode("utf-8", "replace").strip().split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250 8BITMIME")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b".\r\n", b".\n"):
+                        break
+                sink.received()
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                # HELO, MAIL, RCPT, RSET, NOOP
+                self.reply("250 OK")
+
+
+class _SmtpServer(socketserver.ThreadingTCPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class SmtpSink:
+    """Gelen e-postaları yalnızca sayan yerel SMTP sunucusu (SSL ve giriş yok)"""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.count = 0
+        self.last_received = None
+        self.lock = threading.Lock()
+        self.server = _SmtpServer((host, port), _SmtpHandler)
+        self.server.sink = self
+        self.thread = None
+
+    @property
+    def address(self):
+        return self.server.server_address[:2]
+
+    def received(self):
+        with self.lock:
+            self.count += 1
+            self.last_received = time.monotonic()
+
+    def wait_idle(self, quiet=1.5, timeout=30):
+        """Son quiet saniyede yeni e-posta gelmeyene kadar bekler"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.lock:
+                last = self.last_received
+            if last is None or time.monotonic() - last >= quiet:
+                time.sleep(quiet if last is None else 0)
+                with self.lock:
+                    if self.last_received == last:
+                        return self.count
+            time.sleep(0.1)
+        return self.count
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1 @@
+"""Fiyat takip uygulamasının yardımcı modülleri"""
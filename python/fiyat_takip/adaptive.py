@@ -0,0 +1,159 @@
+"""Fiyat oynaklığına göre sayfa başına kontrol aralığını ayarlayan politika"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger("price_tracker.adaptive")
+
+
+class AdaptivePolicy:
+    """Sabit fiyatlı sayfaları seyrek, hareketli sayfaları sık kontrol eder
+
+    Fiyat değişmedikçe aralık her kontrolde `backoff` katına çıkar (en fazla
+    max_interval). Fiyat değişince ya da yeni bir eski fiyat (indirim)
+    işareti görülünce aralık min_interval'a iner; indirim sürdükçe temel
+    aralığı aşmaz. Tüm sayfaların saatlik yük toplamı budget_per_hour'u
+    geçerse aralıklar aynı oranda uzatılır.
+
+    min_interval / max_interval verilmezse sayfanın temel aralığının 1/4'ü
+    ve 8 katı kullanılır.
+    """
+
+    def __init__(
+        self,
+        min_interval=None,
+        max_interval=None,
+        budget_per_hour=None,
+        backoff=1.5,
+        alpha=0.2,
+        latency_window=1000,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.budget_per_hour = budget_per_hour
+        self.backoff = max(1.0, float(backoff))
+        self.alpha = alpha
+        self.pages = {}
+        self.load = 0.0
+        self.changes = 0
+        self.observations = 0
+        # Değişikliği gören kontrol ile bir önceki kontrol arasındaki süre:
+        # uyarının en fazla ne kadar geç kalmış olabileceği
+        self.detection_gaps = deque(maxlen=latency_window)
+        self.lock = threading.Lock()
+
+    def _bounds(self, base):
+        low = self.min_interval or base / 4
+        high = self.max_interval or base * 8
+        return low, max(low, high)
+
+    def _set_desired(self, page, interval):
+        self.load += 3600.0 / interval - 3600.0 / page["desired"]
+        page["desired"] = interval
+
+    @property
+    def scale(self):
+        """Bütçe aşıldığında tüm aralıkların çarpanı (>= 1)"""
+        if not self.budget_per_hour or self.load <= self.budget_per_hour:
+            return 1.0
+        return self.load / self.budget_per_hour
+
+    def observe(self, key, price_info, last_price, base, now=None):
+        """Başarılı bir kontrolü işler ve sayfanın yeni aralığını döndürür"""
+        now = time.time() if now is None else now
+        current = price_info["current_price"]
+        old_price = price_info.get("old_price")
+        discounted = bool(old_price and old_price > current)
+        low, high = self._bounds(base)
+
+        with self.lock:
+            page = self.pages.get(key)
+            if page is None:
+                page = self.pages[key] = {
+                    "desired": base,
+                    "change_rate": 0.0,
+                    "discounted": False,
+                    "last_seen": None,
+                    "last_change": None,
+                }
+                self.load += 3600.0 / base
+
+            changed = last_price is not None and current != last_price
+            new_discount = discounted and not page["discounted"]
+            self.observations += 1
+            page["change_rate"] += self.alpha * (float(changed) - page["change_rate"])
+
+            if changed or new_discount:
+                if changed:
+                    self.changes += 1
+                    page["last_change"] = now
+                    if page["last_seen"] is not None:
+                        self.detection_gaps.append(now - page["last_seen"])
+                interval = low
+            else:
+                interval = min(page["desired"] * self.backoff, high)
+                if discounted:
+                    # İndirim sürerken fiyat her an yeniden değişebilir
+                    interval = min(interval, base)
+            interval = max(low, interval)
+
+            page["discounted"] = discounted
+            page["last_seen"] = now
+            self._set_desired(page, interval)
+            return interval * self.scale
+
+    def forget(self, key):
+        with self.lock:
+            page = self.pages.pop(key, None)
+            if page is not None:
+                self.load -= 3600.0 / page["desired"]
+
+    def summary(self, base=None):
+        """Tazelik ile yük arasındaki dengeyi özetler
+
+        base verilirse sabit aralıkla kontrol etmenin yükü ve kazanç da
+        hesaplanır. Ortalama bayatlık, değişikliklerin rastgele anlarda
+        olduğu varsayımıyla aralığın yarısıdır.
+        """
+        with self.lock:
+            scale = self.scale
+            intervals = sorted(
+                round(page["desired"] * scale, 1) for page in self.pages.values()
+            )
+            gaps = sorted(self.detection_gaps)
+            volatile = sum(
+                1 for page in self.pages.values() if page["change_rate"] >= 0.1
+            )
+            load = self.load / scale if scale else self.load
+            summary = {
+                "pages": len(intervals),
+                "volatile_pages": volatile,
+                "observations": self.observations,
+                "changes": self.changes,
+                "loads_per_hour": round(load, 1),
+                "budget_per_hour": self.budget_per_hour,
+                "scale": round(scale, 3),
+                "interval": {
+                    "min": intervals[0] if intervals else None,
+                    "p50": intervals[int(0.5 * (len(intervals) - 1))]
+                    if intervals
+                    else None,
+                    "max": intervals[-1] if intervals else None,
+                },
+                "mean_staleness_s": round(sum(intervals) / len(intervals) / 2, 1)
+                if intervals
+                else None,
+                "detection_gap_s": {
+                    "p50": round(gaps[int(0.5 * (len(gaps) - 1))], 1) if gaps else None,
+                    "p95": round(gaps[int(0.95 * (len(gaps) - 1))], 1)
+                    if gaps
+                    else None,
+                },
+            }
+        if base and intervals:
+            fixed = 3600.0 / base * len(intervals)
+            summary["fixed_loads_per_hour"] = round(fixed, 1)
+            summary["saved_pct"] = round((1 - load / fixed) * 100, 1)
+        return summary
@@ -0,0 +1,219 @@
+"""Fiyat geçmişi üzerinde ürün başına pencere istatistikleri
+
+İstatistikler gözlemlerin kendisinden değil, history modülünün her yazımda
+güncellediği günlük fiyat seviyelerinden (price_levels) hesaplanır. NumPy
+kuruluysa tüm ürünler tek seferde vektörel olarak işlenir, değilse aynı
+sonuç saf Python ile üretilir.
+"""
+
+import logging
+import os
+import time
+from datetime import datetime
+
+from .history import SECONDS_PER_DAY, connect, ensure_price_levels
+
+logger = logging.getLogger("price_tracker.analytics")
+
+try:
+    import numpy as np
+except ImportError:  # NumPy yoksa saf Python hesaplaması kullanılır
+    np = None
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def _levels(path, days, keys=None, now=None):
+    """Penceredeki (ürün, fiyat, eski fiyat, adet) satırlarını okur"""
+    first_day = int((now or time.time()) // SECONDS_PER_DAY) - days + 1
+    sql = (
+        "SELECT product_key, price, old_price, SUM(count) FROM price_levels "
+        "WHERE day >= ?"
+    )
+    state_sql = (
+        "SELECT product_key, url, store, last_price, last_check FROM product_state"
+    )
+    params = [first_day]
+    if keys is not None:
+        selected = f" product_key IN ({', '.join('?' * len(keys))})"
+        sql += f" AND{selected}"
+        state_sql += f" WHERE{selected}"
+        params.extend(keys)
+    sql += " GROUP BY product_key, price, old_price"
+    with connect(path) as conn:
+        ensure_price_levels(conn)
+        levels = conn.execute(sql, params).fetchall()
+        state = conn.execute(state_sql, params[1:]).fetchall()
+    return levels, {row[0]: row[1:] for row in state}
+
+
+def _stats(
+    count, minimum, maximum, mean, percentiles, discounted, depth_sum, depth_max
+):
+    return {
+        "observations": int(count),
+        "min": round(float(minimum), 2),
+        "max": round(float(maximum), 2),
+        "mean": round(float(mean), 2),
+        "percentiles": {
+            f"p{q}": round(float(value), 2)
+            for q, value in zip(PERCENTILES, percentiles)
+        },
+        "discount": {
+            "share_pct": round(100.0 * discounted / count, 1),
+            "mean_pct": round(float(depth_sum / discounted), 1) if discounted else None,
+            "max_pct": round(float(depth_max), 1) if discounted else None,
+        },
+    }
+
+
+def _compute_numpy(levels):
+    """Tüm ürünlerin istatistikleri; gruplar sıralı dizilerde reduceat ile toplanır"""
+    codes = {}
+    key_codes = np.fromiter(
+        (codes.setdefault(row[0], len(codes)) for row in levels),
+        dtype=np.int64,
+        count=len(levels),
+    )
+    price = np.fromiter((row[1] for row in levels), dtype=float, count=len(levels))
+    old = np.fromiter((row[2] for row in levels), dtype=float, count=len(levels))
+    count = np.fromiter((row[3] for row in levels), dtype=float, count=len(levels))
+
+    # Ürün, sonra fiyat sırası: her grubun ilk/son elemanı en düşük/en yüksek fiyat
+    order = np.lexsort((price, key_codes))
+    key_codes, price, old, count = (
+        key_codes[order],
+        price[order],
+        old[order],
+        count[order],
+    )
+    starts = np.flatnonzero(np.r_[True, key_codes[1:] != key_codes[:-1]])
+    ends = np.r_[starts[1:], len(price)] - 1
+
+    totals = np.add.reduceat(count, starts)
+    means = np.add.reduceat(price * count, starts) / totals
+    # Ağırlıklı yüzdelik: birikimli adedi q * n'e ulaşan ilk fiyat
+    cumulative = np.cumsum(count)
+    before = cumulative[starts] - count[starts]
+    percentiles = [
+        price[
+            np.searchsorted(
+                cumulative,
+                before + np.maximum(1, np.ceil(q / 100.0 * totals)),
+                side="left",
+            )
+        ]
+        for q in PERCENTILES
+    ]
+    depth = np.where(old > price, (old - price) / np.where(old > 0, old, 1) * 100, 0.0)
+    is_discounted = depth > 0
+    discounted = np.add.reduceat(count * is_discounted, starts)
+    depth_sum = np.add.reduceat(depth * count, starts)
+    depth_max = np.maximum.reduceat(depth, starts)
+
+    names = list(codes)
+    return {
+        names[key_codes[start]]: _stats(
+            totals[i],
+            price[start],
+            price[ends[i]],
+            means[i],
+            [values[i] for values in percentiles],
+            discounted[i],
+            depth_sum[i],
+            depth_max[i],
+        )
+        for i, start in enumerate(starts)
+    }
+
+
+def _compute_python(levels):
+    grouped = {}
+    for key, price, old, count in levels:
+        grouped.setdefault(key, []).append((price, old, count))
+    result = {}
+    for key, rows in grouped.items():
+        rows.sort()
+        total = sum(count for _, _, count in rows)
+        percentiles = []
+        for q in PERCENTILES:
+            target = max(1, -(-q * total // 100))
+            cumulative = 0
+            for price, _, count in rows:
+                cumulative += count
+                if cumulative >= target:
+                    percentiles.append(price)
+                    break
+        depths = [
+            ((old - price) / old * 100 if old > price else 0.0, count)
+            for price, old, count in rows
+        ]
+        result[key] = _stats(
+            total,
+            rows[0][0],
+            rows[-1][0],
+            sum(price * count for price, _, count in rows) / total,
+            percentiles,
+            sum(count for depth, count in depths if depth > 0),
+            sum(depth * count for depth, count in depths),
+            max(depth for depth, _ in depths),
+        )
+    return result
+
+
+def price_stats(path, days=90, keys=None, now=None, vectorized=None):
+    """Son `days` günün ürün başına istatistikleri: {ürün anahtarı: istatistik}
+
+    Her kayıtta en düşük/en yüksek/ortalama fiyat, ağırlıklı yüzdelikler,
+    indirimli gözlem oranı ve indirim derinliği ile son fiyatın pencereye
+    göre konumu bulunur. keys verilirse yalnızca o ürünler okunur.
+    """
+    if not os.path.exists(path):
+        return {}
+    levels, state = _levels(path, days, keys, now)
+    if not levels:
+        return {}
+    if vectorized is None:
+        vectorized = np is not None
+    stats = _compute_numpy(levels) if vectorized else _compute_python(levels)
+    for key, entry in stats.items():
+        url, store, last_price, last_check = state.get(key, (None, None, None, None))
+        entry.update(
+            {
+                "url": url,
+                "store": store,
+                "current_price": last_price,
+                "last_check": datetime.fromtimestamp(last_check).isoformat()
+                if last_check
+                else None,
+                "is_window_low": last_price is not None and last_price <= entry["min"],
+                "vs_mean_pct": round(
+                    (last_price - entry["mean"]) / entry["mean"] * 100, 1
+                )
+                if last_price is not None and entry["mean"]
+                else None,
+            }
+        )
+    return stats
+
+
+def report(path, days=90, url=None, now=None):
+    """CLI ve Laravel için JSON'a çevrilebilir rapor; url verilirse o sayfa ve varyantları"""
+    started = time.monotonic()
+    stats = price_stats(path, days=days, now=now)
+    if url:
+        stats = {
+            key: entry
+            for key, entry in stats.items()
+            if entry["url"]
+            and (entry["url"] == url or entry["url"].startswith(f"{url}#"))
+        }
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "days": days,
+        "backend": "numpy" if np is not None else "python",
+        "seconds": round(time.monotonic() - started, 3),
+        "products": [
+            {"product_key": key, **entry} for key, entry in sorted(stats.items())
+        ],
+    }
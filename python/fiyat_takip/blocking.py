@@ -0,0 +1,144 @@
+"""Fiyat için gereksiz kaynakları (görsel, font, izleme betikleri) engeller"""
+
+import fnmatch
+import logging
+import threading
+
+logger = logging.getLogger("price_tracker.blocking")
+
+# Tüm mağazalarda engellenen URL kalıpları (Network.setBlockedURLs biçiminde)
+DEFAULT_BLOCKED_URLS = [
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.avif",
+    "*.svg",
+    "*.ico",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*.mp4",
+    "*.webm",
+    "*.m3u8",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*facebook.net*",
+    "*facebook.com/tr*",
+    "*connect.facebook*",
+    "*hotjar*",
+    "*criteo*",
+    "*tiktok*",
+    "*pinterest*",
+    "*bing.com*",
+    "*clarity.ms*",
+    "*onetrust*",
+    "*cookielaw*",
+]
+
+# Sayfa yüklemesinin aktarılan bayt ve süresini tek çağrıda ölçer
+MEASURE_SCRIPT = """
+var nav = performance.getEntriesByType('navigation')[0] || {};
+var resources = performance.getEntriesByType('resource');
+var bytes = nav.transferSize || 0;
+for (var i = 0; i < resources.length; i++) {
+    bytes += resources[i].transferSize || 0;
+}
+return {
+    bytes: bytes,
+    requests: resources.length + 1,
+    load_ms: nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : (nav.duration || 0)
+};
+"""
+
+
+class ResourceBlocker:
+    """Mağaza başına izin/engel listesine göre kaynak engelleme
+
+    Ayarlar: {"enabled": true, "stores": {"zara": {"deny": [...], "allow": [...]}}}
+    Mağazanın deny listesi varsayılanlara eklenir; allow listesindeki kalıplarla
+    eşleşen varsayılan kalıplar o mağaza için engellenmez.
+    """
+
+    def __init__(self, settings=None):
+        settings = settings or {}
+        self.enabled = settings.get("enabled", True)
+        self.stores = settings.get("stores", {})
+        self.defaults = settings.get("deny", DEFAULT_BLOCKED_URLS)
+
+    def chrome_prefs(self):
+        """Görselleri ve bildirimleri Chrome seviyesinde kapatan tercihler"""
+        if not self.enabled:
+            return {}
+        return {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+            "profile.managed_default_content_settings.media_stream": 2,
+        }
+
+    def patterns_for(self, store):
+        rules = self.stores.get(store, {})
+        allow = rules.get("allow", [])
+        patterns = [
+            pattern
+            for pattern in self.defaults
+            if not any(fnmatch.fnmatch(pattern, allowed) for allowed in allow)
+        ]
+        return patterns + [p for p in rules.get("deny", []) if p not in patterns]
+
+    def apply(self, driver, store):
+        """Driver'da mağazaya ait engel listesini DevTools üzerinden etkinleştirir"""
+        if not self.enabled:
+            return
+        patterns = self.patterns_for(store)
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+            logger.debug(f"{store} için {len(patterns)} kaynak kalıbı engellendi")
+        except Exception as e:
+            logger.warning(f"Kaynak engelleme uygulanamadı ({store}): {e}")
+
+
+def measure_page(driver):
+    """Son yüklenen sayfanın aktarılan bayt, istek sayısı ve yükleme süresi"""
+    try:
+        return driver.execute_script(MEASURE_SCRIPT) or {}
+    except Exception as e:
+        logger.debug(f"Sayfa ölçümü alınamadı: {e}")
+        return {}
+
+
+class PageMetrics:
+    """Mağaza başına toplam aktarılan bayt ve sayfa yükleme süresi"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stores = {}
+
+    def observe(self, store, metrics):
+        if not metrics:
+            return
+        with self.lock:
+            entry = self.stores.setdefault(
+                store, {"pages": 0, "bytes": 0, "requests": 0, "load_ms": 0.0}
+            )
+            entry["pages"] += 1
+            entry["bytes"] += int(metrics.get("bytes") or 0)
+            entry["requests"] += int(metrics.get("requests") or 0)
+            entry["load_ms"] += float(metrics.get("load_ms") or 0)
+
+    def summary(self):
+        with self.lock:
+            return {
+                store: {
+                    "pages": entry["pages"],
+                    "avg_kb": entry["bytes"] / entry["pages"] / 1024,
+                    "avg_requests": entry["requests"] / entry["pages"],
+                    "avg_load_ms": entry["load_ms"] / entry["pages"],
+                }
+                for store, entry in self.stores.items()
+                if entry["pages"]
+            }
@@ -0,0 +1,161 @@
+"""Çalışan takipçiyi yeniden başlatmadan yöneten yerel HTTP kontrol kanalı"""
+
+import hmac
+import json
+import logging
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+logger = logging.getLogger("price_tracker.control")
+
+# (HTTP metodu, yol) -> komut adı
+ROUTES = {
+    ("GET", "/health"): "health",
+    ("GET", "/products"): "list",
+    ("POST", "/products"): "add",
+    ("PUT", "/products"): "sync",
+    ("PATCH", "/products"): "update",
+    ("DELETE", "/products"): "remove",
+    ("POST", "/pause"): "pause",
+    ("POST", "/resume"): "resume",
+    ("POST", "/check"): "check",
+}
+
+
+class ControlCommand:
+    """Kontrol döngüsünde uygulanacak bir komut ve yanıtı için bekleme noktası"""
+
+    def __init__(self, name, payload):
+        self.name = name
+        self.payload = payload
+        self.reply = queue.Queue(maxsize=1)
+
+    def respond(self, status, body):
+        self.reply.put((status, body))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "FiyatTakip/1.0"
+
+    def _dispatch(self, method):
+        path = urlparse(self.path).path.rstrip("/") or "/"
+        server = self.server.control
+
+        route = server.routes.get((method, path))
+        token = self.headers.get("X-Control-Token", "")
+        public = route is not None and route[1]
+        if server.token and not public and not hmac.compare_digest(token, server.token):
+            return self._send(401, {"status": "error", "message": "Yetkisiz istek"})
+
+        # Yalnızca okuma yapan uç noktalar kuyruğa girmeden doğrudan yanıtlanır
+        if route is not None:
+            return self._send(*route[0]())
+
+        name = ROUTES.get((method, path))
+        if name is None:
+            return self._send(404, {"status": "error", "message": "Bilinmeyen komut"})
+
+        payload = {}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            try:
+                payload = json.loads(self.rfile.read(length).decode("utf-8"))
+            except ValueError:
+                return self._send(400, {"status": "error", "message": "Geçersiz JSON"})
+        if not isinstance(payload, dict):
+            return self._send(
+                400,
+                {"status": "error", "message": "İstek gövdesi bir JSON nesnesi olmalı"},
+            )
+
+        command = ControlCommand(name, payload)
+        server.commands.put(command)
+        try:
+            status, body = command.reply.get(timeout=server.reply_timeout)
+        except queue.Empty:
+            status, body = 504, {"status": "error", "message": "Takipçi yanıt vermedi"}
+        self._send(status, body)
+
+    def _send(self, status, body):
+        if isinstance(body, str):
+            content_type = "text/plain"
+            data = body.encode("utf-8")
+        else:
+            content_type = "application/json"
+            data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        logger.debug(f"Kontrol isteği: {format % args}")
+
+
+class ControlServer:
+    """Komutları kuyruğa alan, yalnızca localhost'ta dinleyen HTTP sunucusu
+
+    Gelen komutlar monitör döngüsü tarafından `commands` kuyruğundan çekilip
+    uygulanır; böylece ürün listesi ve planlayıcı tek iş parçacığında kalır.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, token=None, reply_timeout=15):
+        self.token = token
+        self.reply_timeout = reply_timeout
+        self.commands = queue.Queue()
+        self.routes = {}
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.control = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def add_route(self, method, path, handler, public=False):
+        """Kuyruğa girmeden yanıtlanan salt okunur bir uç nokta ekler
+
+        handler() (durum kodu, gövde) döndürür; gövde str ise düz metin gönderilir.
+        public uç noktalar (ör. /metrics) erişim anahtarı istemez.
+        """
+        self.routes[(method, path)] = (handler, public)
+
+    @property
+    def address(self):
+        return self.httpd.server_address
+
+    def start(self):
+        self.thread.start()
+        logger.info(
+            f"Kontrol kanalı dinleniyor: http://{self.address[0]}:{self.address[1]}"
+        )
+
+    def pending(self):
+        """Bekleyen komutları sırayla döndürür"""
+        while True:
+            try:
+                yield self.commands.get_nowait()
+            except queue.Empty:
+                return
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        # Yanıt bekleyen istemcileri serbest bırak
+        for command in self.pending():
+            command.respond(503, {"status": "error", "message": "Takipçi durduruluyor"})
@@ -0,0 +1,327 @@
+"""Kaydedilmiş sayfa HTML'inde CSS seçicileriyle element arama
+
+Çevrimdışı yeniden çıkarma, tarayıcıdaki CASCADE_SCRIPT'in yaptığını
+arşivlenmiş HTML üzerinde tekrarlar. BeautifulSoup (soupsieve ile) ve lxml
+kuruluysa sayfa tarayıcı gibi ayrıştırılır ve seçiciler soupsieve ile
+çalıştırılır; değilse standart kütüphanenin html.parser'ı
+ile kurulan ağaçta fiyat kurallarının kullandığı alt küme desteklenir:
+etiket, *, #id, .sınıf, [öznitelik] ve [öznitelik=, ~=, ^=, $=, *=, |= değer],
+alt (boşluk) ve doğrudan alt (>) birleştiricileri, virgüllü listeler.
+
+İki bağımlılık da isteğe bağlıdır (pip install beautifulsoup4 lxml); yalnızca
+biri kuruluysa standart kütüphane ağacı kullanılır. İki yolda da metin
+innerText gibi <script>/<style> içeriği ve yorumlar olmadan okunur.
+"""
+
+import logging
+import re
+from html.parser import HTMLParser
+
+try:
+    import lxml  # noqa: F401
+    from bs4 import BeautifulSoup
+    from bs4.element import NavigableString, PreformattedString
+except ImportError:
+    # bs4'ün html.parser kipi kapanmamış <li>/<p> elementlerini iç içe kurar
+    BeautifulSoup = None
+
+logger = logging.getLogger("price_tracker.dom")
+
+# innerText'e metni katılmayan elementler
+HIDDEN_TAGS = frozenset(("script", "style"))
+
+# Kapanış etiketi olmayan elementler
+VOID_TAGS = frozenset(
+    (
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    )
+)
+
+# Kapanış etiketi isteğe bağlı elementler: yeni element açılınca açık olan kapanır
+IMPLIED_END = {
+    "li": ("li",),
+    "p": ("p",),
+    "option": ("option",),
+    "dt": ("dt", "dd"),
+    "dd": ("dt", "dd"),
+    "tr": ("tr", "td", "th"),
+    "td": ("td", "th"),
+    "th": ("td", "th"),
+}
+
+SELECTOR_TOKEN = re.compile(
+    r"""
+    \s*(?P<child>>)\s*
+    | (?P<space>\s+)
+    | (?P<comma>,)
+    | (?P<tag>\*|[a-zA-Z][\w-]*)
+    | \#(?P<id>[\w-]+)
+    | \.(?P<cls>[\w-]+)
+    | \[\s*(?P<attr>[\w:-]+)\s*
+      (?:(?P<op>[~^$*|]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\]\s]+))\s*)?
+      \]
+    """,
+    re.X,
+)
+
+ATTRIBUTE_TESTS = {
+    None: lambda value, expected: value is not None,
+    "=": lambda value, expected: value == expected,
+    "~=": lambda value, expected: expected in (value or "").split(),
+    "^=": lambda value, expected: bool(expected) and (value or "").startswith(expected),
+    "$=": lambda value, expected: bool(expected) and (value or "").endswith(expected),
+    "*=": lambda value, expected: bool(expected) and expected in (value or ""),
+    "|=": lambda value, expected: value == expected
+    or (value or "").startswith(expected + "-"),
+}
+
+
+def normalize_text(text):
+    """innerText gibi: boşlukları teke indirir ve kırpar"""
+    return " ".join((text or "").split())
+
+
+class _Element:
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag, attrs, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+        self.parent = parent
+
+    def classes(self):
+        return (self.attrs.get("class") or "").split()
+
+    def text(self):
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            elif node.tag not in HIDDEN_TAGS:
+                stack.extend(reversed(node.children))
+        return normalize_text("".join(parts))
+
+    def iter(self):
+        """Alt elementleri belge sırasıyla dolaşır"""
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                continue
+            yield node
+            stack.extend(reversed(node.children))
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = _Element("#document", {})
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        closes = IMPLIED_END.get(tag, ())
+        while len(self.stack) > 1 and self.stack[-1].tag in closes:
+            self.stack.pop()
+        element = _Element(tag, {name: value or "" for name, value in attrs})
+        element.parent = self.stack[-1]
+        self.stack[-1].children.append(element)
+        if tag not in VOID_TAGS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        # Kapatılmamış iç elementler (ör. <p>, <li>) birlikte kapanır
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index].tag == tag:
+                del self.stack[index:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def parse_selector(selector):
+    """Virgülle ayrılmış seçicileri bileşik seçici sözlükleri listelerine çevirir
+
+    Desteklenmeyen sözdiziminde (sözde sınıflar, kardeş birleştiricileri)
+    ValueError fırlatır.
+    """
+    groups = [[]]
+    combinator = " "
+    compound = None
+    position = 0
+    text = selector.strip()
+    while position < len(text):
+        match = SELECTOR_TOKEN.match(text, position)
+        if not match or match.end() == position:
+            raise ValueError(
+                f"Desteklenmeyen seçici: {selector!r} ({position + 1}. karakter)"
+            )
+        position = match.end()
+        if match.group("comma"):
+            if compound is None:
+                raise ValueError(f"Boş seçici: {selector!r}")
+            groups.append([])
+            combinator, compound = " ", None
+        elif match.group("child") or match.group("space"):
+            if compound is not None:
+                combinator = ">" if match.group("child") else " "
+                compound = None
+        else:
+            if compound is None:
+                compound = {
+                    "combinator": combinator,
+                    "tag": None,
+                    "id": None,
+                    "classes": [],
+                    "attrs": [],
+                }
+                groups[-1].append(compound)
+                combinator = None
+            elif match.group("tag") is not None:
+                raise ValueError(f"Desteklenmeyen seçici: {selector!r}")
+            if match.group("tag") is not None:
+                tag = match.group("tag").lower()
+                compound["tag"] = None if tag == "*" else tag
+            elif match.group("id") is not None:
+                compound["id"] = match.group("id")
+            elif match.group("cls") is not None:
+                compound["classes"].append(match.group("cls"))
+            else:
+                value = next(
+                    (
+                        match.group(name)
+                        for name in ("dq", "sq", "bare")
+                        if match.group(name) is not None
+                    ),
+                    None,
+                )
+                compound["attrs"].append(
+                    (match.group("attr").lower(), match.group("op"), value)
+                )
+    if not all(groups):
+        raise ValueError(f"Boş seçici: {selector!r}")
+    return groups
+
+
+def _matches_compound(element, compound):
+    if compound["tag"] and element.tag != compound["tag"]:
+        return False
+    if compound["id"] and element.attrs.get("id") != compound["id"]:
+        return False
+    if compound["classes"]:
+        classes = element.classes()
+        if not all(name in classes for name in compound["classes"]):
+            return False
+    for name, op, expected in compound["attrs"]:
+        if not ATTRIBUTE_TESTS[op](element.attrs.get(name), expected):
+            return False
+    return True
+
+
+def _matches(element, compounds):
+    """Sağdan sola eşleştirir: son bileşik elementin kendisi, öncekiler ataları"""
+    if not _matches_compound(element, compounds[-1]):
+        return False
+    if len(compounds) == 1:
+        return True
+    combinator = compounds[-1]["combinator"]
+    parent = element.parent
+    if combinator == ">":
+        return (
+            parent is not None
+            and parent.tag != "#document"
+            and _matches(parent, compounds[:-1])
+        )
+    while parent is not None and parent.tag != "#document":
+        if _matches(parent, compounds[:-1]):
+            return True
+        parent = parent.parent
+    return False
+
+
+def _soup_text(element):
+    """bs4 elementinin metni; bs4 sürümünden bağımsız olarak gizli içerik hariç"""
+    return normalize_text(
+        "".join(
+            node
+            for node in element.descendants
+            if isinstance(node, NavigableString)
+            # Yorum, CDATA, doctype gibi ögeler metne katılmaz
+            and not isinstance(node, PreformattedString)
+            and node.parent.name not in HIDDEN_TAGS
+        )
+    )
+
+
+class Document:
+    """Bir kez ayrıştırılan sayfa; text() document.querySelector gibi ilk eşleşeni okur"""
+
+    def __init__(self, html):
+        if BeautifulSoup is not None:
+            self.soup = BeautifulSoup(html, "lxml")
+            self.root = None
+        else:
+            self.soup = None
+            builder = _TreeBuilder()
+            builder.feed(html)
+            builder.close()
+            self.root = builder.root
+        self.selectors = {}
+
+    def select(self, selector):
+        """Belge sırasıyla seçiciye uyan ilk element; yoksa None"""
+        if self.soup is not None:
+            return self.soup.select_one(selector)
+        groups = self.selectors.get(selector)
+        if groups is None:
+            groups = self.selectors[selector] = parse_selector(selector)
+        for element in self.root.iter():
+            if any(_matches(element, compounds) for compounds in groups):
+                return element
+        return None
+
+    def text(self, selector):
+        """Seçiciye uyan ilk elementin kırpılmış metni; eşleşme ya da metin yoksa None"""
+        if not selector:
+            return None
+        element = self.select(selector)
+        if element is None:
+            return None
+        if self.soup is not None:
+            return _soup_text(element) or None
+        return element.text() or None
+
+
+def cascade(html, rules):
+    """CASCADE_SCRIPT'in HTML üzerindeki karşılığı: ilk eşleşen kuralın sırası ve metinleri"""
+    document = Document(html)
+    for index, rule in enumerate(rules):
+        current = document.text(rule["current"])
+        if current:
+            return {
+                "rule": index,
+                "current": current,
+                "old": document.text(rule.get("old")),
+            }
+    return {"rule": None}
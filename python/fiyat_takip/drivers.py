@@ -0,0 +1,182 @@
+"""Chrome driver yaşam döngüsü: driver yolunun önbelleği, geri dönüşüm ve bellek takibi"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("price_tracker.drivers")
+
+try:
+    import psutil
+except ImportError:  # psutil yoksa Linux'ta /proc üzerinden ölçülür
+    psutil = None
+
+
+def _proc_tree_rss(root_pid):
+    """/proc üzerinden süreç ağacının toplam RSS değeri (bayt)"""
+    children = {}
+    rss = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status") as f:
+                ppid = None
+                for line in f:
+                    if line.startswith("PPid:"):
+                        ppid = int(line.split()[1])
+                    elif line.startswith("VmRSS:"):
+                        rss[int(entry)] = int(line.split()[1]) * 1024
+            if ppid is not None:
+                children.setdefault(ppid, []).append(int(entry))
+        except (OSError, ValueError):
+            continue
+
+    total = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
+
+
+def process_tree_rss(pid):
+    """Bir sürecin ve tüm alt süreçlerinin (Chrome render süreçleri) RSS toplamı"""
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            total = root.memory_info().rss
+            for child in root.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total
+        except psutil.Error:
+            return 0
+    if os.path.isdir("/proc"):
+        return _proc_tree_rss(pid)
+    return 0
+
+
+class DriverLifecycle:
+    """İşçilerin ortak kullandığı driver ayarları ve sağlık istatistikleri
+
+    Ayarlar: driver_path / browser_path (açık yollar), cache_file (çözülen driver
+    yolunun saklandığı JSON), max_page_loads ve max_rss_mb (geri dönüşüm eşikleri),
+    rss_interval (bellek ölçümleri arasındaki en kısa süre, saniye).
+    """
+
+    def __init__(self, settings=None):
+        settings = settings or {}
+        self.explicit_driver_path = settings.get("driver_path")
+        self.browser_path = settings.get("browser_path")
+        self.cache_file = settings.get("cache_file")
+        self.max_page_loads = settings.get("max_page_loads", 200)
+        self.max_rss_mb = settings.get("max_rss_mb", 1500)
+        # Süreç ağacını gezmek pahalıdır (psutil yoksa tüm /proc okunur);
+        # aralık dolmadan gelen sayfa yüklemeleri son ölçümü kullanır
+        self.rss_interval = settings.get("rss_interval", 30)
+        self.rss_samples = {}
+        self.lock = threading.Lock()
+        self.resolved_path = None
+        self.workers = {}
+
+    def driver_path(self):
+        """ChromeDriver yolunu döndürür; ağ araması yalnızca ilk seferde yapılır"""
+        with self.lock:
+            if self.resolved_path:
+                return self.resolved_path
+            path = self.explicit_driver_path or self._cached_path()
+            if path:
+                logger.info(f"ChromeDriver yolu önbellekten kullanılıyor: {path}")
+            else:
+                from webdriver_manager.chrome import ChromeDriverManager
+
+                logger.info("ChromeDriver indiriliyor/çözülüyor...")
+                path = ChromeDriverManager().install()
+                self._store_path(path)
+            self.resolved_path = path
+            return path
+
+    def _cached_path(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return None
+        try:
+            with open(self.cache_file, "r") as f:
+                path = json.load(f).get("driver_path")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Driver önbelleği okunamadı: {e}")
+            return None
+        if path and os.path.isfile(path) and os.access(path, os.X_OK):
+            return path
+        return None
+
+    def _store_path(self, path):
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(
+                os.path.dirname(os.path.abspath(self.cache_file)), exist_ok=True
+            )
+            tmp = f"{self.cache_file}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"driver_path": path}, f)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            logger.warning(f"Driver önbelleği yazılamadı: {e}")
+
+    def invalidate(self):
+        """Önbellekteki yol çalışmadıysa bir sonraki açılışta yeniden çözülür"""
+        with self.lock:
+            if self.resolved_path and self.resolved_path != self.explicit_driver_path:
+                self.resolved_path = None
+                if self.cache_file and os.path.exists(self.cache_file):
+                    os.remove(self.cache_file)
+
+    def driver_rss(self, driver):
+        """ChromeDriver ve bağlı Chrome süreçlerinin toplam RSS değeri (MB)"""
+        try:
+            pid = driver.service.process.pid
+        except AttributeError:
+            return 0.0
+        now = time.monotonic()
+        with self.lock:
+            sample = self.rss_samples.get(pid)
+        if sample is not None and now - sample[0] < self.rss_interval:
+            return sample[1]
+        rss_mb = process_tree_rss(pid) / (1024 * 1024)
+        with self.lock:
+            # Kapatılmış driver'ların eski ölçümleri atılır
+            self.rss_samples = {
+                other: value
+                for other, value in self.rss_samples.items()
+                if now - value[0] < self.rss_interval
+            }
+            self.rss_samples[pid] = (now, rss_mb)
+        return rss_mb
+
+    def should_recycle(self, page_loads, rss_mb):
+        if self.max_page_loads and page_loads >= self.max_page_loads:
+            return f"{page_loads} sayfa yüklendi"
+        if self.max_rss_mb and rss_mb >= self.max_rss_mb:
+            return f"bellek {rss_mb:.0f} MB"
+        return None
+
+    def report(self, worker, **values):
+        with self.lock:
+            entry = self.workers.setdefault(
+                worker, {"rss_mb": 0.0, "page_loads": 0, "restarts": 0, "crashes": 0}
+            )
+            for key, value in values.items():
+                if key in ("restarts", "crashes"):
+                    entry[key] += value
+                else:
+                    entry[key] = value
+
+    def summary(self):
+        with self.lock:
+            return {worker: dict(entry) for worker, entry in self.workers.items()}
@@ -0,0 +1,192 @@
+"""Aynı sayfayı takip eden ürünleri gruplayıp tek yüklemenin sonucunu dağıtır"""
+
+import bisect
+import logging
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .variants import variant_key
+
+logger = logging.getLogger("price_tracker.fanout")
+
+# Sayfa içeriğini değiştirmeyen izleme parametreleri
+TRACKING_PARAMS = {"gclid", "fbclid", "yclid", "msclkid", "_ga", "_gl", "ref"}
+TRACKING_PREFIXES = ("utm_",)
+
+
+def normalize_url(url):
+    """Aynı ürün sayfasının farklı yazımlarını tek adrese indirger
+
+    Şema ve alan adı küçük harfe çevrilir, fragman ve izleme parametreleri
+    atılır, kalan sorgu parametreleri sıralanır.
+    """
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS
+        and not name.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), "")
+    )
+
+
+def group_key(url, store):
+    return f"{store.lower()}:{normalize_url(url)}"
+
+
+class PriceTrack:
+    """Aynı fiyatı izleyen takipçiler; hedef fiyatlar sıralı tutulur
+
+    variant None ise sayfanın ana fiyatı, değilse o renk/bedenin fiyatı
+    izlenir. Hedef fiyatı aşılan takipçiler sıralı dizinde ikili arama ile
+    bulunur.
+    """
+
+    def __init__(self, variant=None):
+        self.variant = variant
+        self.key = variant_key(variant)
+        self.watchers = {}
+        self.targets = []
+        self.last_price = None
+        self.available = None
+
+    def add(self, watcher):
+        self.watchers[watcher["id"]] = watcher
+        bisect.insort(self.targets, (watcher["target_price"], watcher["id"]))
+
+    def remove(self, watcher):
+        self.watchers.pop(watcher["id"], None)
+        entry = (watcher["target_price"], watcher["id"])
+        index = bisect.bisect_left(self.targets, entry)
+        if index < len(self.targets) and self.targets[index] == entry:
+            del self.targets[index]
+
+    def set_target(self, watcher, target_price):
+        target_price = float(target_price)
+        self.remove(watcher)
+        watcher["target_price"] = target_price
+        self.add(watcher)
+
+    def crossed(self, last_price, current_price):
+        """current <= hedef < last koşulunu sağlayan takipçiler"""
+        low = bisect.bisect_left(self.targets, (current_price,))
+        high = bisect.bisect_left(self.targets, (last_price,))
+        return [self.watchers[watcher_id] for _, watcher_id in self.targets[low:high]]
+
+    def nearest(self, current_price):
+        """Hedefi güncel fiyata en yakın (altında kalan) takipçi"""
+        index = bisect.bisect_left(self.targets, (current_price,))
+        return self.watchers[self.targets[max(index - 1, 0)][1]]
+
+    def __len__(self):
+        return len(self.watchers)
+
+
+class WatchGroup:
+    """Tek bir sayfanın takipçileri
+
+    Sayfa bir kez yüklenir; takipçiler seçtikleri renk/bedene göre fiyat
+    izlerine (PriceTrack) ayrılır. Sayfanın durumu (son fiyat, son kontrol,
+    son hata) gruba aittir.
+    """
+
+    def __init__(self, url, store):
+        self.url = normalize_url(url)
+        self.store = store.lower()
+        self.key = f"{self.store}:{self.url}"
+        self.watchers = {}
+        self.tracks = {}
+        self.last_price = None
+        self.last_check = None
+        self.last_error = None
+        self.last_duration = None
+
+    @property
+    def page(self):
+        """İşçi havuzuna ve geçmiş deposuna giden sayfa kaydı"""
+        return {"key": self.key, "url": self.url, "store": self.store}
+
+    def variant_page(self, track):
+        """Varyant fiyatlarının geçmiş deposundaki kaydı"""
+        return {
+            "key": f"{self.key}#{track.key}",
+            "url": f"{self.url}#{track.key}",
+            "store": self.store,
+        }
+
+    def track_of(self, watcher):
+        return self.tracks.get(variant_key(watcher.get("variant")))
+
+    def add(self, watcher):
+        self.watchers[watcher["id"]] = watcher
+        key = variant_key(watcher.get("variant"))
+        track = self.tracks.get(key)
+        if track is None:
+            track = self.tracks[key] = PriceTrack(watcher.get("variant"))
+        track.add(watcher)
+
+    def remove(self, watcher):
+        self.watchers.pop(watcher["id"], None)
+        track = self.track_of(watcher)
+        if track is not None:
+            track.remove(watcher)
+            if not track:
+                del self.tracks[track.key]
+
+    def set_target(self, watcher, target_price):
+        self.track_of(watcher).set_target(watcher, target_price)
+
+    def interval(self):
+        """Sayfa, takipçilerin en kısa kontrol aralığıyla kontrol edilir"""
+        intervals = [
+            watcher["check_interval"]
+            for watcher in self.watchers.values()
+            if watcher["check_interval"]
+        ]
+        return min(intervals) if intervals else None
+
+    def __len__(self):
+        return len(self.watchers)
+
+
+class WatchIndex:
+    """Takipçileri sayfa gruplarına dağıtan dizin"""
+
+    def __init__(self):
+        self.groups = {}
+
+    def add(self, watcher):
+        """Takipçiyi grubuna ekler; yeni bir grup açıldıysa onu döndürür"""
+        key = group_key(watcher["url"], watcher["store"])
+        group = self.groups.get(key)
+        created = group is None
+        if created:
+            group = self.groups[key] = WatchGroup(watcher["url"], watcher["store"])
+        group.add(watcher)
+        watcher["group"] = key
+        return group if created else None
+
+    def remove(self, watcher):
+        """Takipçiyi çıkarır; grup boşaldıysa grubu döndürür"""
+        group = self.groups.get(watcher["group"])
+        if group is None:
+            return None
+        group.remove(watcher)
+        if not group:
+            del self.groups[group.key]
+            return group
+        return None
+
+    def group_of(self, watcher):
+        return self.groups.get(watcher["group"])
+
+    def get(self, key):
+        return self.groups.get(key)
+
+    def __len__(self):
+        return len(self.groups)
+
+    def __iter__(self):
+        return iter(self.groups.values())
@@ -0,0 +1,295 @@
+"""Tarayıcı açmadan, sayfadaki gömülü veriden fiyat okuyan hızlı yol"""
+
+import html as htmllib
+import json
+import logging
+import re
+import threading
+
+from .guard import (
+    BLOCK_STATUSES,
+    BlockedError,
+    StoreError,
+    StoreUnavailableError,
+    detect_block,
+)
+from .stores import StoreRegistry
+from .variants import UNAVAILABLE_MARKERS, build_variants
+
+logger = logging.getLogger("price_tracker.fastpath")
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+)
+
+# Sunucuda oluşturulmuş fiyat elementleri (Selenium seçicilerinin karşılıkları)
+MARKUP_PATTERNS = {
+    "zara": {
+        "current": re.compile(
+            r'data-qa-qualifier="price-amount-current".{0,400}?money-amount__main[^>]*>([^<]+)<',
+            re.S,
+        ),
+        "old": re.compile(
+            r'data-qa-qualifier="price-amount-old".{0,400}?money-amount__main[^>]*>([^<]+)<',
+            re.S,
+        ),
+    },
+    "pull&bear": {
+        "current": re.compile(
+            r'class="[^"]*\bprice-current-price\b[^"]*"[^>]*>([^<]+)<'
+        ),
+    },
+}
+
+JSON_LD_PATTERN = re.compile(
+    r'<script[^>]+type="application/ld\+json"[^>]*>(.*?)</script>', re.S | re.I
+)
+META_PRICE_PATTERN = re.compile(
+    r'<meta[^>]+(?:property|itemprop)="(?:product:price:amount|price)"[^>]+content="([^"]+)"',
+    re.I,
+)
+
+# Zara'nın tüm renk ve bedenleri içeren gömülü ürün verisi
+ZARA_PAYLOAD_PATTERN = re.compile(
+    r"window\.zara\.viewPayload\s*=\s*(\{.*?\})\s*;?\s*</script>", re.S
+)
+
+# Sunucuda oluşturulmuş beden listeleri (variants.DOM_SELECTORS karşılıkları)
+SIZE_LIST_PATTERNS = {
+    "zara": re.compile(
+        r'<ul[^>]+class="[^"]*\bsize-selector-list\b[^"]*"[^>]*>(.*?)</ul>', re.S
+    ),
+    "pull&bear": re.compile(
+        r'<div[^>]+class="[^"]*\bproduct-sizes\b[^"]*"[^>]*>(.*?)</div>', re.S
+    ),
+}
+SIZE_ITEM_PATTERN = re.compile(r"<(li|span|button)\b([^>]*)>(.*?)</\1>", re.S | re.I)
+TAG_PATTERN = re.compile(r"<[^>]+>")
+
+
+def _walk_offers(node):
+    """JSON-LD ağacındaki Product tekliflerinden fiyatları toplar"""
+    if isinstance(node, list):
+        for item in node:
+            yield from _walk_offers(item)
+    elif isinstance(node, dict):
+        if "@graph" in node:
+            yield from _walk_offers(node["@graph"])
+        offers = node.get("offers")
+        if offers is not None:
+            for offer in offers if isinstance(offers, list) else [offers]:
+                if not isinstance(offer, dict):
+                    continue
+                price = offer.get("price", offer.get("lowPrice"))
+                if price is None and isinstance(offer.get("priceSpecification"), dict):
+                    price = offer["priceSpecification"].get("price")
+                if price is not None:
+                    yield price
+
+
+def _from_markup(html, adapter):
+    patterns = MARKUP_PATTERNS.get(adapter.name, {})
+    texts = {}
+    for key, pattern in patterns.items():
+        match = pattern.search(html)
+        texts[key] = match.group(1).strip() if match else None
+    current_text = texts.get("current")
+    old_text = texts.get("old")
+    if current_text:
+        return {
+            "current_price": adapter.parse(current_text),
+            "old_price": adapter.parse(old_text) if old_text else None,
+            "current_price_text": current_text,
+            "old_price_text": old_text,
+        }
+    if old_text:
+        # Zara'da yalnızca liste fiyatı varsa o güncel fiyattır
+        return {
+            "current_price": adapter.parse(old_text),
+            "old_price": None,
+            "current_price_text": old_text,
+            "old_price_text": None,
+        }
+    return None
+
+
+def _from_json_ld(html, adapter):
+    for block in JSON_LD_PATTERN.findall(html):
+        try:
+            data = json.loads(htmllib.unescape(block.strip()))
+        except ValueError:
+            continue
+        for price in _walk_offers(data):
+            try:
+                value = adapter.parse_number(price)
+            except ValueError:
+                continue
+            if value:
+                return {
+                    "current_price": value,
+                    "old_price": None,
+                    "current_price_text": str(price),
+                    "old_price_text": None,
+                }
+    return None
+
+
+def _from_meta(html, adapter):
+    match = META_PRICE_PATTERN.search(html)
+    if not match:
+        return None
+    try:
+        value = adapter.parse_number(match.group(1))
+    except ValueError:
+        return None
+    if not value:
+        return None
+    return {
+        "current_price": value,
+        "old_price": None,
+        "current_price_text": match.group(1),
+        "old_price_text": None,
+    }
+
+
+def page_sources(html, store):
+    """Varyant kaynaklarını sayfadan VARIANT_SCRIPT ile aynı biçimde toplar"""
+    payload = None
+    if store == "zara":
+        match = ZARA_PAYLOAD_PATTERN.search(html)
+        payload = match.group(1) if match else None
+    sizes = []
+    pattern = SIZE_LIST_PATTERNS.get(store)
+    match = pattern.search(html) if pattern is not None else None
+    if match:
+        for _, attrs, text in SIZE_ITEM_PATTERN.findall(match.group(1)):
+            name = htmllib.unescape(TAG_PATTERN.sub("", text)).strip()
+            if name:
+                sizes.append(
+                    {"name": name, "available": not UNAVAILABLE_MARKERS.search(attrs)}
+                )
+    return {
+        "ld": JSON_LD_PATTERN.findall(html),
+        "payload": payload,
+        "color": None,
+        "sizes": sizes,
+    }
+
+
+def extract_price(html, adapter):
+    """HTML içinden fiyatı çıkarır: önce fiyat elementleri, sonra JSON-LD ve meta
+
+    Metinler mağaza bağdaştırıcısının (stores.StoreAdapter) yerel biçimiyle okunur.
+    """
+    return _first_price(html, adapter, (_from_markup, _from_json_ld, _from_meta))
+
+
+def extract_structured(html, adapter):
+    """Yalnızca yapısal veriden (JSON-LD, meta) fiyat okur"""
+    return _first_price(html, adapter, (_from_json_ld, _from_meta))
+
+
+def _first_price(html, adapter, extractors):
+    for extractor in extractors:
+        try:
+            info = extractor(html, adapter)
+        except ValueError as e:
+            logger.debug(f"Fiyat metni ayrıştırılamadı: {e}")
+            continue
+        if info:
+            return info
+    return None
+
+
+class HttpPriceFetcher:
+    """Ortak bağlantı havuzuyla sayfayı indirip fiyatı çıkarır
+
+    Bulunamazsa None döner; çağıran Selenium kontrolüne geri düşer.
+    İsabet ve geri düşüş sayaçları mağaza başına tutulur.
+    """
+
+    def __init__(self, stores=None, timeout=10, pool_size=10):
+        # urllib3 Selenium'un bağımlılığı olduğu için zaten kurulu
+        import urllib3
+
+        # Mağaza bağdaştırıcıları (stores.StoreRegistry); fast_path açık olanlar denenir
+        self.stores = stores if stores is not None else StoreRegistry()
+        self.timeout = timeout
+        self.http = urllib3.PoolManager(
+            maxsize=pool_size,
+            headers={
+                "User-Agent": USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml",
+                "Accept-Language": "tr-TR,tr;q=0.9",
+            },
+            # total sınırı yönlendirmeleri de sayar; yerel ayar/çerez onayı
+            # zincirleri için yönlendirme sınırı ayrı tutulur
+            retries=urllib3.Retry(total=None, connect=1, read=1, redirect=5),
+        )
+        self.lock = threading.Lock()
+        self.counters = {}
+        # İsteğe bağlı sayfa görüntüsü kaydedici (snapshots.SnapshotStore)
+        self.recorder = None
+
+    def supports(self, store):
+        adapter = self.stores.get(store)
+        return adapter is not None and adapter.fast_path
+
+    def _count(self, store, key):
+        with self.lock:
+            counters = self.counters.setdefault(
+                store, {"hits": 0, "fallbacks": 0, "blocked": 0}
+            )
+            counters[key] += 1
+
+    def fetch_html(self, url, store=None):
+        response = self.http.request("GET", url, timeout=self.timeout)
+        if response.status in BLOCK_STATUSES:
+            raise BlockedError(store, f"HTTP {response.status}")
+        if response.status >= 500:
+            # Sunucu hatasında tarayıcı da aynı yanıtı alır
+            raise StoreUnavailableError(store, f"HTTP {response.status}")
+        if response.status != 200:
+            raise ValueError(f"HTTP {response.status}")
+        return response.data.decode("utf-8", errors="replace")
+
+    def fetch_price(self, url, store):
+        """Sayfayı HTTP ile alır ve fiyatı çıkarır; başarısızsa None
+
+        Mağaza engel ya da doğrulama sayfası ya da sunucu hatası döndürdüyse
+        Selenium'a geri düşmek yerine StoreError fırlatır.
+        """
+        try:
+            html = self.fetch_html(url, store)
+            adapter = self.stores.get(store)
+            info = extract_price(html, adapter)
+            if self.recorder is not None:
+                self.recorder.record(url, store, html, info, source="http")
+            if info:
+                info["variants"] = build_variants(
+                    page_sources(html, store), info, adapter
+                )
+            else:
+                reason = detect_block(html)
+                if reason:
+                    raise BlockedError(store, reason)
+        except StoreError as e:
+            logger.warning(f"Hızlı yol: {e}")
+            if isinstance(e, BlockedError):
+                self._count(store, "blocked")
+            raise
+        except Exception as e:
+            logger.info(f"Hızlı yol başarısız ({store}): {e}")
+            info = None
+
+        if info:
+            logger.info(f"Hızlı yol fiyatı bulundu: {info['current_price_text']}")
+            self._count(store, "hits")
+        else:
+            self._count(store, "fallbacks")
+        return info
+
+    def summary(self):
+        with self.lock:
+            return {store: dict(c) for store, c in self.counters.items()}
@@ -0,0 +1,325 @@
+"""Mağaza başına hız sınırı, hata sonrası geri çekilme ve devre kesici"""
+
+import logging
+import random
+import re
+import time
+
+logger = logging.getLogger("price_tracker.guard")
+
+# Engelleme ya da bot doğrulaması anlamına gelen HTTP durumları
+BLOCK_STATUSES = {403, 429, 503}
+
+# Bot koruma sayfalarının başlıkları; sayfa yüklenir yüklenmez kontrol edilir
+BLOCK_TITLES = re.compile(
+    r"access denied|just a moment|attention required|pardon our interruption|"
+    r"robot check|are you a robot|güvenlik kontrolü|erişim engellendi",
+    re.I,
+)
+
+# Bot koruma servislerinin sayfaya bıraktığı izler
+BLOCK_MARKERS = re.compile(
+    r"cf-chl-|challenge-platform|_Incapsula_Resource|px-captcha|"
+    r"captcha-delivery\.com|errors\.edgesuite\.net|g-recaptcha|h-captcha",
+    re.I,
+)
+
+TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title>", re.S | re.I)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULTS = {
+    "rate_per_minute": None,
+    "burst": 5,
+    "failure_threshold": 5,
+    "backoff": 5.0,
+    "cooldown": 300.0,
+    "max_cooldown": 3600.0,
+    "probe_timeout": 300.0,
+}
+
+
+class StoreError(Exception):
+    """Tek bir ürünü değil mağazanın tamamını etkileyen hata"""
+
+    prefix = "Mağaza hatası"
+
+    def __init__(self, store, reason):
+        super().__init__(f"{self.prefix} ({store}): {reason}")
+        self.store = store
+        self.reason = reason
+
+
+class BlockedError(StoreError):
+    """Mağaza isteği engelledi ya da bot doğrulaması gösterdi"""
+
+    prefix = "Engellendi"
+
+
+class StoreUnavailableError(StoreError):
+    """Mağaza sunucu hatası (5xx) döndürdü ya da sayfa zaman aşımına uğradı"""
+
+    prefix = "Mağazaya ulaşılamadı"
+
+
+def is_blocked(error):
+    """Hata bir engelleme mi; kuyruk işçilerinden metin olarak da gelebilir"""
+    if isinstance(error, BlockedError):
+        return True
+    return isinstance(error, str) and error.startswith(BlockedError.prefix)
+
+
+def is_store_failure(error):
+    """Hata devre kesiciye sayılır mı (engel, zaman aşımı, 5xx)
+
+    Tek bir sayfanın 404 vermesi ya da fiyatının bulunamaması mağazanın
+    geri kalanını etkilemez.
+    """
+    if isinstance(error, StoreError):
+        return True
+    return isinstance(error, str) and error.startswith(
+        (BlockedError.prefix, StoreUnavailableError.prefix, StoreError.prefix)
+    )
+
+
+def detect_block(html=None, status=None, title=None):
+    """Yanıt bir engel ya da doğrulama sayfasıysa nedenini, değilse None döndürür
+
+    İşaretler ürün sayfalarında da geçebileceği için yalnızca fiyat
+    bulunamadığında çağrılmalıdır.
+    """
+    if status in BLOCK_STATUSES:
+        return f"HTTP {status}"
+    if title is None and html:
+        match = TITLE_PATTERN.search(html)
+        title = match.group(1).strip() if match else None
+    if title and BLOCK_TITLES.search(title):
+        return f"doğrulama sayfası ({title[:60]})"
+    if html:
+        match = BLOCK_MARKERS.search(html)
+        if match:
+            return f"bot koruması ({match.group(0)})"
+    return None
+
+
+def _jittered(seconds):
+    """Süreyi [yarısı, tamamı] aralığında rastgele seçer (eşit sapma)"""
+    return seconds / 2 + random.uniform(0, seconds / 2)
+
+
+class TokenBucket:
+    """Dakikada rate_per_minute istek, en fazla burst kadar art arda"""
+
+    def __init__(self, rate_per_minute, burst=1, clock=time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """Bir jeton için beklenecek süre; jeton varsa 0"""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+
+class CircuitBreaker:
+    """Art arda hatalarda mağazayı bekletir, eşik aşılınca devreyi açar
+
+    Kapalıyken her hata bir sonraki isteği backoff * 2^(hata-1) saniye
+    (sapmalı) geciktirir. failure_threshold art arda hatada ya da engelleme
+    görüldüğünde devre açılır ve cooldown * 2^(açılma-1) saniye (en fazla
+    max_cooldown) hiç istek gönderilmez. Süre dolunca tek bir deneme
+    isteğine izin verilir (yarı açık); başarılıysa devre kapanır. Sonucu
+    hiç gelmeyen deneme (sayfa kaldırıldı, kira iptal edildi) release ile
+    ya da en geç probe_timeout saniye sonra yeni bir denemeye yer açar.
+    """
+
+    def __init__(
+        self,
+        failure_threshold=5,
+        backoff=5.0,
+        cooldown=300.0,
+        max_cooldown=3600.0,
+        probe_wait=10.0,
+        probe_timeout=300.0,
+        clock=time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.probe_wait = probe_wait
+        self.probe_timeout = probe_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.retry_at = 0.0
+        # Yarı açıkken sonucu beklenen deneme isteği (sayfa anahtarı) ve son süresi
+        self.probe = None
+        self.probe_deadline = 0.0
+        self.reason = None
+
+    def check(self, key=None):
+        """İstek gönderilebilirse 0, değilse beklenecek süre"""
+        now = self.clock()
+        if self.state == OPEN:
+            if now < self.retry_at:
+                return self.retry_at - now
+            self.state = HALF_OPEN
+            self.probe = None
+        if self.state == HALF_OPEN:
+            if self.probe is not None and now < self.probe_deadline:
+                return self.probe_wait
+            self.probe = key or True
+            self.probe_deadline = now + self.probe_timeout
+            return 0.0
+        return max(0.0, self.retry_at - now)
+
+    def release(self, key=None):
+        """Sonucu gelmeyecek ya da mağaza hakkında bilgi vermeyen denemeyi bırakır"""
+        if self.probe is not None and (key is None or self.probe in (key, True)):
+            self.probe = None
+
+    def success(self):
+        """Başarılı istek; devreyi kapatır. Durum değiştiyse True döner"""
+        changed = self.state != CLOSED
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.retry_at = 0.0
+        self.probe = None
+        self.reason = None
+        return changed
+
+    def failure(self, reason=None, blocked=False):
+        """Başarısız istek; devre bu hatayla açıldıysa True döner"""
+        now = self.clock()
+        self.failures += 1
+        self.reason = reason
+        if self.state == OPEN:
+            # Devre açılmadan önce gönderilmiş isteklerin sonuçları beklemeyi uzatmaz
+            return False
+        if (
+            self.state == HALF_OPEN
+            or blocked
+            or self.failures >= self.failure_threshold
+        ):
+            self.trips += 1
+            cooldown = min(self.cooldown * 2 ** (self.trips - 1), self.max_cooldown)
+            self.state = OPEN
+            self.probe = None
+            self.retry_at = now + _jittered(cooldown)
+            return True
+        delay = min(self.backoff * 2 ** (self.failures - 1), self.cooldown)
+        self.retry_at = now + _jittered(delay)
+        return False
+
+
+class StoreGuard:
+    """Her mağaza için ayrı jeton kovası ve devre kesici
+
+    Ayarlar: {"default": {...}, "zara": {...}}; anahtarlar DEFAULTS ile
+    aynıdır. rate_per_minute boşsa hız sınırı uygulanmaz.
+    """
+
+    def __init__(self, settings=None):
+        settings = settings or {}
+        self.defaults = {**DEFAULTS, **(settings.get("default") or {})}
+        self.settings = settings
+        self.stores = {}
+
+    def _store(self, store):
+        state = self.stores.get(store)
+        if state is None:
+            options = {**self.defaults, **(self.settings.get(store) or {})}
+            state = self.stores[store] = {
+                "bucket": TokenBucket(options["rate_per_minute"], options["burst"])
+                if options["rate_per_minute"]
+                else None,
+                "breaker": CircuitBreaker(
+                    failure_threshold=options["failure_threshold"],
+                    backoff=options["backoff"],
+                    cooldown=options["cooldown"],
+                    max_cooldown=options["max_cooldown"],
+                    probe_timeout=options["probe_timeout"],
+                ),
+                "deferred": 0,
+                "blocked": 0,
+                "page_failures": 0,
+            }
+        return state
+
+    def acquire(self, store, key=None):
+        """İstek gönderilebilirse jeton harcar ve 0, değilse bekleme süresi döndürür"""
+        state = self._store(store)
+        bucket = state["bucket"]
+        wait = bucket.wait_time() if bucket is not None else 0.0
+        if not wait:
+            wait = state["breaker"].check(key)
+        if wait:
+            state["deferred"] += 1
+            return wait
+        if bucket is not None:
+            bucket.take()
+        return 0.0
+
+    def release(self, store, key=None):
+        """Sonucu işlenmeyecek kontrolün (kaldırılan sayfa, iptal edilen kira) denemesini bırakır"""
+        state = self.stores.get(store)
+        if state is not None:
+            state["breaker"].release(key)
+
+    def record(self, store, ok, error=None, key=None):
+        """Kontrol sonucunu mağazanın devre kesicisine işler
+
+        Yalnızca mağaza düzeyindeki hatalar (engel, zaman aşımı, 5xx) devreye
+        sayılır; tek sayfanın hatası sayılmaz ama yarı açık denemeyi bırakır.
+        """
+        state = self._store(store)
+        breaker = state["breaker"]
+        if ok:
+            if breaker.success():
+                logger.info(f"Mağaza yeniden açıldı: {store}")
+            return
+        if not is_store_failure(error):
+            state["page_failures"] += 1
+            breaker.release(key)
+            return
+        blocked = is_blocked(error)
+        if blocked:
+            state["blocked"] += 1
+        if breaker.failure(str(error) if error else None, blocked=blocked):
+            logger.warning(
+                f"Mağaza devre dışı: {store}, {breaker.retry_at - breaker.clock():.0f} sn "
+                f"({breaker.failures} hata, neden: {breaker.reason})"
+            )
+
+    def summary(self):
+        return {
+            store: {
+                "state": state["breaker"].state,
+                "failures": state["breaker"].failures,
+                "trips": state["breaker"].trips,
+                "retry_in": round(
+                    max(0.0, state["breaker"].retry_at - state["breaker"].clock()), 1
+                ),
+                "reason": state["breaker"].reason,
+                "deferred": state["deferred"],
+                "blocked": state["blocked"],
+                "page_failures": state["page_failures"],
+            }
+            for store, state in self.stores.items()
+        }
@@ -0,0 +1,224 @@
+"""Fiyat gözlemlerini SQLite'a toplu yazan kalıcı geçmiş deposu"""
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger("price_tracker.history")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_key TEXT NOT NULL,
+    url TEXT NOT NULL,
+    store TEXT NOT NULL,
+    price REAL,
+    old_price REAL,
+    checked_at REAL NOT NULL,
+    ok INTEGER NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_observations_product
+    ON observations (product_key, checked_at);
+CREATE TABLE IF NOT EXISTS product_state (
+    product_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    store TEXT NOT NULL,
+    last_price REAL,
+    last_check REAL
+);
+"""
+
+# Ürün başına günlük fiyat seviyeleri: her (gün, fiyat, eski fiyat) için gözlem
+# sayısı. Gözlemlerle aynı transaction'da güncellenir; fiyatlar az sayıda
+# farklı değer aldığından milyonlarca gözlem birkaç bin satıra iner ve
+# analytics modülü pencere istatistiklerini buradan hesaplar.
+LEVELS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_levels (
+    product_key TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    price REAL NOT NULL,
+    old_price REAL NOT NULL,
+    count INTEGER NOT NULL,
+    first_at REAL NOT NULL,
+    last_at REAL NOT NULL,
+    PRIMARY KEY (product_key, day, price, old_price)
+) WITHOUT ROWID;
+"""
+
+LEVELS_UPSERT = (
+    "INSERT INTO price_levels (product_key, day, price, old_price, count, first_at, last_at) "
+    "VALUES (?, ?, ?, ?, 1, ?, ?) "
+    "ON CONFLICT(product_key, day, price, old_price) DO UPDATE SET "
+    "count = count + 1, first_at = MIN(first_at, excluded.first_at), "
+    "last_at = MAX(last_at, excluded.last_at)"
+)
+
+SECONDS_PER_DAY = 86400
+
+_STOP = object()
+
+
+def product_key(url, store):
+    """Geçmiş kayıtlarında ürünü tanımlayan anahtar"""
+    return f"{store}:{url}"
+
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def ensure_price_levels(conn):
+    """Fiyat seviyeleri tablosunu oluşturur; boşsa mevcut gözlemlerden bir kez doldurur"""
+    conn.executescript(LEVELS_SCHEMA)
+    if conn.execute("SELECT 1 FROM price_levels LIMIT 1").fetchone():
+        return 0
+    with conn:
+        filled = conn.execute(
+            "INSERT INTO price_levels (product_key, day, price, old_price, count, first_at, last_at) "
+            "SELECT product_key, CAST(checked_at / ? AS INTEGER), price, COALESCE(old_price, 0), "
+            "COUNT(*), MIN(checked_at), MAX(checked_at) FROM observations "
+            "WHERE ok = 1 GROUP BY 1, 2, 3, 4",
+            (SECONDS_PER_DAY,),
+        ).rowcount
+    if filled:
+        logger.info(f"Fiyat seviyeleri geçmişten oluşturuldu: {filled} satır")
+    return filled
+
+
+class HistoryStore:
+    """Her gözlemi kaydeder; yazmalar arka planda toplu işlem olarak yapılır
+
+    Kontrol döngüsü yalnızca kuyruğa ekler. Yazıcı iş parçacığı kayıtları
+    batch_size dolunca ya da flush_interval saniyede bir tek transaction ile
+    yazar ve son bilinen ürün durumunu (product_state) aynı anda günceller.
+    """
+
+    def __init__(self, path, batch_size=100, flush_interval=5.0):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.written = 0
+
+        with connect(self.path) as conn:
+            conn.executescript(SCHEMA)
+            ensure_price_levels(conn)
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        logger.info(f"Fiyat geçmişi deposu açıldı: {self.path}")
+
+    def record(self, product, price_info=None, error=None, checked_at=None):
+        """Bir kontrol sonucunu yazma kuyruğuna ekler"""
+        price = price_info["current_price"] if price_info else None
+        old_price = price_info.get("old_price") if price_info else None
+        self.queue.put(
+            (
+                product_key(product["url"], product["store"]),
+                product["url"],
+                product["store"],
+                price,
+                old_price,
+                checked_at or time.time(),
+                1 if price else 0,
+                str(error) if error else None,
+            )
+        )
+
+    def _run(self):
+        conn = connect(self.path)
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+        try:
+            while not stopping:
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    if item is _STOP:
+                        stopping = True
+                    else:
+                        batch.append(item)
+                except queue.Empty:
+                    pass
+                if batch and (
+                    stopping
+                    or len(batch) >= self.batch_size
+                    or time.monotonic() >= deadline
+                ):
+                    self._write(conn, batch)
+                    batch = []
+                if time.monotonic() >= deadline:
+                    deadline = time.monotonic() + self.flush_interval
+        finally:
+            conn.close()
+
+    def _write(self, conn, batch):
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO observations (product_key, url, store, price, old_price, checked_at, ok, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    batch,
+                )
+                conn.executemany(
+                    "INSERT INTO product_state (product_key, url, store, last_price, last_check) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(product_key) DO UPDATE SET "
+                    "last_price = excluded.last_price, last_check = excluded.last_check "
+                    "WHERE excluded.last_check >= product_state.last_check",
+                    [row[:4] + (row[5],) for row in batch if row[6]],
+                )
+                conn.executemany(
+                    LEVELS_UPSERT,
+                    [
+                        (
+                            row[0],
+                            int(row[5] // SECONDS_PER_DAY),
+                            row[3],
+                            row[4] or 0,
+                            row[5],
+                            row[5],
+                        )
+                        for row in batch
+                        if row[6]
+                    ],
+                )
+            self.written += len(batch)
+            logger.debug(f"{len(batch)} gözlem yazıldı")
+        except sqlite3.Error as e:
+            logger.error(f"Fiyat geçmişi yazılamadı ({len(batch)} kayıt): {e}")
+
+    def load_state(self):
+        """Ürün anahtarı -> (son fiyat, son kontrol zamanı) sözlüğünü döndürür"""
+        with connect(self.path) as conn:
+            rows = conn.execute(
+                "SELECT product_key, last_price, last_check FROM product_state"
+            ).fetchall()
+        return {key: (price, checked) for key, price, checked in rows}
+
+    def history(self, url, store, since=None, limit=None):
+        """Bir ürünün gözlemlerini zamana göre sıralı döndürür"""
+        sql = (
+            "SELECT checked_at, price, old_price, ok, error FROM observations "
+            "WHERE product_key = ? AND checked_at >= ? ORDER BY checked_at"
+        )
+        params = [product_key(url, store), since or 0]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with connect(self.path) as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def close(self, timeout=30):
+        """Bekleyen kayıtları yazar ve yazıcıyı durdurur"""
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+        logger.info(f"Fiyat geçmişi kapatıldı: toplam {self.written} gözlem yazıldı")
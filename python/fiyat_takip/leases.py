@@ -0,0 +1,407 @@
+"""Ürün kontrollerini süreçler ve makineler arasında paylaştıran kira kuyruğu"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from .history import connect
+from .pool import CheckResult
+
+logger = logging.getLogger("price_tracker.leases")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS check_tasks (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    store TEXT NOT NULL,
+    options TEXT,
+    enqueued_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_check_tasks_lease
+    ON check_tasks (lease_expires, enqueued_at);
+CREATE TABLE IF NOT EXISTS check_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    url TEXT NOT NULL,
+    store TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    price_info TEXT,
+    error TEXT,
+    duration REAL NOT NULL,
+    started_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS queue_workers (
+    owner TEXT PRIMARY KEY,
+    last_seen REAL NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Kaydın sütunlarda tutulanlar dışındaki alanları (ör. liste sayfasının
+# max_pages/max_scrolls/page_param ayarları) options'ta JSON olarak taşınır
+TASK_COLUMNS = ("key", "url", "store")
+
+
+def _task_options(item):
+    options = {name: value for name, value in item.items() if name not in TASK_COLUMNS}
+    return json.dumps(options) if options else None
+
+
+def _task_item(key, url, store, options):
+    item = json.loads(options) if options else {}
+    item.update({"key": key, "url": url, "store": store})
+    return item
+
+
+class LeaseQueue:
+    """SQLite üzerinde kiralanabilir kontrol görevleri ve sonuçları
+
+    Koordinatör görevleri ekler ve sonuçları toplar; işçiler görevleri
+    lease_seconds süreliğine kiralar. Kirası dolan görev (ör. işçi öldüyse)
+    başka bir işçi tarafından yeniden alınır; max_attempts denemede
+    tamamlanamayan görev hata sonucu olarak koordinatöre döner.
+    """
+
+    def __init__(self, path, lease_seconds=120, max_attempts=3):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.conn = connect(self.path)
+        self.conn.isolation_level = None
+        self.conn.executescript(SCHEMA)
+        columns = {
+            row[1] for row in self.conn.execute("PRAGMA table_info(check_tasks)")
+        }
+        if "options" not in columns:
+            # Önceki sürümün kuyruk dosyası
+            self.conn.execute("ALTER TABLE check_tasks ADD COLUMN options TEXT")
+
+    def _transaction(self, work):
+        """work(conn) fonksiyonunu yazma kilidi alınmış tek transaction'da çalıştırır"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self.conn)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            return result
+
+    def reset(self):
+        """Önceki çalıştırmadan kalan görev ve sonuçları siler"""
+        self._transaction(
+            lambda conn: (
+                conn.execute("DELETE FROM check_tasks"),
+                conn.execute("DELETE FROM check_results"),
+            )
+        )
+
+    def enqueue(self, item):
+        """Sayfayı kuyruğa ekler; zaten kuyruktaysa eklemez"""
+
+        def work(conn):
+            return conn.execute(
+                "INSERT OR IGNORE INTO check_tasks (key, url, store, options, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    item["key"],
+                    item["url"],
+                    item["store"],
+                    _task_options(item),
+                    time.time(),
+                ),
+            ).rowcount
+
+        return bool(self._transaction(work))
+
+    def cancel(self, key):
+        self._transaction(
+            lambda conn: conn.execute("DELETE FROM check_tasks WHERE key = ?", (key,))
+        )
+
+    def lease(self, owner, limit):
+        """En eski boştaki (ya da kirası dolmuş) en fazla limit görevi kiralar"""
+
+        def work(conn):
+            now = time.time()
+            rows = conn.execute(
+                "SELECT key, url, store, options FROM check_tasks "
+                "WHERE attempts < ? AND (lease_expires IS NULL OR lease_expires < ?) "
+                "ORDER BY enqueued_at LIMIT ?",
+                (self.max_attempts, now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE check_tasks SET lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE key = ?",
+                [(owner, now + self.lease_seconds, row[0]) for row in rows],
+            )
+            conn.execute(
+                "INSERT INTO queue_workers (owner, last_seen) VALUES (?, ?) "
+                "ON CONFLICT(owner) DO UPDATE SET last_seen = excluded.last_seen",
+                (owner, now),
+            )
+            return [_task_item(*row) for row in rows]
+
+        return self._transaction(work) if limit > 0 else []
+
+    def heartbeat(self, owner):
+        """İşçinin elindeki kiraları uzatır; uzun süren kontroller kaybedilmez"""
+
+        def work(conn):
+            now = time.time()
+            conn.execute(
+                "UPDATE check_tasks SET lease_expires = ? WHERE lease_owner = ?",
+                (now + self.lease_seconds, owner),
+            )
+            conn.execute(
+                "UPDATE queue_workers SET last_seen = ? WHERE owner = ?", (now, owner)
+            )
+
+        self._transaction(work)
+
+    def complete(self, owner, item, price_info, error, duration, started_at):
+        """Sonucu koordinatöre bırakır; kira başkasına geçtiyse sonucu atar"""
+
+        def work(conn):
+            released = conn.execute(
+                "DELETE FROM check_tasks WHERE key = ? AND lease_owner = ?",
+                (item["key"], owner),
+            ).rowcount
+            if not released:
+                return False
+            conn.execute(
+                "INSERT INTO check_results "
+                "(key, url, store, owner, price_info, error, duration, started_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    item["key"],
+                    item["url"],
+                    item["store"],
+                    owner,
+                    json.dumps(price_info) if price_info else None,
+                    str(error) if error else None,
+                    duration,
+                    started_at,
+                ),
+            )
+            conn.execute(
+                "UPDATE queue_workers SET completed = completed + 1, last_seen = ? "
+                "WHERE owner = ?",
+                (time.time(), owner),
+            )
+            return True
+
+        return self._transaction(work)
+
+    def release(self, owner):
+        """Kapanan işçinin bitmemiş kiralarını deneme sayılmadan geri bırakır"""
+
+        def work(conn):
+            conn.execute(
+                "UPDATE check_tasks SET lease_owner = NULL, lease_expires = NULL, "
+                "attempts = MAX(attempts - 1, 0) WHERE lease_owner = ?",
+                (owner,),
+            )
+            conn.execute("DELETE FROM queue_workers WHERE owner = ?", (owner,))
+
+        self._transaction(work)
+
+    def collect(self, limit=500):
+        """Biriken sonuçları ve deneme hakkı biten görevleri alıp kuyruktan siler"""
+
+        def work(conn):
+            rows = conn.execute(
+                "SELECT id, key, url, store, owner, price_info, error, duration, started_at "
+                "FROM check_results ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+            if rows:
+                conn.execute("DELETE FROM check_results WHERE id <= ?", (rows[-1][0],))
+            results = [
+                {
+                    "item": {"key": key, "url": url, "store": store},
+                    "owner": owner,
+                    "price_info": json.loads(price_info) if price_info else None,
+                    "error": error,
+                    "duration": duration,
+                    "started_at": started_at,
+                }
+                for _, key, url, store, owner, price_info, error, duration, started_at in rows
+            ]
+
+            now = time.time()
+            abandoned = conn.execute(
+                "SELECT key, url, store, lease_owner FROM check_tasks "
+                "WHERE attempts >= ? AND lease_expires < ?",
+                (self.max_attempts, now),
+            ).fetchall()
+            for key, url, store, owner in abandoned:
+                conn.execute("DELETE FROM check_tasks WHERE key = ?", (key,))
+                results.append(
+                    {
+                        "item": {"key": key, "url": url, "store": store},
+                        "owner": owner or "-",
+                        "price_info": None,
+                        "error": f"{self.max_attempts} denemede tamamlanamadı",
+                        "duration": 0.0,
+                        "started_at": now,
+                    }
+                )
+            return results
+
+        return self._transaction(work)
+
+    def depth(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM check_tasks").fetchone()[0]
+
+    def workers(self, within=None):
+        """Son `within` saniyede (varsayılan: kira süresi) görülen işçiler"""
+        since = time.time() - (within or self.lease_seconds)
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT owner, last_seen, completed FROM queue_workers "
+                "WHERE last_seen >= ? ORDER BY owner",
+                (since,),
+            ).fetchall()
+        return {
+            owner: {"last_seen": last_seen, "completed": completed}
+            for owner, last_seen, completed in rows
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class LeasePool:
+    """Koordinatör tarafında WorkerPool yerine geçen, kuyruğa yazan havuz
+
+    Kontrolleri yerelde çalıştırmaz; submit görevi kuyruğa ekler, get_result
+    işçilerin bıraktığı sonuçları CheckResult olarak döndürür.
+    """
+
+    remote = True
+
+    def __init__(self, lease_queue, poll_interval=0.5):
+        self.queue = lease_queue
+        self.poll_interval = poll_interval
+        self.results = deque()
+
+    @property
+    def alive(self):
+        return len(self.queue.workers())
+
+    @property
+    def size(self):
+        return self.alive
+
+    def start(self):
+        self.queue.reset()
+        logger.info(f"Kira kuyruğu hazır: {self.queue.path}")
+
+    def submit(self, item):
+        self.queue.enqueue(item)
+
+    def cancel(self, key):
+        self.queue.cancel(key)
+
+    def get_result(self, timeout=None):
+        """İşçilerden gelen bir sonucu döndürür, süre dolarsa None"""
+        deadline = time.monotonic() + (timeout or 0)
+        while True:
+            if self.results:
+                return self.results.popleft()
+            try:
+                collected = self.queue.collect()
+            except sqlite3.Error as e:
+                logger.warning(f"Kira kuyruğu okunamadı: {e}")
+                collected = []
+            for row in collected:
+                # Duvar saatindeki başlangıç anı planlayıcının saatine çevrilir
+                started = time.monotonic() - max(0.0, time.time() - row["started_at"])
+                self.results.append(
+                    CheckResult(
+                        row["item"],
+                        row["price_info"],
+                        row["error"],
+                        row["duration"],
+                        row["owner"],
+                        started,
+                    )
+                )
+            if self.results:
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(self.poll_interval, remaining))
+
+    def queue_depth(self):
+        return self.queue.depth()
+
+    def summary(self):
+        return {
+            "depth": self.queue.depth(),
+            "lease_seconds": self.queue.lease_seconds,
+            "workers": self.queue.workers(),
+        }
+
+    def shutdown(self, timeout=30):
+        self.queue.close()
+
+
+def serve(lease_queue, pool, owner, poll_interval=1.0):
+    """Kuyruktan kiraladığı kontrolleri yerel işçi havuzunda çalıştırır
+
+    Havuzda boş işçi kadar görev kiralanır; kiralar lease_seconds/3'te bir
+    uzatılır. Çıkışta bitmemiş kiralar diğer işçiler için geri bırakılır.
+    """
+    in_flight = 0
+    completed = 0
+    last_beat = 0.0
+    logger.info(f"Kuyruk işçisi başladı: {owner} ({pool.size} işçi)")
+    try:
+        while True:
+            if time.monotonic() - last_beat >= lease_queue.lease_seconds / 3:
+                lease_queue.heartbeat(owner)
+                last_beat = time.monotonic()
+
+            for item in lease_queue.lease(owner, pool.alive - in_flight):
+                pool.submit(item)
+                in_flight += 1
+
+            result = pool.get_result(timeout=poll_interval)
+            if result is None:
+                if pool.alive == 0:
+                    raise RuntimeError("Çalışan işçi kalmadı")
+                continue
+            in_flight -= 1
+            # Sonuç diğer makinelerin okuyabileceği duvar saatiyle yazılır
+            started_at = time.time() - (time.monotonic() - result.started)
+            if lease_queue.complete(
+                owner,
+                result.item,
+                result.value,
+                result.error,
+                result.duration,
+                started_at,
+            ):
+                completed += 1
+            else:
+                logger.warning(
+                    f"Kira süresi dolmuş, sonuç atıldı: {result.item['url']}"
+                )
+    finally:
+        lease_queue.release(owner)
+        logger.info(f"Kuyruk işçisi durdu: {owner}, {completed} kontrol tamamlandı")
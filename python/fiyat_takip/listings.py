@@ -0,0 +1,264 @@
+"""Kategori ve arama sayfalarından ürün kartlarının fiyatlarını toplu okuma"""
+
+import json
+import logging
+import re
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from .fanout import group_key, normalize_url
+from .fastpath import JSON_LD_PATTERN, MARKUP_PATTERNS
+
+logger = logging.getLogger("price_tracker.listings")
+
+# Ürün adresindeki mağaza ürün numarası (ör. ...-p04786041.html, ...-l03240520)
+PRODUCT_ID_PATTERNS = {
+    "zara": re.compile(r"-p(\d{5,})\.html"),
+    "pull&bear": re.compile(r"-l(\d{5,})(?:\.html)?$"),
+}
+
+# Liste sayfasındaki ürün kartları ve kart içindeki fiyat elementleri
+LISTING_SELECTORS = {
+    "zara": {
+        "tile": "li.product-grid-product",
+        "link": "a[href]",
+        "current": "[data-qa-qualifier='price-amount-current'] .money-amount__main, "
+        ".price-current__amount .money-amount__main",
+        "old": "[data-qa-qualifier='price-amount-old'] .money-amount__main, "
+        ".price-old__amount .money-amount__main",
+    },
+    "pull&bear": {
+        "tile": ".grid-product, .product-card",
+        "link": "a[href]",
+        "current": ".price-current-price, .product-price--current",
+        "old": ".price-old, .product-price--old",
+    },
+}
+
+# Aynı kartların sunucu HTML'indeki başlangıçları (hızlı yol)
+TILE_PATTERNS = {
+    "zara": re.compile(r'<li[^>]+class="[^"]*\bproduct-grid-product\b[^"]*"'),
+    "pull&bear": re.compile(
+        r'<(?:div|li|article)[^>]+class="[^"]*\b(?:grid-product|product-card)\b[^"]*"'
+    ),
+}
+HREF_PATTERN = re.compile(r'<a[^>]+href="([^"]+)"')
+
+# Tembel yüklenen kartların gelmesi için kaydırmalar arası bekleme
+SCROLL_PAUSE = 1.0
+
+# Sayfanın sonuna kaydırır ve o ana kadar yüklenen kart sayısını döndürür
+SCROLL_SCRIPT = """
+window.scrollTo(0, document.body.scrollHeight);
+return document.querySelectorAll(arguments[0]).length;
+"""
+
+# Tüm kartların bağlantı ve fiyat metinlerini tek çağrıda okur
+HARVEST_SCRIPT = """
+var selectors = arguments[0];
+var tiles = document.querySelectorAll(selectors.tile);
+var out = [];
+function text(root, selector) {
+    var el = selector ? root.querySelector(selector) : null;
+    return el ? (el.innerText || el.textContent).trim() : null;
+}
+for (var i = 0; i < tiles.length; i++) {
+    var link = tiles[i].matches('a[href]') ? tiles[i] : tiles[i].querySelector(selectors.link);
+    if (!link) {
+        continue;
+    }
+    out.push({
+        href: link.href,
+        current: text(tiles[i], selectors.current),
+        old: text(tiles[i], selectors.old)
+    });
+}
+return out;
+"""
+
+
+def store_of(url):
+    """Adresin ait olduğu mağaza; tanınmıyorsa None"""
+    host = urlsplit(url).netloc.lower()
+    if "zara." in host:
+        return "zara"
+    if "pullandbear." in host:
+        return "pull&bear"
+    return None
+
+
+def product_id(url, store):
+    """Ürün sayfası ya da kart bağlantısındaki mağaza ürün numarası"""
+    pattern = PRODUCT_ID_PATTERNS.get(store)
+    if pattern is None or not url:
+        return None
+    match = pattern.search(urlsplit(url).path.rstrip("/"))
+    return match.group(1) if match else None
+
+
+def listing_page_url(url, number, param="page"):
+    """Sayfalı listelerde number. sayfanın adresi; ilk sayfa adresin kendisidir"""
+    if number <= 1:
+        return url
+    parts = urlsplit(url)
+    query = [(name, value) for name, value in parse_qsl(parts.query) if name != param]
+    query.append((param, str(number)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _walk_items(node):
+    """JSON-LD ItemList öğelerinden (adres, fiyat) çiftlerini toplar"""
+    if isinstance(node, list):
+        for item in node:
+            yield from _walk_items(item)
+    elif isinstance(node, dict):
+        if "@graph" in node:
+            yield from _walk_items(node["@graph"])
+        if "itemListElement" in node:
+            yield from _walk_items(node["itemListElement"])
+            return
+        item = node.get("item") if isinstance(node.get("item"), dict) else node
+        offers = item.get("offers")
+        offer = offers[0] if isinstance(offers, list) and offers else offers
+        if item.get("url") and isinstance(offer, dict):
+            price = offer.get("price", offer.get("lowPrice"))
+            if price is not None:
+                yield item["url"], price
+
+
+def tiles_from_html(html, adapter, base_url):
+    """Liste sayfasının HTML'inden kartları HARVEST_SCRIPT ile aynı biçimde çıkarır
+
+    JSON-LD listesindeki fiyatlar yapısal veri olduğu için burada sayıya çevrilir.
+    """
+    store = adapter.name
+    tiles = []
+    pattern = TILE_PATTERNS.get(store)
+    starts = [match.start() for match in pattern.finditer(html)] if pattern else []
+    for index, start in enumerate(starts):
+        end = starts[index + 1] if index + 1 < len(starts) else len(html)
+        chunk = html[start:end]
+        link = HREF_PATTERN.search(chunk)
+        if not link:
+            continue
+        texts = {}
+        for key, price_pattern in MARKUP_PATTERNS.get(store, {}).items():
+            match = price_pattern.search(chunk)
+            texts[key] = match.group(1).strip() if match else None
+        tiles.append(
+            {
+                "href": urljoin(base_url, link.group(1)),
+                "current": texts.get("current"),
+                "old": texts.get("old"),
+            }
+        )
+    if tiles:
+        return tiles
+
+    for block in JSON_LD_PATTERN.findall(html):
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        for url, price in _walk_items(data):
+            try:
+                value = adapter.parse_number(price)
+            except ValueError:
+                continue
+            tiles.append(
+                {"href": urljoin(base_url, url), "current": value, "old": None}
+            )
+    return tiles
+
+
+def harvest_tiles(tiles, adapter):
+    """Kart listesini {ürün numarası: fiyat bilgisi} sözlüğüne çevirir"""
+    prices = {}
+    for tile in tiles:
+        pid = product_id(tile.get("href"), adapter.name)
+        if pid is None or pid in prices:
+            continue
+        current_text = tile.get("current")
+        old_text = tile.get("old")
+        if not current_text:
+            # Zara'da yalnızca liste fiyatı varsa o güncel fiyattır
+            current_text, old_text = old_text, None
+        if not current_text:
+            continue
+        try:
+            current = adapter.parse(current_text)
+            old_price = adapter.parse(old_text) if old_text else None
+        except ValueError:
+            logger.debug(f"Kart fiyatı ayrıştırılamadı: {current_text!r}")
+            continue
+        if current:
+            prices[pid] = {
+                "current_price": current,
+                "old_price": old_price,
+                "current_price_text": current_text,
+                "old_price_text": old_text,
+            }
+    return prices
+
+
+class Listing:
+    """Fiyatları toplu okunan bir kategori ya da arama sayfası
+
+    Sayfada kartı bulunan takipçilerin sayfaları kendi yüklemelerini
+    beklemeden bu sonuçla güncellenir.
+    """
+
+    def __init__(
+        self,
+        url,
+        store=None,
+        check_interval=None,
+        max_pages=1,
+        max_scrolls=10,
+        page_param="page",
+    ):
+        self.store = (store or store_of(url) or "").lower()
+        if self.store not in LISTING_SELECTORS:
+            raise ValueError(f"Liste sayfası için desteklenmeyen mağaza: {url}")
+        self.url = url.strip()
+        self.key = f"listing:{group_key(url, self.store)}"
+        self.check_interval = check_interval
+        self.max_pages = max(1, int(max_pages))
+        self.max_scrolls = max(0, int(max_scrolls))
+        self.page_param = page_param
+        self.last_check = None
+        self.last_error = None
+        self.last_duration = None
+        self.found = 0
+        self.matched = 0
+        self.satisfied = 0
+
+    @property
+    def page(self):
+        """İşçi havuzuna giden liste kaydı"""
+        return {
+            "key": self.key,
+            "url": self.url,
+            "store": self.store,
+            "kind": "listing",
+            "max_pages": self.max_pages,
+            "max_scrolls": self.max_scrolls,
+            "page_param": self.page_param,
+        }
+
+    def summary(self):
+        return {
+            "url": normalize_url(self.url),
+            "store": self.store,
+            "check_interval": self.check_interval,
+            "last_check": self.last_check.isoformat() if self.last_check else None,
+            "last_error": self.last_error,
+            "last_duration": self.last_duration,
+            "products_found": self.found,
+            "products_matched": self.matched,
+            "page_loads_saved": self.satisfied,
+        }
+
+
+def is_listing(item):
+    """Kuyruktan gelen kayıt bir liste sayfası mı (eski kuyruk kayıtlarında yalnızca anahtar vardır)"""
+    return item.get("kind") == "listing" or item["key"].startswith("listing:")
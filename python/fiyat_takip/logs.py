@@ -0,0 +1,179 @@
+"""Boyutu sınırlı, dönen ve sondaki kayıtları sabit sürede okunabilen log dosyası"""
+
+import gzip
+import json
+import logging
+import os
+import shutil
+import struct
+import threading
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+# İndeks dosyası: başlık (toplam kayıt, kapasite) + kapasite kadar kayıt başlangıç ofseti
+INDEX_HEADER = struct.Struct("<QQ")
+INDEX_SLOT = struct.Struct("<Q")
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+logger = logging.getLogger("price_tracker.logs")
+
+
+class JsonFormatter(logging.Formatter):
+    """Her kaydı tek satırlık bir JSON nesnesi olarak yazar"""
+
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created).strftime(DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class TailIndex:
+    """Son `capacity` kaydın dosyadaki başlangıç ofsetlerini tutan halka tampon"""
+
+    def __init__(self, path, capacity=200):
+        self.path = path
+        self.capacity = capacity
+        exists = os.path.exists(path)
+        self.file = open(path, "r+b" if exists else "w+b")
+        self.count = 0
+        if exists:
+            header = self.file.read(INDEX_HEADER.size)
+            if len(header) == INDEX_HEADER.size:
+                count, stored_capacity = INDEX_HEADER.unpack(header)
+                if stored_capacity == capacity:
+                    self.count = count
+        if self.count == 0:
+            self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.file.seek(0)
+        self.file.write(INDEX_HEADER.pack(0, self.capacity))
+        self.file.write(b"\0" * INDEX_SLOT.size * self.capacity)
+        self.file.truncate()
+        self.file.flush()
+
+    def append(self, offset):
+        slot = self.count % self.capacity
+        self.file.seek(INDEX_HEADER.size + slot * INDEX_SLOT.size)
+        self.file.write(INDEX_SLOT.pack(offset))
+        self.count += 1
+        self.file.seek(0)
+        self.file.write(INDEX_HEADER.pack(self.count, self.capacity))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """Boyut sınırında dönen, eski parçaları gzip'leyen ve kuyruk indeksi tutan handler"""
+
+    def __init__(self, filename, max_bytes, backup_count, index_capacity=200):
+        super().__init__(
+            filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        self.namer = lambda name: f"{name}.gz"
+        self.rotator = self._compress
+        self.index_lock = threading.Lock()
+        self.index = TailIndex(f"{self.baseFilename}.idx", index_capacity)
+
+    @staticmethod
+    def _compress(source, dest):
+        with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+    def doRollover(self):
+        super().doRollover()
+        self.index.reset()
+
+    def emit(self, record):
+        # RotatingFileHandler.emit dönüşü yapar, sonra yazar; ofseti yazmadan önce al
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.flush()
+            offset = self.stream.tell()
+            logging.FileHandler.emit(self, record)
+            with self.index_lock:
+                self.index.append(offset)
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        super().close()
+        self.index.close()
+
+
+def read_tail(log_path, count=20):
+    """İndeks yardımıyla son `count` kaydı dosyanın boyutundan bağımsız okur"""
+    index_path = f"{log_path}.idx"
+    if not os.path.exists(index_path):
+        return []
+    with open(index_path, "rb") as f:
+        total, capacity = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+        wanted = min(count, total, capacity)
+        if not wanted:
+            return []
+        slot = (total - wanted) % capacity
+        f.seek(INDEX_HEADER.size + slot * INDEX_SLOT.size)
+        (offset,) = INDEX_SLOT.unpack(f.read(INDEX_SLOT.size))
+    with open(log_path, "rb") as f:
+        f.seek(offset)
+        lines = f.read().decode("utf-8", errors="replace").splitlines()
+    return lines[-count:]
+
+
+def setup_logging(
+    log_path=None,
+    log_format="text",
+    max_bytes=10 * 1024 * 1024,
+    backup_count=5,
+    levels=None,
+    console=True,
+):
+    """Kök logger'ı yapılandırır; levels bileşen başına seviye verir
+
+    Örnek: {"price_tracker.browser": "WARNING"} gürültülü tarayıcı loglarını kısar.
+    """
+    if log_format == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT)
+
+    root = logging.getLogger("")
+    root.setLevel(logging.INFO)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    if log_path:
+        os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+        file_handler = CompressingRotatingFileHandler(log_path, max_bytes, backup_count)
+        file_handler.setFormatter(formatter)
+        root.addHandler(file_handler)
+
+    if console or not log_path:
+        # Hem konsola hem de dosyaya yazmak için
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT))
+        root.addHandler(stream_handler)
+
+    for name, level in (levels or {}).items():
+        level = str(level).strip().upper()
+        # getLevelName bilinen adlar için sayısal seviyeyi döndürür
+        if not isinstance(logging.getLevelName(level), int):
+            logger.warning(
+                f"Bilinmeyen log seviyesi: {name}={level}, INFO kullanılıyor"
+            )
+            level = "INFO"
+        logging.getLogger(name).setLevel(level)
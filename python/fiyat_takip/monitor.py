@@ -0,0 +1,1581 @@
+"""Fiyat takibinin çekirdeği: tarayıcı işçisi ve ürünleri planlayan izleyici
+
+Bu modül içe aktarıldığında yan etki oluşturmaz; Selenium yalnızca ilk
+tarayıcı kontrolünde yüklenir. Komut satırı arayüzü price-tracker.py'dedir.
+"""
+
+import itertools
+import logging
+import os
+import time
+from datetime import datetime
+
+from .adaptive import AdaptivePolicy
+from .blocking import PageMetrics, ResourceBlocker, measure_page
+from .drivers import DriverLifecycle
+from .fanout import WatchIndex, group_key, normalize_url
+from .fastpath import HttpPriceFetcher
+from .guard import (
+    BlockedError,
+    StoreError,
+    StoreGuard,
+    StoreUnavailableError,
+    detect_block,
+)
+from .listings import (
+    HARVEST_SCRIPT,
+    LISTING_SELECTORS,
+    SCROLL_PAUSE,
+    SCROLL_SCRIPT,
+    Listing,
+    harvest_tiles,
+    is_listing,
+    listing_page_url,
+    product_id,
+    tiles_from_html,
+)
+from .pool import WorkerPool
+from .scheduler import Scheduler
+from .status import Metrics, StatusWriter
+from .stores import StoreRegistry
+from .variants import (
+    DOM_SELECTORS,
+    VARIANT_SCRIPT,
+    build_variants,
+    match_variant,
+    variant_key,
+    variant_label,
+    variant_spec,
+)
+from .waits import (
+    DEFAULT_WAIT_CAP,
+    WaitHistogram,
+    wait_for_cascade,
+    wait_for_selectors,
+)
+
+logger = logging.getLogger("price_tracker")
+browser_logger = logging.getLogger("price_tracker.browser")
+
+
+def validate_fields(values):
+    """Ürün alanlarının tiplerini, durum değiştirilmeden önce doğrular (ValueError)"""
+    for name in ("url", "store"):
+        if values.get(name) is not None and not isinstance(values[name], str):
+            raise ValueError(f"{name} metin olmalı")
+    target_price = values.get("target_price", values.get("targetPrice"))
+    if target_price is not None:
+        try:
+            float(target_price)
+        except (TypeError, ValueError):
+            raise ValueError(f"Geçersiz hedef fiyat: {target_price!r}")
+    interval = values.get("check_interval")
+    if interval is not None and (
+        isinstance(interval, bool)
+        or not isinstance(interval, (int, float))
+        or interval <= 0
+    ):
+        raise ValueError(f"Geçersiz kontrol aralığı: {interval!r}")
+
+
+class BrowserWorker:
+    """Kendi Chrome driver'ı ile mağaza sayfalarını kontrol eden işçi"""
+
+    def __init__(
+        self,
+        name="worker-0",
+        wait_caps=None,
+        wait_stats=None,
+        fetcher=None,
+        blocker=None,
+        page_metrics=None,
+        lifecycle=None,
+        recorder=None,
+        stores=None,
+    ):
+        self.name = name
+        self.stores = stores or StoreRegistry()
+        self.wait_caps = wait_caps or {}
+        self.wait_stats = wait_stats
+        self.fetcher = fetcher
+        self.blocker = blocker
+        self.page_metrics = page_metrics
+        self.blocked_store = None
+        self.lifecycle = lifecycle or DriverLifecycle()
+        self.recorder = recorder
+        self.page_loads = 0
+        # Driver, hızlı yol yetmediğinde ilk ihtiyaçta açılır
+        self.driver = None
+        if fetcher is None:
+            self.setup_driver()
+
+    def setup_driver(self):
+        """Selenium driver'ı ayarlar"""
+        # Selenium'un yüklenmesi uzun sürer; hızlı yolun yettiği çalıştırmalarda hiç yüklenmez
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+
+        browser_logger.info(f"[{self.name}] Chrome Driver ayarlanıyor...")
+        chrome_options = Options()
+        chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+        chrome_options.add_argument("--window-size=1920,1080")
+        chrome_options.add_argument(
+            "user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+        )
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option("useAutomationExtension", False)
+        if self.blocker is not None and self.blocker.enabled:
+            chrome_options.add_experimental_option("prefs", self.blocker.chrome_prefs())
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        if self.lifecycle.browser_path:
+            chrome_options.binary_location = self.lifecycle.browser_path
+
+        try:
+            self.driver = webdriver.Chrome(
+                service=Service(self.lifecycle.driver_path()), options=chrome_options
+            )
+            self.driver.execute_script(
+                "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+            )
+            self.blocked_store = None
+            self.page_loads = 0
+            browser_logger.info(f"[{self.name}] Chrome Driver başarıyla ayarlandı")
+        except Exception as e:
+            browser_logger.error(f"Chrome Driver ayarlanırken hata oluştu: {e}")
+            # Önbellekteki driver yolu bozuk olabilir, sonraki denemede yeniden çöz
+            self.lifecycle.invalidate()
+            raise
+
+    def close(self):
+        """Driver'ı kapatır"""
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            finally:
+                self.driver = None
+
+    def driver_alive(self):
+        """Chrome hâlâ komutlara yanıt veriyor mu"""
+        if self.driver is None:
+            return True
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def restart_driver(self, reason):
+        """Driver'ı kapatıp yenisini açar; takip süreci çalışmaya devam eder"""
+        browser_logger.warning(f"[{self.name}] Driver yeniden başlatılıyor: {reason}")
+        try:
+            self.close()
+        except Exception as e:
+            browser_logger.warning(f"[{self.name}] Eski driver kapatılamadı: {e}")
+        self.lifecycle.report(self.name, restarts=1)
+        self.setup_driver()
+
+    def after_page_load(self):
+        """Bellek ve sayfa sayısını raporlar, eşik aşıldıysa driver'ı geri dönüştürür"""
+        if self.driver is None:
+            return
+        rss_mb = self.lifecycle.driver_rss(self.driver)
+        self.lifecycle.report(self.name, rss_mb=rss_mb, page_loads=self.page_loads)
+        reason = self.lifecycle.should_recycle(self.page_loads, rss_mb)
+        if reason:
+            browser_logger.info(f"[{self.name}] Driver geri dönüştürülüyor ({reason})")
+            self.lifecycle.report(self.name, restarts=1)
+            # Yenisi bir sonraki tarayıcı kontrolünde açılır
+            try:
+                self.close()
+            except Exception as e:
+                browser_logger.warning(f"[{self.name}] Driver kapatılamadı: {e}")
+
+    def check(self, product):
+        """Ürünün mağazasına göre fiyatı kontrol eder"""
+        if is_listing(product):
+            try:
+                return self.check_listing(product)
+            finally:
+                self.after_page_load()
+
+        browser_logger.info(f"\n[{self.name}] Ürün kontrol ediliyor: {product['url']}")
+
+        # Önce tarayıcısız hızlı yolu dene, olmazsa Selenium'a geri düş
+        if self.fetcher is not None and self.fetcher.supports(product["store"]):
+            price_info = self.fetcher.fetch_price(product["url"], product["store"])
+            if price_info:
+                return price_info
+            browser_logger.info(
+                "Hızlı yol sonuç vermedi, Selenium ile kontrol ediliyor..."
+            )
+
+        try:
+            price_info = self.check_in_browser(product)
+            if price_info is None and not self.driver_alive():
+                # Chrome çökmüşse tek bir işçiyi yeniden başlat ve bir kez daha dene
+                self.lifecycle.report(self.name, crashes=1)
+                self.restart_driver("Chrome yanıt vermiyor")
+                price_info = self.check_in_browser(product)
+        finally:
+            self.after_page_load()
+        return price_info
+
+    def prepare_driver(self, store):
+        """Driver'ı gerekirse açar ve mağazanın engel listesini uygular"""
+        if self.driver is None:
+            self.setup_driver()
+
+        # Engel listesi mağaza değiştiğinde güncellenir
+        if self.blocker is not None and self.blocked_store != store:
+            self.blocker.apply(self.driver, store)
+            self.blocked_store = store
+
+    def check_listing(self, listing):
+        """Liste sayfasındaki tüm ürün kartlarının fiyatlarını toplar
+
+        Sayfalar sırayla açılır (en fazla max_pages); yeni ürün çıkmayınca
+        durulur. İlk sayfa tarayıcısız okunabildiyse sonrakiler de öyle
+        okunur, okunamadıysa Chrome'da kaydırılarak yüklenir. İlk sayfadan
+        sonraki hatalar o ana kadar toplanan fiyatları düşürmez.
+        """
+        store = listing["store"]
+        prices = {}
+        use_http = self.fetcher is not None and self.fetcher.supports(store)
+        for number in range(1, listing.get("max_pages", 1) + 1):
+            url = listing_page_url(
+                listing["url"], number, listing.get("page_param", "page")
+            )
+            browser_logger.info(f"\n[{self.name}] Liste sayfası okunuyor: {url}")
+            try:
+                found = self.harvest_page(url, store, listing, use_http)
+            except StoreError:
+                raise
+            except Exception as e:
+                if number == 1:
+                    raise
+                browser_logger.warning(f"Liste sayfası {number} okunamadı: {e}")
+                break
+            if number == 1 and use_http and not found:
+                # Kartlar tarayıcıda oluşturuluyor; kalan sayfalar Chrome'la okunur
+                use_http = False
+                found = self.harvest_page(url, store, listing, use_http)
+            new = found.keys() - prices.keys()
+            prices.update(found)
+            browser_logger.info(
+                f"Liste sayfası {number}: {len(found)} ürün ({len(new)} yeni)"
+            )
+            if not new:
+                break
+        return {"listing": prices}
+
+    def harvest_page(self, url, store, listing, use_http):
+        if use_http:
+            try:
+                html = self.fetcher.fetch_html(url, store)
+            except StoreError:
+                raise
+            except Exception as e:
+                browser_logger.info(f"Hızlı yol liste sayfasını okuyamadı: {e}")
+                return {}
+            adapter = self.stores.get(store)
+            return harvest_tiles(tiles_from_html(html, adapter, url), adapter)
+        return self.harvest_in_browser(url, store, listing.get("max_scrolls", 10))
+
+    def harvest_in_browser(self, url, store, max_scrolls):
+        """Liste sayfasını Chrome'da açar, kartlar bitene kadar kaydırır ve fiyatları okur"""
+        selectors = LISTING_SELECTORS[store]
+        self.prepare_driver(store)
+        self.page_loads += 1
+        self.driver.get(url)
+        self.raise_if_blocked(store, title_only=True)
+
+        cap = self.wait_caps.get(store, DEFAULT_WAIT_CAP)
+        _, waited, matched = wait_for_selectors(
+            self.driver, {"tile": selectors["tile"]}, cap=cap
+        )
+        if not matched:
+            browser_logger.warning("Liste sayfasında ürün kartı bulunamadı!")
+            self.raise_if_blocked(store)
+            return {}
+
+        # Tembel yüklenen kartlar için sayı artmayana kadar sayfa sonuna kaydır
+        count = 0
+        for _ in range(max_scrolls):
+            loaded = self.driver.execute_script(SCROLL_SCRIPT, selectors["tile"])
+            if loaded <= count:
+                break
+            count = loaded
+            time.sleep(SCROLL_PAUSE)
+        tiles = self.driver.execute_script(HARVEST_SCRIPT, selectors) or []
+        return harvest_tiles(tiles, self.stores.get(store))
+
+    def check_in_browser(self, product):
+        """Ürünü Chrome'da açıp mağazanın fiyat kurallarıyla fiyatı okur"""
+        adapter = self.stores.get(product["store"])
+        if adapter is None:
+            browser_logger.warning(f"Desteklenmeyen mağaza: {product['store']}")
+            return None
+        self.prepare_driver(product["store"])
+        self.page_loads += 1
+        price_info = self.check_price(adapter, product["url"])
+        if price_info:
+            browser_logger.info(
+                f"Mevcut fiyat: {price_info['current_price']}, Eski liste fiyatı: {price_info['old_price']}"
+            )
+
+        if self.recorder is not None and self.recorder.wants(price_info):
+            self.record_page(product, price_info)
+        if price_info:
+            price_info["variants"] = self.read_variants(adapter, price_info)
+        return price_info
+
+    def record_page(self, product, price_info):
+        """Chrome'da oluşturulmuş DOM'u sayfa görüntüsü deposuna verir"""
+        try:
+            html = self.driver.page_source
+        except Exception as e:
+            browser_logger.debug(f"Sayfa görüntüsü alınamadı: {e}")
+            return
+        self.recorder.record(
+            product["url"], product["store"], html, price_info, source="browser"
+        )
+
+    def read_variants(self, adapter, price_info):
+        """Sayfadaki tüm renk/beden varyantlarını tek bir betik çağrısıyla okur"""
+        try:
+            sources = self.driver.execute_script(
+                VARIANT_SCRIPT, DOM_SELECTORS.get(adapter.name, {})
+            )
+            variants = build_variants(sources or {}, price_info, adapter)
+        except Exception as e:
+            browser_logger.warning(f"Varyantlar okunamadı: {e}")
+            return []
+        if variants:
+            browser_logger.info(f"{len(variants)} varyant bulundu")
+        return variants
+
+    def check_price(self, adapter, url):
+        from selenium.common.exceptions import TimeoutException
+
+        try:
+            browser_logger.info(f"{adapter.label} sayfası yükleniyor: {url}")
+            try:
+                self.driver.get(url)
+            except TimeoutException as e:
+                raise StoreUnavailableError(
+                    adapter.name, "sayfa yükleme zaman aşımı"
+                ) from e
+            self.raise_if_blocked(adapter.name, title_only=True)
+
+            # Kurallar sayfada öncelik sırasıyla, her yoklamada tek çağrıda denenir
+            browser_logger.info("Fiyat elementleri aranıyor...")
+            match = self.wait_for_price(adapter)
+            price_info = adapter.price_info(match)
+            if price_info is None:
+                browser_logger.warning("Hiçbir fiyat bulunamadı!")
+                self.raise_if_blocked(adapter.name)
+                return None
+            browser_logger.info(
+                f"Fiyat bulundu ({price_info['rule']}): {price_info['current_price_text']}"
+            )
+            return price_info
+
+        except StoreError:
+            raise
+        except Exception as e:
+            browser_logger.error(f"{adapter.label} fiyat kontrolünde genel hata: {e}")
+            return None
+
+    def raise_if_blocked(self, store, title_only=False):
+        """Açılan sayfa engel ya da bot doğrulamasıysa beklemeden BlockedError fırlatır"""
+        try:
+            title = self.driver.title or ""
+            html = None if title_only else self.driver.page_source
+        except Exception:
+            return
+        reason = detect_block(html, title=title)
+        if reason:
+            browser_logger.warning(
+                f"[{self.name}] Sayfa engellendi ({store}): {reason}"
+            )
+            raise BlockedError(store, reason)
+
+    def wait_for_price(self, adapter):
+        """Mağazanın bekleme limitiyle fiyat kurallarını bekler; süreyi ve eşleşen kuralı kaydeder"""
+        store = adapter.name
+        cap = self.wait_caps.get(store, DEFAULT_WAIT_CAP)
+        match, waited, matched = wait_for_cascade(self.driver, adapter.rules, cap=cap)
+        browser_logger.info(f"Bekleme süresi ({store}): {waited:.2f} sn")
+        self.stores.record(
+            store, adapter.rules[match["rule"]]["name"] if matched else None
+        )
+        if self.wait_stats is not None:
+            self.wait_stats.observe(store, waited, matched)
+        if self.page_metrics is not None:
+            metrics = measure_page(self.driver)
+            self.page_metrics.observe(store, metrics)
+            if metrics:
+                browser_logger.info(
+                    f"Sayfa: {metrics.get('bytes', 0) / 1024:.0f} KB, "
+                    f"{metrics.get('requests', 0)} istek, {metrics.get('load_ms', 0):.0f} ms"
+                )
+        return match
+
+
+class PriceMonitor:
+    def __init__(
+        self,
+        workers=1,
+        wait_caps=None,
+        http_first=True,
+        jitter=0.1,
+        history_db=None,
+        smtp_settings=None,
+        resource_blocking=None,
+        driver_settings=None,
+        control_settings=None,
+        status_file=None,
+        lease_queue=None,
+        adaptive_settings=None,
+        store_limits=None,
+        listing_settings=None,
+        snapshot_settings=None,
+        stats_window=90,
+        store_settings=None,
+    ):
+        self.products = []
+        self.products_by_id = {}
+        self.product_ids = itertools.count(1)
+        # Aynı sayfayı takip eden ürünler tek grupta toplanır
+        self.watch = WatchIndex()
+        self.scheduler = Scheduler(jitter=jitter)
+        # Sayfaların takipçilerden gelen (uyarlanmamış) kontrol aralıkları
+        self.configured_intervals = {}
+        self.history = None
+        # Bildirimlerdeki geçmiş fiyat bağlamının penceresi (gün)
+        self.stats_window = stats_window
+        if history_db:
+            from .history import HistoryStore
+
+            self.history = HistoryStore(history_db)
+        self.paused = False
+        self.stopped = False
+        self.metrics = Metrics()
+        # /metrics kontrol kanalından okunur; anlık değerler döngüde yenilenir
+        self.gauge_interval = 5.0
+        self.gauges_updated = None
+        self.status = StatusWriter(status_file) if status_file else None
+        # Mağaza başına hız sınırı ve devre kesici
+        self.guard = StoreGuard(store_limits)
+        # Fiyatları toplu okunan kategori/arama sayfaları
+        self.listings = {}
+        self.listing_grace = (listing_settings or {}).get("grace", 120)
+        adaptive_settings = adaptive_settings or {}
+        self.adaptive = None
+        if adaptive_settings.get("enabled"):
+            self.adaptive = AdaptivePolicy(
+                min_interval=adaptive_settings.get("min_interval"),
+                max_interval=adaptive_settings.get("max_interval"),
+                budget_per_hour=adaptive_settings.get("budget_per_hour"),
+                backoff=adaptive_settings.get("backoff", 1.5),
+            )
+        self.last_window = None
+        self.control = None
+        control_settings = control_settings or {}
+        if control_settings.get("enabled"):
+            # Kontrol kanalı ve kuyruk modülleri yalnızca kullanıldıklarında yüklenir
+            from .control import ControlServer
+
+            self.control = ControlServer(
+                host=control_settings.get("host", "127.0.0.1"),
+                port=control_settings.get("port", 8765),
+                token=control_settings.get("token"),
+            )
+            self.control.add_route(
+                "GET",
+                "/status",
+                lambda: (200, self.status.snapshot if self.status else {}),
+            )
+            if control_settings.get("metrics", True):
+                self.control.add_route(
+                    "GET", "/metrics", lambda: (200, self.metrics.render()), public=True
+                )
+        self.email_sender = None
+        self.email_password = None
+        self.smtp_settings = smtp_settings or {}
+        self.notifier = None
+        self.wait_stats = WaitHistogram()
+        # Yerleşik ve konfigürasyonla eklenen mağazaların fiyat kuralları
+        self.stores = StoreRegistry(store_settings)
+        # HTTP bağlantı havuzu tüm işçiler arasında paylaşılır
+        self.fetcher = (
+            HttpPriceFetcher(stores=self.stores, pool_size=max(10, workers))
+            if http_first
+            else None
+        )
+        self.blocker = ResourceBlocker(resource_blocking)
+        self.page_metrics = PageMetrics()
+        self.lifecycle = DriverLifecycle(driver_settings)
+        # Seçicilerin çevrimdışı doğrulanması için kontrol edilen sayfaların görüntüleri
+        snapshot_settings = snapshot_settings or {}
+        self.snapshots = None
+        # Kuyruk koordinatörü sayfa yüklemez; görüntüleri işçi süreçleri kaydeder
+        if (
+            snapshot_settings.get("enabled")
+            and snapshot_settings.get("dir")
+            and lease_queue is None
+        ):
+            from .snapshots import SnapshotStore
+
+            self.snapshots = SnapshotStore(
+                snapshot_settings["dir"],
+                max_bytes=int(snapshot_settings.get("max_mb", 500) * 1024 * 1024),
+                failures_only=snapshot_settings.get("failures_only", False),
+            )
+            if self.fetcher is not None:
+                self.fetcher.recorder = self.snapshots
+        if lease_queue is not None:
+            # Kontroller kuyruktan kiralayan işçi süreçlerinde çalışır
+            from .leases import LeasePool
+
+            self.pool = LeasePool(lease_queue)
+        else:
+            self.pool = WorkerPool(
+                lambda name: BrowserWorker(
+                    name,
+                    wait_caps=wait_caps,
+                    wait_stats=self.wait_stats,
+                    fetcher=self.fetcher,
+                    blocker=self.blocker,
+                    page_metrics=self.page_metrics,
+                    lifecycle=self.lifecycle,
+                    recorder=self.snapshots,
+                    stores=self.stores,
+                ),
+                size=workers,
+            )
+
+    def add_product(
+        self, url, target_price, store="zara", check_interval=None, variant=None
+    ):
+        product = {
+            "id": next(self.product_ids),
+            "url": url,
+            "target_price": float(target_price),
+            "store": store.lower(),
+            "check_interval": check_interval,
+            "variant": variant,
+            "checked": False,
+        }
+        self.products.append(product)
+        self.products_by_id[product["id"]] = product
+        self.watch.add(product)
+        logger.info(
+            f"Ürün eklendi: {url}, Hedef Fiyat: {target_price} TL, Mağaza: {store}"
+            + (f", {variant_label(variant)}" if variant else "")
+        )
+        return product
+
+    def add_product_entry(self, entry):
+        """Konfigürasyondan ya da kontrol kanalından gelen ürün kaydını ekler"""
+        # API'den gelen ürünler ile CLI'dan gelen ürünlerin yapıları farklı olabilir
+        if not isinstance(entry, dict):
+            logger.warning(f"Geçersiz ürün tipi: {type(entry)}")
+            return None
+        if not (
+            "url" in entry
+            and ("target_price" in entry or "targetPrice" in entry)
+            and "store" in entry
+        ):
+            logger.warning(f"Geçersiz ürün formatı: {entry}")
+            return None
+        try:
+            validate_fields(entry)
+        except ValueError as e:
+            logger.warning(f"Geçersiz ürün formatı: {e}")
+            return None
+        return self.add_product(
+            url=entry["url"],
+            target_price=entry.get("target_price", entry.get("targetPrice")),
+            store=entry["store"],
+            check_interval=entry.get("check_interval"),
+            variant=variant_spec(entry),
+        )
+
+    def add_listing(self, entry):
+        """Konfigürasyondaki liste sayfasını ekler; adres ya da kayıt olabilir"""
+        if isinstance(entry, str):
+            entry = {"url": entry}
+        if not isinstance(entry, dict) or not entry.get("url"):
+            logger.warning(f"Geçersiz liste sayfası: {entry}")
+            return None
+        try:
+            listing = Listing(
+                entry["url"],
+                store=entry.get("store"),
+                check_interval=entry.get("check_interval"),
+                max_pages=entry.get("max_pages", 1),
+                max_scrolls=entry.get("max_scrolls", 10),
+                page_param=entry.get("page_param", "page"),
+            )
+        except ValueError as e:
+            logger.warning(str(e))
+            return None
+        self.listings[listing.key] = listing
+        logger.info(f"Liste sayfası eklendi: {listing.url}, Mağaza: {listing.store}")
+        return listing
+
+    def schedule_listings(self, check_interval):
+        """Liste sayfalarını hemen, geçmişi olmayan sayfalarını listeden sonraya planlar
+
+        Kartı listede bulunan sayfalar ilk turda kendi yüklemelerini yapmaz;
+        listede çıkmayanlar listing_grace saniye sonra ayrıca kontrol edilir.
+        """
+        stores = set()
+        for listing in self.listings.values():
+            self.scheduler.add(listing.key, listing.check_interval or check_interval)
+            stores.add(listing.store)
+        for group in self.watch:
+            if group.store in stores and group.last_price is None:
+                self.scheduler.reschedule(group.key, self.listing_grace)
+
+    def remove_product(self, product):
+        self.products.remove(product)
+        self.products_by_id.pop(product["id"], None)
+        group = self.watch.group_of(product)
+        if self.watch.remove(product) is not None:
+            # Sayfayı takip eden başka ürün kalmadı
+            self.scheduler.remove(group.key)
+            if self.pool.remote:
+                # İptal edilen kiranın sonucu hiç gelmez
+                self.pool.cancel(group.key)
+                self.guard.release(group.store, group.key)
+            if self.adaptive is not None:
+                self.adaptive.forget(group.key)
+            self.configured_intervals.pop(group.key, None)
+        else:
+            self.refresh_interval(group)
+        logger.info(f"Ürün kaldırıldı: {product['url']} ({product['store']})")
+
+    def update_product(self, product, values):
+        """Hedef fiyatı ve kontrol aralığını günceller"""
+        group = self.watch.group_of(product)
+        target_price = values.get("target_price", values.get("targetPrice"))
+        if target_price is not None:
+            group.set_target(product, target_price)
+        if "check_interval" in values:
+            product["check_interval"] = values["check_interval"]
+            self.refresh_interval(group)
+
+    def refresh_interval(self, group):
+        """Sayfanın ayarlanan aralığı değiştiyse planlayıcıya uygular
+
+        Aralık aynı kaldıysa (ör. yalnızca hedef fiyat düzenlendiyse)
+        uyarlamalı politikanın öğrendiği aralık korunur; değiştiyse sayfa
+        yeni aralıktan yeniden öğrenilir.
+        """
+        interval = group.interval()
+        if self.configured_intervals.get(group.key) == interval:
+            return
+        self.configured_intervals[group.key] = interval
+        if self.adaptive is not None:
+            self.adaptive.forget(group.key)
+        self.scheduler.set_interval(group.key, interval)
+
+    def find_products(self, url, store=None):
+        url = normalize_url(url)
+        return [
+            product
+            for product in self.products
+            if self.watch.group_of(product).url == url
+            and (store is None or product["store"] == store.lower())
+        ]
+
+    def groups_of(self, products):
+        """Ürünlerin sayfa gruplarını sırayı koruyarak tekilleştirir"""
+        groups = {}
+        for product in products:
+            group = self.watch.group_of(product)
+            groups[group.key] = group
+        return list(groups.values())
+
+    def send_notification(
+        self, product, current_price, old_price=None, is_price_drop=False
+    ):
+        try:
+            logger.info("Email bildirimi hazırlanıyor...")
+
+            # Email içeriği oluştur
+            history_lines = self.price_context(product, current_price)
+            if is_price_drop:
+                subject = "Fiyat Düştü! - İndirim Alarmı"
+                content_lines = [
+                    f"Ürün: {product['url']}",
+                    f"Mevcut Fiyat: {current_price} TL",
+                ]
+                if product.get("variant"):
+                    content_lines.insert(1, variant_label(product["variant"]))
+
+                # Eski fiyat bilgisi varsa ekle
+                if old_price:
+                    content_lines.append(f"Önceki Fiyat: {old_price} TL")
+                    discount_percent = ((old_price - current_price) / old_price) * 100
+                    content_lines.append(f"İndirim Oranı: %{discount_percent:.2f}")
+
+                content_lines.extend(
+                    [
+                        f"Hedef Fiyat: {product['target_price']} TL",
+                        *history_lines,
+                        f"Kontrol Zamanı: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                    ]
+                )
+            else:
+                subject = "Hedef Fiyata Ulaşıldı! - Fiyat Uyarısı"
+                content_lines = [
+                    f"Ürün: {product['url']}",
+                    f"Güncel Fiyat: {current_price} TL (Hedef fiyata ulaşıldı)",
+                    f"Hedef Fiyat: {product['target_price']} TL",
+                    *history_lines,
+                    f"Kontrol Zamanı: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                ]
+                if product.get("variant"):
+                    content_lines.insert(1, variant_label(product["variant"]))
+
+            email_content = "\n".join(content_lines)
+            logger.info(f"Email içeriği:\n{email_content}")
+
+            # Gönderim arka plandaki bildirim kuyruğunda yapılır
+            self.notifier.send(subject, email_content)
+
+        except Exception as e:
+            logger.error(f"Email gönderiminde genel hata: {e}")
+            logger.error(f"Hata detayı: {str(e.__class__.__name__)}")
+
+    def price_context(self, product, current_price):
+        """Bildirime eklenecek geçmiş bağlamı: son stats_window günün en düşüğü ve ortalaması"""
+        if self.history is None:
+            return []
+        from .analytics import price_stats
+        from .history import product_key
+
+        group = self.watch.group_of(product)
+        page = (
+            group.variant_page(group.track_of(product))
+            if product.get("variant")
+            else group.page
+        )
+        key = product_key(page["url"], page["store"])
+        try:
+            stats = price_stats(self.history.path, self.stats_window, keys=[key])
+        except Exception as e:
+            logger.warning(f"Fiyat istatistikleri okunamadı: {e}")
+            return []
+        stats = stats.get(key)
+        if not stats:
+            return []
+        lines = []
+        if current_price < stats["min"]:
+            lines.append(
+                f"Son {self.stats_window} günün en düşük fiyatı! (önceki en düşük: {stats['min']} TL)"
+            )
+        lines.append(
+            f"Son {self.stats_window} gün: en düşük {stats['min']} TL, "
+            f"ortalama {stats['mean']} TL, en yüksek {stats['max']} TL"
+        )
+        if stats["discount"]["mean_pct"] is not None:
+            lines.append(
+                f"İndirimli gün oranı: %{stats['discount']['share_pct']}, "
+                f"ortalama indirim: %{stats['discount']['mean_pct']}"
+            )
+        return lines
+
+    def handle_price(self, group, price_info):
+        """Kontrol sonucunu sayfanın tüm takipçileri için değerlendirir
+
+        Renk/beden seçmemiş takipçiler sayfanın fiyatını, seçenler sayfadan
+        okunan varyantların içinden kendilerine uyanın fiyatını izler. Stokta
+        olmayan varyant için bildirim gönderilmez; son fiyatı stoğa girene
+        kadar korunur.
+        """
+        if not price_info or not price_info["current_price"]:
+            logger.warning(f"Fiyat alınamadı! ({group.url})")
+            return
+
+        group.last_price = price_info["current_price"]
+        group.last_check = datetime.now()
+        for track in list(group.tracks.values()):
+            if track.variant is None:
+                self.handle_track_price(track, price_info, group.url)
+                continue
+
+            where = f"{group.url} [{variant_label(track.variant)}]"
+            variant = match_variant(price_info.get("variants"), track.variant)
+            if variant is None:
+                logger.warning(f"Varyant sayfada bulunamadı: {where}")
+                continue
+            track.available = variant["available"]
+            if not variant["available"]:
+                logger.info(f"Varyant stokta yok: {where}")
+                continue
+            self.handle_track_price(track, variant, where)
+            if self.history is not None:
+                self.history.record(group.variant_page(track), variant)
+
+    def handle_track_price(self, track, price_info, where):
+        """Bir fiyat izinin takipçilerine bildirimleri dağıtır
+
+        Hedef fiyatı bu düşüşle aşılan takipçiler sıralı hedef dizininden
+        bulunur ve her biri kendi hedef bildirimini alır. Hiçbir hedef
+        aşılmadıysa iz için tek bir fiyat düşüşü bildirimi gönderilir.
+        """
+        current_price = price_info["current_price"]
+        old_price = price_info.get("old_price")
+        last_price = track.last_price
+        track.last_price = current_price
+
+        # Yeni eklenen ürünlerde mevcut indirimler için bildirim gönder
+        new_watchers = [w for w in track.watchers.values() if not w["checked"]]
+        if new_watchers and old_price and old_price > current_price:
+            logger.info(
+                f"Mevcut indirim tespit edildi! Orijinal fiyat: {old_price} TL, İndirimli fiyat: {current_price} TL"
+            )
+            for watcher in new_watchers:
+                self.send_notification(
+                    watcher, current_price, old_price, is_price_drop=True
+                )
+        for watcher in new_watchers:
+            watcher["checked"] = True
+
+        # İlk kontrol ise, son fiyat olarak kaydet
+        if last_price is None:
+            logger.info(f"İlk kontrol: Fiyat {current_price} TL olarak kaydedildi.")
+            return
+
+        logger.info(
+            f"Karşılaştırma: Son fiyat = {last_price}, Şimdiki fiyat = {current_price}, "
+            f"{len(track)} takipçi ({where})"
+        )
+        if current_price >= last_price:
+            return
+
+        # Hedef fiyatı bu düşüşle yakalayan takipçilere bildirim gönder
+        crossed = track.crossed(last_price, current_price)
+        for watcher in crossed:
+            logger.info(
+                f"Hedef fiyata ulaşıldı! Hedef: {watcher['target_price']} TL, Güncel: {current_price} TL"
+            )
+            self.send_notification(
+                watcher, current_price, old_price, is_price_drop=False
+            )
+        if not crossed:
+            logger.info(
+                f"Fiyat düşüşü tespit edildi! {last_price} TL -> {current_price} TL"
+            )
+            self.send_notification(
+                track.nearest(current_price),
+                current_price,
+                last_price,
+                is_price_drop=True,
+            )
+
+    def restore_state(self, check_interval, products=None):
+        """Son bilinen fiyatları geçmişten yükler, ilk kontrol gecikmelerini döndürür
+
+        Geri yüklenen sayfalar ilk kontrol sayılmaz, böylece yeniden başlatmada
+        mevcut indirim bildirimleri tekrar gönderilmez. Yakın zamanda kontrol
+        edilmiş sayfalar aralıkları dolana kadar bekletilir.
+        """
+        delays = {}
+        if self.history is None:
+            return delays
+        from .history import product_key
+
+        state = self.history.load_state()
+        now = time.time()
+        restored = 0
+        groups = self.watch if products is None else self.groups_of(products)
+        for group in groups:
+            if group.last_price is not None:
+                continue
+            saved = state.get(product_key(group.url, group.store))
+            if not saved or saved[0] is None:
+                continue
+            last_price, last_check = saved
+            group.last_price = last_price
+            group.last_check = datetime.fromtimestamp(last_check)
+            for track in group.tracks.values():
+                if track.variant is None:
+                    track.last_price = last_price
+                    continue
+                variant_state = state.get(
+                    product_key(group.variant_page(track)["url"], group.store)
+                )
+                if variant_state:
+                    track.last_price = variant_state[0]
+            for watcher in group.watchers.values():
+                watcher["checked"] = True
+            interval = group.interval() or check_interval
+            delays[group.key] = max(0.0, last_check + interval - now)
+            restored += 1
+        logger.info(f"Geçmişten {restored} sayfanın son fiyatı yüklendi")
+        return delays
+
+    def schedule_products(self, products, check_interval):
+        """Ürünlerin sayfalarını planlayıcıya ekler; geçmişi olmayanlar hemen kontrol edilir"""
+        delays = self.restore_state(check_interval, products)
+        for group in self.groups_of(products):
+            if group.key in self.scheduler:
+                # Sayfa zaten planlı; yeni takipçi aralığı kısaltmış olabilir
+                self.refresh_interval(group)
+                continue
+            self.configured_intervals[group.key] = group.interval()
+            self.scheduler.add(
+                group.key, group.interval(), delay=delays.get(group.key, 0.0)
+            )
+
+    def product_summary(self, product):
+        group = self.watch.group_of(product)
+        track = group.track_of(product)
+        return {
+            "url": product["url"],
+            "store": product["store"],
+            "variant": product["variant"],
+            "available": track.available,
+            "target_price": product["target_price"],
+            "check_interval": product["check_interval"],
+            "last_price": track.last_price if product["variant"] else group.last_price,
+            "last_check": group.last_check.isoformat() if group.last_check else None,
+        }
+
+    def handle_command(self, command):
+        """Kontrol kanalından gelen komutu uygular ve yanıtlar
+
+        Komuttaki bir hata yalnızca o isteğe hata yanıtı olarak döner; takip
+        döngüsü çalışmaya devam eder.
+        """
+        handler = getattr(self, f"command_{command.name}", None)
+        try:
+            if not isinstance(command.payload, dict):
+                raise ValueError("istek gövdesi bir JSON nesnesi olmalı")
+            status, body = handler(command.payload)
+        except (KeyError, TypeError, ValueError) as e:
+            status, body = 400, {"status": "error", "message": f"Geçersiz istek: {e}"}
+        except Exception as e:
+            logger.exception(f"Kontrol komutu başarısız: {command.name}")
+            status, body = 500, {
+                "status": "error",
+                "message": f"Komut uygulanamadı: {e}",
+            }
+        logger.info(f"Kontrol komutu uygulandı: {command.name} -> {status}")
+        command.respond(status, body)
+
+    def command_health(self, payload):
+        return 200, {
+            "status": "success",
+            "paused": self.paused,
+            "products": len(self.products),
+            "pages": len(self.watch),
+            "workers": self.pool.alive,
+            "queue_depth": self.pool.queue_depth(),
+        }
+
+    def command_list(self, payload):
+        return 200, {
+            "status": "success",
+            "products": [self.product_summary(p) for p in self.products],
+        }
+
+    def command_add(self, payload):
+        validate_fields(payload)
+        product = self.add_product_entry(payload)
+        if product is None:
+            return 400, {"status": "error", "message": "Geçersiz ürün formatı"}
+        self.schedule_products([product], self.scheduler.default_interval)
+        return 201, {"status": "success", "product": self.product_summary(product)}
+
+    def command_remove(self, payload):
+        validate_fields(payload)
+        matches = self.find_products(payload["url"], payload.get("store"))
+        for product in matches:
+            self.remove_product(product)
+        return 200, {"status": "success", "removed": len(matches)}
+
+    def command_update(self, payload):
+        validate_fields(payload)
+        matches = self.find_products(payload["url"], payload.get("store"))
+        if not matches:
+            return 404, {"status": "error", "message": "Ürün bulunamadı"}
+        for product in matches:
+            self.update_product(product, payload)
+        return 200, {
+            "status": "success",
+            "products": [self.product_summary(p) for p in matches],
+        }
+
+    def command_sync(self, payload):
+        """Ürün listesini verilen listeyle eşitler; mevcut ürünlerin durumu korunur
+
+        Aynı sayfa listede birden çok kez geçebilir; kayıtlar sayfa ve
+        renk/beden bazında mevcut ürünlerle eşleştirilir, fazlası eklenir ya
+        da kaldırılır.
+        """
+        if not isinstance(payload["products"], list):
+            raise ValueError("products bir liste olmalı")
+        # Listedeki hatalı bir kayıt, ürünlerin yarısı değiştirilmeden reddedilir
+        for entry in payload["products"]:
+            if isinstance(entry, dict):
+                validate_fields(entry)
+        wanted = {}
+        for entry in payload["products"]:
+            if isinstance(entry, dict) and "url" in entry and "store" in entry:
+                key = (
+                    group_key(entry["url"], entry["store"]),
+                    variant_key(variant_spec(entry)),
+                )
+                wanted.setdefault(key, []).append(entry)
+
+        removed = 0
+        for product in list(self.products):
+            entries = wanted.get((product["group"], variant_key(product["variant"])))
+            if not entries:
+                self.remove_product(product)
+                removed += 1
+                continue
+            entry = entries.pop(0)
+            self.update_product(
+                product, {**entry, "check_interval": entry.get("check_interval")}
+            )
+
+        added = []
+        for entries in wanted.values():
+            for entry in entries:
+                product = self.add_product_entry(entry)
+                if product is not None:
+                    added.append(product)
+        self.schedule_products(added, self.scheduler.default_interval)
+        return 200, {
+            "status": "success",
+            "added": len(added),
+            "removed": removed,
+            "products": len(self.products),
+            "pages": len(self.watch),
+        }
+
+    def command_pause(self, payload):
+        self.paused = True
+        logger.info("Fiyat takibi duraklatıldı")
+        return 200, {"status": "success", "paused": True}
+
+    def command_resume(self, payload):
+        self.paused = False
+        logger.info("Fiyat takibi devam ediyor")
+        return 200, {"status": "success", "paused": False}
+
+    def command_check(self, payload):
+        """Ürünleri (url verilmezse tümünü) beklemeden kontrole alır"""
+        validate_fields(payload)
+        if payload.get("url"):
+            targets = self.find_products(payload["url"], payload.get("store"))
+        else:
+            targets = self.products
+        groups = self.groups_of(targets)
+        for group in groups:
+            self.scheduler.reschedule(group.key)
+        return 200, {"status": "success", "scheduled": len(groups)}
+
+    def process_listing(self, listing, result):
+        """Liste sayfasından okunan fiyatları kartı bulunan sayfalara dağıtır
+
+        Güncellenen sayfaların kendi kontrolleri ertelenir; liste sonraki
+        turlarda onları güncelleyemezse sayfa kendi yüklemesiyle kontrol
+        edilir. Renk/beden takipçisi olan sayfalar varyant verisi için kendi
+        yüklemelerini yapmaya devam eder.
+        """
+        prices = (result.value or {}).get("listing") or {}
+        ok = bool(prices)
+        listing.last_check = datetime.now()
+        listing.last_duration = result.duration
+        listing.last_error = (
+            None if ok else str(result.error or "Liste sayfasında ürün bulunamadı")
+        )
+        listing.found = len(prices)
+        self.metrics.inc(
+            "listing_checks_total",
+            help="Tamamlanan liste sayfası kontrolleri",
+            store=listing.store,
+            result="success" if ok else "failure",
+        )
+        self.guard.record(listing.store, ok, result.error, key=listing.key)
+
+        listing_interval = listing.check_interval or self.scheduler.default_interval
+        matched = 0
+        for group in self.watch:
+            if group.store != listing.store or any(
+                track.variant for track in group.tracks.values()
+            ):
+                continue
+            price_info = prices.get(product_id(group.url, group.store))
+            if price_info is None:
+                continue
+            matched += 1
+            group.last_error = None
+            self.handle_price(group, price_info)
+            if self.history is not None:
+                self.history.record(group.page, price_info)
+            interval = group.interval() or self.scheduler.default_interval
+            self.scheduler.reschedule(group.key, 1.5 * max(interval, listing_interval))
+
+        listing.matched = matched
+        listing.satisfied += matched
+        self.metrics.inc(
+            "listing_page_loads_saved_total",
+            matched,
+            help="Liste sayfasından güncellendiği için yapılmayan sayfa yüklemeleri",
+            store=listing.store,
+        )
+        logger.info(
+            f"Liste sayfası ({listing.store}): {len(prices)} ürün, "
+            f"{matched} takip edilen sayfa güncellendi ({listing.url})"
+        )
+        self.scheduler.complete(listing.key, started=result.started)
+
+    def process_result(self, result):
+        """Tamamlanan kontrolü değerlendirir, kaydeder ve sayfayı yeniden planlar"""
+        listing = self.listings.get(result.item["key"])
+        if listing is not None:
+            self.process_listing(listing, result)
+            return
+        group = self.watch.get(result.item["key"])
+        if group is None:
+            # Kontrol sürerken tüm takipçileri kaldırılmış sayfa; deneme
+            # isteğiyse mağazanın yarı açık devresi serbest bırakılır
+            self.guard.release(result.item["store"], result.item["key"])
+            return
+
+        ok = bool(result.value and result.value.get("current_price"))
+        group.last_duration = result.duration
+        group.last_error = None if ok else str(result.error or "Fiyat alınamadı")
+        self.metrics.inc(
+            "checks_total",
+            help="Tamamlanan fiyat kontrolleri",
+            store=group.store,
+            result="success" if ok else "failure",
+        )
+        self.metrics.observe(
+            "check_duration_seconds",
+            result.duration,
+            help="Fiyat kontrolü süresi (saniye)",
+            store=group.store,
+        )
+
+        self.guard.record(group.store, ok, result.error, key=group.key)
+        last_price = group.last_price
+        self.handle_price(group, result.value)
+        if self.adaptive is not None and ok:
+            # Bir sonraki planlama fiyatın ne kadar oynak olduğuna göre yapılır
+            interval = self.adaptive.observe(
+                group.key,
+                result.value,
+                last_price,
+                group.interval() or self.scheduler.default_interval,
+            )
+            self.scheduler.set_interval(group.key, interval)
+        if self.history is not None:
+            self.history.record(group.page, result.value, result.error)
+        self.scheduler.complete(group.key, started=result.started)
+
+    def update_gauges(self):
+        """Anlık değerleri metrik kaydına aktarır"""
+        lag = self.scheduler.lag_summary()
+        self.metrics.set(
+            "products", len(self.products), help="Takip edilen ürün sayısı"
+        )
+        self.metrics.set(
+            "pages", len(self.watch), help="Takip edilen farklı sayfa sayısı"
+        )
+        self.metrics.set(
+            "queue_depth",
+            self.pool.queue_depth(),
+            help="Kontrol kuyruğundaki ürün sayısı",
+        )
+        self.metrics.set("workers_alive", self.pool.alive, help="Çalışan işçi sayısı")
+        self.metrics.set("paused", int(self.paused), help="Takip duraklatıldı mı")
+        self.metrics.set(
+            "schedule_lag_p95_seconds",
+            lag["p95"],
+            help="Planlama gecikmesi p95 (saniye)",
+        )
+        self.metrics.set(
+            "schedule_lag_max_seconds",
+            lag["max"],
+            help="En büyük planlama gecikmesi (saniye)",
+        )
+        for store, guard in self.guard.summary().items():
+            self.metrics.set(
+                "store_circuit_open",
+                int(guard["state"] != "closed"),
+                help="Mağazanın devre kesicisi açık mı",
+                store=store,
+            )
+            self.metrics.set(
+                "store_deferred",
+                guard["deferred"],
+                help="Hız sınırı ya da açık devre nedeniyle ertelenen kontroller",
+                store=store,
+            )
+            self.metrics.set(
+                "store_blocked",
+                guard["blocked"],
+                help="Engel ya da bot doğrulaması görülen kontroller",
+                store=store,
+            )
+        if self.adaptive is not None:
+            adaptive = self.adaptive.summary()
+            self.metrics.set(
+                "adaptive_loads_per_hour",
+                adaptive["loads_per_hour"],
+                help="Uyarlamalı aralıklarla saatlik sayfa yükü",
+            )
+            self.metrics.set(
+                "adaptive_budget_scale",
+                adaptive["scale"],
+                help="Bütçe nedeniyle aralıklara uygulanan çarpan",
+            )
+            if adaptive["mean_staleness_s"] is not None:
+                self.metrics.set(
+                    "adaptive_mean_staleness_seconds",
+                    adaptive["mean_staleness_s"],
+                    help="Fiyatların ortalama bayatlığı (saniye)",
+                )
+        for worker, health in self.lifecycle.summary().items():
+            self.metrics.set(
+                "driver_rss_bytes",
+                int(health["rss_mb"] * 1024 * 1024),
+                help="Chrome süreç ağacının RSS değeri",
+                worker=worker,
+            )
+            self.metrics.set(
+                "driver_restarts",
+                health["restarts"],
+                help="Driver yeniden başlatma sayısı",
+                worker=worker,
+            )
+        if self.fetcher is not None:
+            for store, counters in self.fetcher.summary().items():
+                self.metrics.set(
+                    "fast_path_hits",
+                    counters["hits"],
+                    help="Hızlı yol isabetleri",
+                    store=store,
+                )
+                self.metrics.set(
+                    "fast_path_fallbacks",
+                    counters["fallbacks"],
+                    help="Selenium'a geri düşüşler",
+                    store=store,
+                )
+        for store, selectors in self.stores.summary().items():
+            self.metrics.set(
+                "price_rule_misses",
+                selectors["misses"],
+                help="Hiçbir fiyat kuralının eşleşmediği tarayıcı kontrolleri",
+                store=store,
+            )
+            for rule, counters in selectors["rules"].items():
+                self.metrics.set(
+                    "price_rule_hits",
+                    counters["hits"],
+                    help="Fiyat kuralı isabetleri",
+                    store=store,
+                    rule=rule,
+                )
+
+    def refresh_gauges(self, force=False):
+        """Anlık değerleri en fazla gauge_interval saniyede bir yeniler"""
+        now = time.monotonic()
+        if (
+            not force
+            and self.gauges_updated is not None
+            and now - self.gauges_updated < self.gauge_interval
+        ):
+            return
+        self.update_gauges()
+        self.gauges_updated = now
+
+    def build_status(self):
+        """Laravel'in okuduğu durum anlık görüntüsü"""
+        self.refresh_gauges(force=True)
+        products = []
+        for product in self.products:
+            group = self.watch.group_of(product)
+            summary = self.product_summary(product)
+            summary["last_error"] = group.last_error
+            summary["last_duration"] = group.last_duration
+            products.append(summary)
+        return {
+            "generated_at": datetime.now().isoformat(),
+            "pid": os.getpid(),
+            "state": "stopped"
+            if self.stopped
+            else ("paused" if self.paused else "running"),
+            "queue_depth": self.pool.queue_depth(),
+            "pages": len(self.watch),
+            "window": self.last_window,
+            "schedule_lag": self.scheduler.lag_summary(),
+            "workers": {
+                "alive": self.pool.alive,
+                "size": self.pool.size,
+                "drivers": self.lifecycle.summary(),
+            },
+            "fast_path": self.fetcher.summary() if self.fetcher is not None else {},
+            "queue": self.pool.summary() if self.pool.remote else None,
+            "stores": self.guard.summary(),
+            "price_rules": self.stores.summary(),
+            "listings": [listing.summary() for listing in self.listings.values()],
+            "snapshots": self.snapshots.summary()
+            if self.snapshots is not None
+            else None,
+            "adaptive": self.adaptive.summary(base=self.scheduler.default_interval)
+            if self.adaptive is not None
+            else None,
+            "products": products,
+        }
+
+    def log_stats(self, checks, elapsed):
+        """Son rapordan bu yana yapılan kontrollerin istatistiklerini loglar"""
+        lag = self.scheduler.lag_summary()
+        logger.info(
+            f"Son {elapsed:.0f} sn: {checks} kontrol, {checks / elapsed if elapsed else 0:.2f} ürün/sn, "
+            f"kuyrukta {self.pool.queue_depth()}, {self.pool.alive} işçi"
+        )
+        logger.info(
+            f"Planlama gecikmesi: ort. {lag['avg']:.1f} sn, p50 {lag['p50']:.1f} sn, "
+            f"p95 {lag['p95']:.1f} sn, en fazla {lag['max']:.1f} sn"
+        )
+        if self.fetcher is not None:
+            for store, counters in self.fetcher.summary().items():
+                logger.info(
+                    f"Hızlı yol ({store}): {counters['hits']} isabet, "
+                    f"{counters['fallbacks']} Selenium'a geri düşüş"
+                )
+        for store, selectors in self.stores.summary().items():
+            rules = ", ".join(
+                f"{rule} %{counters['rate'] * 100:.0f}"
+                for rule, counters in selectors["rules"].items()
+            )
+            logger.info(
+                f"Fiyat kuralları ({store}): {selectors['checks']} kontrol, {rules}, "
+                f"{selectors['misses']} eşleşmeyen"
+            )
+        for store, guard in self.guard.summary().items():
+            if guard["state"] != "closed" or guard["deferred"]:
+                logger.info(
+                    f"Mağaza koruması ({store}): {guard['state']}, "
+                    f"{guard['deferred']} erteleme, {guard['blocked']} engel, "
+                    f"yeniden deneme {guard['retry_in']:.0f} sn sonra"
+                )
+        for listing in self.listings.values():
+            logger.info(
+                f"Liste sayfası ({listing.store}): son turda {listing.found} ürün, "
+                f"{listing.matched} eşleşme, toplam {listing.satisfied} sayfa yüklemesi "
+                f"kazanıldı ({listing.url})"
+            )
+        if self.snapshots is not None:
+            snapshots = self.snapshots.summary()
+            logger.info(
+                f"Sayfa görüntüleri: {snapshots['objects']} nesne, "
+                f"{snapshots['bytes'] / 1024 / 1024:.1f}/{snapshots['max_bytes'] / 1024 / 1024:.0f} MB, "
+                f"{snapshots['written']} kayıt ({snapshots['deduplicated']} tekrar), "
+                f"{snapshots['dropped']} atlandı"
+            )
+        if self.adaptive is not None:
+            adaptive = self.adaptive.summary(base=self.scheduler.default_interval)
+            if adaptive["pages"]:
+                logger.info(
+                    f"Uyarlamalı aralık: {adaptive['loads_per_hour']:.0f} yük/saat "
+                    f"(sabit aralıkla {adaptive.get('fixed_loads_per_hour', 0):.0f}, "
+                    f"%{adaptive.get('saved_pct', 0):.0f} tasarruf), "
+                    f"ortalama bayatlık {adaptive['mean_staleness_s']:.0f} sn, "
+                    f"{adaptive['volatile_pages']} hareketli sayfa, çarpan {adaptive['scale']}"
+                )
+        for store, waits in self.wait_stats.summary().items():
+            logger.info(
+                f"Bekleme istatistiği ({store}): {waits['count']} kontrol, "
+                f"ort. {waits['avg']:.2f} sn, p50 <= {waits['p50']} sn, "
+                f"p95 <= {waits['p95']} sn, zaman aşımı {waits['timeouts']}, "
+                f"kovalar {waits['buckets']}"
+            )
+        for store, pages in self.page_metrics.summary().items():
+            logger.info(
+                f"Sayfa yükleri ({store}): {pages['pages']} sayfa, ort. {pages['avg_kb']:.0f} KB, "
+                f"{pages['avg_requests']:.0f} istek, {pages['avg_load_ms']:.0f} ms"
+            )
+        for worker, health in sorted(self.lifecycle.summary().items()):
+            logger.info(
+                f"Driver ({worker}): {health['rss_mb']:.0f} MB RSS, "
+                f"{health['page_loads']} sayfa, {health['restarts']} yeniden başlatma, "
+                f"{health['crashes']} çökme"
+            )
+
+    def monitor_prices(self, check_interval=300):
+        logger.info("\nFiyat takibi başlatılıyor...")
+        from .notifier import Notifier
+
+        try:
+            self.notifier = Notifier(
+                self.email_sender,
+                self.email_password,
+                host=self.smtp_settings.get("host", "smtp.gmail.com"),
+                port=self.smtp_settings.get("port", 465),
+                use_ssl=self.smtp_settings.get("ssl", True),
+                digest=self.smtp_settings.get("digest", False),
+                digest_window=self.smtp_settings.get("digest_window", 60),
+            )
+            self.pool.start()
+
+            # Her ürün kendi aralığıyla planlanır
+            self.scheduler.default_interval = check_interval
+            self.schedule_products(self.products, check_interval)
+            self.schedule_listings(check_interval)
+            logger.info(
+                f"{len(self.products)} ürün için {len(self.watch)} farklı sayfa planlandı"
+                + (f", {len(self.listings)} liste sayfası" if self.listings else "")
+            )
+            if self.control is not None:
+                self.control.start()
+
+            report_every = min(check_interval, 300)
+            report_started = time.monotonic()
+            window_checks = 0
+
+            while True:
+                # Kontrol kanalından gelen komutlar bu iş parçacığında uygulanır
+                if self.control is not None:
+                    for command in self.control.pending():
+                        self.handle_command(command)
+                    report_wait = min(report_every, 1.0)
+                else:
+                    report_wait = report_every
+
+                # Zamanı gelen ürünleri işçi havuzuna gönder
+                if not self.paused:
+                    for key in self.scheduler.pop_due():
+                        target = self.watch.get(key) or self.listings[key]
+                        # Hız sınırı dolmuş ya da devresi açık mağazanın sayfası ertelenir
+                        wait = self.guard.acquire(target.store, key)
+                        if wait:
+                            self.scheduler.defer(key, wait)
+                        else:
+                            self.pool.submit(target.page)
+
+                # Bir sonraki ürünün zamanı gelene kadar sonuç bekle
+                wait = None if self.paused else self.scheduler.time_until_next()
+                timeout = report_wait if wait is None else min(wait, report_wait)
+                result = self.pool.get_result(timeout=max(timeout, 0.05))
+                if result is not None:
+                    # Sonuçlar bu iş parçacığında sırayla değerlendirilir
+                    self.process_result(result)
+                    window_checks += 1
+                elif self.pool.alive == 0 and not self.pool.remote:
+                    raise RuntimeError("Çalışan işçi kalmadı")
+
+                elapsed = time.monotonic() - report_started
+                if elapsed >= report_every:
+                    self.log_stats(window_checks, elapsed)
+                    self.last_window = {
+                        "seconds": elapsed,
+                        "checks": window_checks,
+                        "throughput": window_checks / elapsed,
+                    }
+                    report_started = time.monotonic()
+                    window_checks = 0
+
+                # Durum dosyası kapalı olsa da /metrics güncel kalır
+                self.refresh_gauges()
+                if self.status is not None:
+                    self.status.maybe_write(self.build_status)
+
+        except KeyboardInterrupt:
+            logger.info("\nProgram durduruluyor...")
+        finally:
+            self.stopped = True
+            if self.status is not None:
+                self.status.maybe_write(self.build_status, force=True)
+            if self.control is not None:
+                self.control.shutdown()
+            self.pool.shutdown()
+            if self.history is not None:
+                self.history.close()
+            if self.snapshots is not None:
+                self.snapshots.close()
+            if self.notifier is not None:
+                self.notifier.close()
+
+    def serve_queue(self, lease_queue, owner):
+        """Kuyruk işçisi olarak koordinatörün kontrollerini çalıştırır"""
+        from .leases import serve
+
+        try:
+            self.pool.start()
+            serve(lease_queue, self.pool, owner)
+        except KeyboardInterrupt:
+            logger.info("\nKuyruk işçisi durduruluyor...")
+        finally:
+            self.pool.shutdown()
+            lease_queue.close()
+            if self.snapshots is not None:
+                self.snapshots.close()
+
+    def check_once(self):
+        """Her sayfayı bir kez kontrol eder, ürün başına sonucu döndürür
+
+        Bildirim gönderilmez, geçmişe yazılmaz ve zamanlayıcı kullanılmaz;
+        cron ya da kuyruk işi gibi kısa ömürlü çağrılar içindir.
+        """
+        results = {}
+        self.pool.start()
+        try:
+            self.pool.run_pass(
+                [group.page for group in self.watch],
+                lambda result: results.__setitem__(result.item["key"], result),
+            )
+        finally:
+            self.pool.shutdown()
+
+        summaries = []
+        for product in self.products:
+            result = results.get(product["group"])
+            price_info = result.value if result is not None else None
+            error = result.error if result is not None else None
+            if price_info and product["variant"]:
+                price_info = match_variant(
+                    price_info.get("variants"), product["variant"]
+                )
+                if price_info is None:
+                    error = "Varyant sayfada bulunamadı"
+            if not (price_info and price_info.get("current_price")):
+                price_info = None
+                error = error or "Fiyat alınamadı"
+            current_price = price_info["current_price"] if price_info else None
+            summaries.append(
+                {
+                    "url": product["url"],
+                    "store": product["store"],
+                    "variant": product["variant"],
+                    "target_price": product["target_price"],
+                    "current_price": current_price,
+                    "old_price": price_info.get("old_price") if price_info else None,
+                    "available": price_info.get("available") if price_info else None,
+                    "target_reached": current_price is not None
+                    and current_price <= product["target_price"],
+                    "error": str(error) if error else None,
+                    "duration": round(result.duration, 3)
+                    if result is not None
+                    else None,
+                }
+            )
+        return summaries
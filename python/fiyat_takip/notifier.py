@@ -0,0 +1,178 @@
+"""Bildirimleri arka planda, tek bir SMTP bağlantısı üzerinden gönderen kuyruk"""
+
+import logging
+import queue
+import smtplib
+import threading
+import time
+from email.mime.text import MIMEText
+
+logger = logging.getLogger("price_tracker.notifier")
+
+_STOP = object()
+
+
+class Notifier:
+    """Kontrol işçilerini bekletmeden email gönderir
+
+    Kimliği doğrulanmış bağlantı açık tutulur ve kopunca yeniden kurulur.
+    digest açıksa, ilk bildirimden itibaren digest_window saniye içinde gelen
+    tüm uyarılar tek bir özet emailde birleştirilir.
+    """
+
+    def __init__(
+        self,
+        sender,
+        password,
+        host="smtp.gmail.com",
+        port=465,
+        use_ssl=True,
+        digest=False,
+        digest_window=60,
+        idle_timeout=240,
+        timeout=30,
+    ):
+        self.sender = sender
+        self.password = password
+        self.host = host
+        self.port = int(port)
+        self.use_ssl = use_ssl
+        self.digest = digest
+        self.digest_window = digest_window
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.queue = queue.Queue()
+        self.smtp = None
+        self.last_used = 0.0
+        self.sent = 0
+        self.failed = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def send(self, subject, body):
+        """Bildirimi kuyruğa ekler ve hemen döner"""
+        self.queue.put((subject, body))
+
+    def _run(self):
+        pending = []
+        flush_at = None
+        while True:
+            if pending:
+                timeout = max(0.0, flush_at - time.monotonic())
+            elif self.smtp is not None:
+                timeout = self.idle_timeout
+            else:
+                timeout = None
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                if pending:
+                    self._deliver(self._combine(pending))
+                self._disconnect()
+                return
+
+            if item is not None:
+                if not self.digest:
+                    self._deliver(item)
+                    continue
+                if not pending:
+                    flush_at = time.monotonic() + self.digest_window
+                pending.append(item)
+
+            if pending and time.monotonic() >= flush_at:
+                self._deliver(self._combine(pending))
+                pending = []
+            elif item is None and not pending:
+                # Uzun süre kullanılmayan bağlantıyı kapat
+                self._disconnect()
+
+    def _combine(self, items):
+        if len(items) == 1:
+            return items[0]
+        subject = f"Fiyat Uyarıları ({len(items)} ürün)"
+        body = "\n\n----------------------------\n\n".join(
+            f"{subject_line}\n{body}" for subject_line, body in items
+        )
+        return subject, body
+
+    def _connect(self):
+        logger.info(f"SMTP sunucusuna bağlanılıyor ({self.host}:{self.port})...")
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.password:
+            smtp.login(self.sender, self.password)
+            logger.info("SMTP girişi başarılı")
+        self.smtp = smtp
+
+    def _disconnect(self):
+        if self.smtp is None:
+            return
+        try:
+            self.smtp.quit()
+        except smtplib.SMTPServerDisconnected:
+            pass
+        except smtplib.SMTPException:
+            # QUIT reddedildi; soket yine de kapatılır
+            self.smtp.close()
+        except OSError:
+            pass
+        self.smtp = None
+
+    def _ensure_connection(self):
+        # Bir süredir boşta olan bağlantıyı NOOP ile yokla
+        if self.smtp is not None and time.monotonic() - self.last_used > 30:
+            try:
+                if self.smtp.noop()[0] != 250:
+                    self._disconnect()
+            except (smtplib.SMTPException, OSError):
+                self.smtp = None
+        if self.smtp is None:
+            self._connect()
+
+    def _deliver(self, item):
+        subject, body = item
+        msg = MIMEText(body)
+        msg["Subject"] = subject
+        msg["From"] = self.sender
+        msg["To"] = self.sender
+
+        for attempt in (1, 2):
+            try:
+                self._ensure_connection()
+                self.smtp.send_message(msg)
+                self.last_used = time.monotonic()
+                self.sent += 1
+                logger.info(f"Email başarıyla gönderildi: {subject}")
+                return
+            except smtplib.SMTPAuthenticationError:
+                logger.error(
+                    "SMTP kimlik doğrulama hatası! Lütfen email ve app password'ü kontrol edin."
+                )
+                break
+            except smtplib.SMTPServerDisconnected as e:
+                # Bağlantı kopmuş; bir kez yeniden bağlanıp dene
+                logger.warning(f"SMTP bağlantısı koptu ({attempt}. deneme): {e}")
+                self.smtp = None
+            except smtplib.SMTPException as e:
+                # SMTPException bir OSError'dır; kalıcı hatalar (reddedilen
+                # alıcı, veri hatası) yeniden gönderilmez
+                logger.error(f"SMTP hatası: {e}")
+                self._disconnect()
+                break
+            except OSError as e:
+                logger.warning(f"SMTP bağlantısı koptu ({attempt}. deneme): {e}")
+                self.smtp = None
+        self.failed += 1
+
+    def close(self, timeout=60):
+        """Bekleyen bildirimleri gönderir ve bağlantıyı kapatır"""
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+        logger.info(
+            f"Bildirim kuyruğu kapatıldı: {self.sent} email gönderildi, {self.failed} başarısız"
+        )
@@ -0,0 +1,162 @@
+"""Ürün kontrollerini paylaşılan bir kuyruktan çeken işçi havuzu"""
+
+import logging
+import queue
+import threading
+import time
+from collections import namedtuple
+
+logger = logging.getLogger("price_tracker.pool")
+
+# Her kontrolün sonucu: hangi ürün, ne döndü, hata, süre, hangi işçi ve
+# kontrolün başladığı an (time.monotonic)
+CheckResult = namedtuple(
+    "CheckResult", ["item", "value", "error", "duration", "worker", "started"]
+)
+
+_STOP = object()
+
+
+class WorkerPool:
+    """Her biri kendi kaynağına (ör. Chrome driver) sahip N işçi iş parçacığı
+
+    `worker_factory(name)` her iş parçacığının içinde çağrılır ve `check(item)`
+    ile `close()` metodlarına sahip bir nesne döndürmelidir. İşçiler birbirinden
+    bağımsızdır; bir işçinin çökmesi diğerlerini etkilemez.
+    """
+
+    # Kontroller bu süreçte çalışır (bkz. leases.LeasePool)
+    remote = False
+
+    def __init__(self, worker_factory, size=1):
+        self.worker_factory = worker_factory
+        self.size = max(1, int(size))
+        self.tasks = queue.Queue()
+        self.results = queue.Queue()
+        self.threads = []
+        self.alive = 0
+        self.lock = threading.Lock()
+        self.last_pass = None
+
+    def start(self):
+        """İşçi iş parçacıklarını başlatır"""
+        if self.threads:
+            return
+        logger.info(f"{self.size} işçi başlatılıyor...")
+        ready = threading.Barrier(self.size + 1)
+        for i in range(self.size):
+            thread = threading.Thread(
+                target=self._run, args=(f"worker-{i}", ready), daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+        ready.wait()
+        if self.alive == 0:
+            raise RuntimeError("Hiçbir işçi başlatılamadı")
+        logger.info(f"{self.alive}/{self.size} işçi hazır")
+
+    def _run(self, name, ready):
+        try:
+            worker = self.worker_factory(name)
+        except Exception as e:
+            logger.error(f"{name} başlatılamadı: {e}")
+            ready.wait()
+            return
+
+        with self.lock:
+            self.alive += 1
+        ready.wait()
+
+        try:
+            while True:
+                item = self.tasks.get()
+                if item is _STOP:
+                    break
+                started = time.monotonic()
+                try:
+                    value, error = worker.check(item), None
+                except Exception as e:
+                    value, error = None, e
+                    logger.error(f"{name} kontrol hatası: {e}")
+                self.results.put(
+                    CheckResult(
+                        item, value, error, time.monotonic() - started, name, started
+                    )
+                )
+        finally:
+            with self.lock:
+                self.alive -= 1
+            try:
+                worker.close()
+            except Exception as e:
+                logger.warning(f"{name} kapatılırken hata: {e}")
+
+    def submit(self, item):
+        """Bir ürünü kontrol kuyruğuna ekler"""
+        if self.alive == 0:
+            raise RuntimeError("Çalışan işçi kalmadı")
+        self.tasks.put(item)
+
+    def get_result(self, timeout=None):
+        """Tamamlanan bir kontrolü döndürür, süre dolarsa None"""
+        try:
+            return self.results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def queue_depth(self):
+        return self.tasks.qsize()
+
+    def run_pass(self, items, on_result=None):
+        """Tüm ürünleri kuyruğa atar, sonuçlar geldikçe on_result'ı çağırır
+
+        Tur istatistiklerini (süre, ürün/saniye, işçi başına kontrol) döndürür.
+        """
+        started = time.monotonic()
+        pending = 0
+        for item in items:
+            self.submit(item)
+            pending += 1
+
+        per_worker = {}
+        durations = []
+        while pending:
+            result = self.get_result(timeout=1)
+            if result is None:
+                if self.alive == 0:
+                    raise RuntimeError("Çalışan işçi kalmadı")
+                continue
+            pending -= 1
+            per_worker[result.worker] = per_worker.get(result.worker, 0) + 1
+            durations.append(result.duration)
+            if on_result:
+                on_result(result)
+
+        elapsed = time.monotonic() - started
+        self.last_pass = {
+            "products": len(durations),
+            "duration": elapsed,
+            "throughput": len(durations) / elapsed if elapsed > 0 else 0.0,
+            "avg_check": sum(durations) / len(durations) if durations else 0.0,
+            "workers": self.alive,
+            "per_worker": per_worker,
+        }
+        return self.last_pass
+
+    def shutdown(self, timeout=30):
+        """Tüm işçileri durdurur ve driver'larını kapatır"""
+        if not self.threads:
+            return
+        logger.info("İşçiler durduruluyor...")
+        # Bekleyen işleri boşalt, ardından her işçiye durma sinyali gönder
+        while True:
+            try:
+                self.tasks.get_nowait()
+            except queue.Empty:
+                break
+        for _ in self.threads:
+            self.tasks.put(_STOP)
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+        logger.info("Tüm işçiler durduruldu")
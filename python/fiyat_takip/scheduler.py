@@ -0,0 +1,135 @@
+"""Her ürünü kendi zamanı gelince kontrole gönderen öncelik kuyruğu"""
+
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections import deque
+
+logger = logging.getLogger("price_tracker.scheduler")
+
+
+class Scheduler:
+    """Bir sonraki kontrol zamanına göre sıralı min-heap
+
+    Her ürünün kendi aralığı olabilir; her yeniden planlamaya ±jitter oranında
+    rastgele sapma eklenir, böylece kontroller zamanla yayılır. Kaldırılan ya da
+    yeniden planlanan kayıtlar heap'ten hemen silinmez, sürüm numarasıyla
+    geçersiz sayılır.
+    """
+
+    def __init__(
+        self, default_interval=300, jitter=0.1, clock=time.monotonic, lag_window=1000
+    ):
+        self.default_interval = default_interval
+        self.jitter = max(0.0, float(jitter))
+        self.clock = clock
+        self.heap = []
+        self.entries = {}
+        self.in_flight = {}
+        self.counter = itertools.count()
+        self.lags = deque(maxlen=lag_window)
+        self.max_lag = 0.0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def _push(self, key, due):
+        entry = self.entries[key]
+        entry["version"] += 1
+        entry["due"] = due
+        heapq.heappush(self.heap, (due, next(self.counter), key, entry["version"]))
+
+    def _jittered(self, interval):
+        if not self.jitter:
+            return interval
+        return max(0.0, interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def add(self, key, interval=None, delay=0.0):
+        """Ürünü planlar; delay saniye sonra ilk kez kontrol edilir"""
+        self.entries[key] = {
+            "interval": interval or self.default_interval,
+            "due": None,
+            "version": 0,
+        }
+        self._push(key, self.clock() + delay)
+
+    def remove(self, key):
+        self.entries.pop(key, None)
+        self.in_flight.pop(key, None)
+
+    def set_interval(self, key, interval):
+        """Ürünün kontrol aralığını değiştirir; bir sonraki planlamada geçerli olur"""
+        if key in self.entries:
+            self.entries[key]["interval"] = interval or self.default_interval
+
+    def reschedule(self, key, delay=0.0):
+        """Sıradaki ürünün kontrol zamanını şimdiden delay saniye sonrasına çeker"""
+        if key in self.entries and key not in self.in_flight:
+            self._push(key, self.clock() + delay)
+
+    def defer(self, key, delay):
+        """Zamanı gelmiş ama gönderilemeyen ürünü delay saniye sonraya erteler"""
+        self.in_flight.pop(key, None)
+        if key in self.entries:
+            self._push(key, self.clock() + delay)
+
+    def _discard_stale(self):
+        while self.heap:
+            due, _, key, version = self.heap[0]
+            entry = self.entries.get(key)
+            if (
+                entry is not None
+                and entry["version"] == version
+                and key not in self.in_flight
+            ):
+                return
+            heapq.heappop(self.heap)
+
+    def time_until_next(self):
+        """Bir sonraki kontrole kalan süre; planlı ürün yoksa None"""
+        self._discard_stale()
+        if not self.heap:
+            return None
+        return max(0.0, self.heap[0][0] - self.clock())
+
+    def pop_due(self, now=None):
+        """Zamanı gelmiş ürünleri döndürür ve onları çalışıyor olarak işaretler"""
+        now = self.clock() if now is None else now
+        due_keys = []
+        while True:
+            self._discard_stale()
+            if not self.heap or self.heap[0][0] > now:
+                break
+            due, _, key, _ = heapq.heappop(self.heap)
+            self.in_flight[key] = due
+            due_keys.append(key)
+        return due_keys
+
+    def complete(self, key, started=None):
+        """Kontrol bitince gecikmeyi kaydeder ve ürünü yeniden planlar"""
+        due = self.in_flight.pop(key, None)
+        if due is not None and started is not None:
+            lag = max(0.0, started - due)
+            self.lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self._push(key, self.clock() + self._jittered(entry["interval"]))
+
+    def lag_summary(self):
+        """Kontrollerin planlanan zamandan ne kadar geç başladığı (saniye)"""
+        if not self.lags:
+            return {"count": 0, "avg": 0.0, "p50": 0.0, "p95": 0.0, "max": self.max_lag}
+        ordered = sorted(self.lags)
+        return {
+            "count": len(ordered),
+            "avg": sum(ordered) / len(ordered),
+            "p50": ordered[int(0.5 * (len(ordered) - 1))],
+            "p95": ordered[int(0.95 * (len(ordered) - 1))],
+            "max": self.max_lag,
+        }
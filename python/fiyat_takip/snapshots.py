@@ -0,0 +1,382 @@
+"""Kontrol edilen sayfaların sıkıştırılmış anlık görüntüleri ve çevrimdışı yeniden çıkarma"""
+
+import gzip
+import hashlib
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .dom import cascade
+from .fastpath import extract_structured
+from .history import connect, product_key
+from .stores import StoreRegistry
+
+logger = logging.getLogger("price_tracker.snapshots")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    digest TEXT NOT NULL,
+    product_key TEXT NOT NULL,
+    url TEXT NOT NULL,
+    store TEXT NOT NULL,
+    source TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    price REAL,
+    old_price REAL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_taken ON snapshots (taken_at);
+CREATE INDEX IF NOT EXISTS idx_snapshots_digest ON snapshots (digest);
+"""
+
+INDEX_NAME = "index.sqlite"
+
+# Sınır aşılınca boyut bu orana inene kadar eski kayıtlar silinir
+EVICT_TO = 0.9
+
+# Hiçbir kural eşleşmeyip fiyat JSON-LD/meta'dan okunduğunda raporlanan kural adı
+STRUCTURED_RULE = "(yapısal veri)"
+
+_STOP = object()
+
+# Yeniden çıkarma süreçlerinin mağaza kaydı (_init_worker ile kurulur)
+_registry = None
+
+
+def object_path(directory, digest):
+    """İçerik özetinin sıkıştırılmış dosya yolu (ilk iki karakter alt dizin)"""
+    return os.path.join(directory, "objects", digest[:2], f"{digest}.html.gz")
+
+
+def load_snapshot(path):
+    with gzip.open(path, "rb") as f:
+        return f.read().decode("utf-8", errors="replace")
+
+
+class SnapshotStore:
+    """Sayfa HTML'lerini gzip'leyip içeriğin SHA-256 özetiyle saklar
+
+    Aynı içerik bir kez yazılır; her kontrol dizine (hangi sayfa, ne zaman,
+    hangi yoldan, hangi fiyat okundu) bir satır ekler. Sıkıştırma, yazma ve
+    temizlik arka plandaki tek bir iş parçacığında yapılır; kuyruk doluysa
+    görüntü atlanır, kontroller hiç beklemez. Nesnelerin toplam boyutu
+    max_bytes'ı aşınca en eski kayıtlar ve artık başvurulmayan nesneler
+    silinir.
+    """
+
+    def __init__(
+        self, directory, max_bytes=500 * 1024 * 1024, failures_only=False, backlog=100
+    ):
+        self.directory = os.path.abspath(directory)
+        os.makedirs(os.path.join(self.directory, "objects"), exist_ok=True)
+        self.index_path = os.path.join(self.directory, INDEX_NAME)
+        self.max_bytes = max_bytes
+        self.failures_only = failures_only
+        self.queue = queue.Queue(maxsize=backlog)
+        self.lock = threading.Lock()
+        self.written = 0
+        self.deduplicated = 0
+        self.dropped = 0
+        self.evicted = 0
+
+        with connect(self.index_path) as conn:
+            conn.executescript(SCHEMA)
+            self.total_bytes, self.objects = conn.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM objects"
+            ).fetchone()
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        logger.info(
+            f"Sayfa görüntüleri deposu açıldı: {self.directory} "
+            f"({self.objects} nesne, {self.total_bytes / 1024 / 1024:.1f} MB)"
+        )
+
+    def wants(self, price_info):
+        """Bu sonucun sayfası kaydedilecek mi (failures_only ise yalnızca başarısızlar)"""
+        return not (self.failures_only and price_info)
+
+    def record(self, url, store, html, price_info=None, source="http"):
+        """Sayfanın HTML'ini kayıt kuyruğuna ekler; kuyruk doluysa atlar"""
+        if not html or not self.wants(price_info):
+            return
+        try:
+            self.queue.put_nowait(
+                (
+                    html,
+                    product_key(url, store),
+                    url,
+                    store,
+                    source,
+                    time.time(),
+                    price_info["current_price"] if price_info else None,
+                    price_info.get("old_price") if price_info else None,
+                )
+            )
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+
+    def _run(self):
+        conn = connect(self.index_path)
+        try:
+            while True:
+                item = self.queue.get()
+                if item is _STOP:
+                    break
+                try:
+                    self._store(conn, item)
+                    if self.total_bytes > self.max_bytes:
+                        self._evict(conn)
+                except (OSError, sqlite3.Error) as e:
+                    logger.error(f"Sayfa görüntüsü kaydedilemedi ({item[2]}): {e}")
+        finally:
+            conn.close()
+
+    def _store(self, conn, item):
+        html, *row = item
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = object_path(self.directory, digest)
+        size = None
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            compressed = gzip.compress(data, compresslevel=6)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(compressed)
+            os.replace(temp_path, path)
+            size = len(compressed)
+        with conn:
+            if size is not None:
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO objects (digest, size, created_at) VALUES (?, ?, ?)",
+                    (digest, size, row[4]),
+                ).rowcount
+                if inserted:
+                    self.total_bytes += size
+                    self.objects += 1
+            conn.execute(
+                "INSERT INTO snapshots (digest, product_key, url, store, source, taken_at, price, old_price) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (digest, *row),
+            )
+        with self.lock:
+            self.written += 1
+            if size is None:
+                self.deduplicated += 1
+
+    def _evict(self, conn, batch=200):
+        """En eski kayıtları siler, başvurusu kalmayan nesneleri diskten kaldırır"""
+        target = self.max_bytes * EVICT_TO
+        removed = 0
+        # Aynı dizine yazan başka süreçlerin nesneleri de sayılır
+        self.total_bytes, self.objects = conn.execute(
+            "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM objects"
+        ).fetchone()
+        while self.total_bytes > target:
+            with conn:
+                deleted = conn.execute(
+                    "DELETE FROM snapshots WHERE id IN "
+                    "(SELECT id FROM snapshots ORDER BY taken_at LIMIT ?)",
+                    (batch,),
+                ).rowcount
+                orphans = conn.execute(
+                    "SELECT digest, size FROM objects WHERE digest NOT IN "
+                    "(SELECT digest FROM snapshots)"
+                ).fetchall()
+                conn.executemany(
+                    "DELETE FROM objects WHERE digest = ?",
+                    [(digest,) for digest, _ in orphans],
+                )
+            for digest, size in orphans:
+                try:
+                    os.remove(object_path(self.directory, digest))
+                except FileNotFoundError:
+                    pass
+                self.total_bytes -= size
+                self.objects -= 1
+            removed += deleted
+            if not deleted:
+                break
+        with self.lock:
+            self.evicted += removed
+        logger.info(
+            f"Sayfa görüntüleri sınırı aşıldı: {removed} eski kayıt silindi, "
+            f"{self.total_bytes / 1024 / 1024:.1f} MB kaldı"
+        )
+
+    def summary(self):
+        with self.lock:
+            return {
+                "dir": self.directory,
+                "objects": self.objects,
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "written": self.written,
+                "deduplicated": self.deduplicated,
+                "dropped": self.dropped,
+                "evicted": self.evicted,
+            }
+
+    def close(self, timeout=30):
+        """Bekleyen görüntüleri yazar ve yazıcıyı durdurur"""
+        self.queue.put(_STOP)
+        self.thread.join(timeout)
+        logger.info(
+            f"Sayfa görüntüleri kapatıldı: {self.written} kayıt, "
+            f"{self.deduplicated} tekrar, {self.dropped} atlandı"
+        )
+
+
+def _init_worker(store_settings):
+    global _registry
+    _registry = StoreRegistry(store_settings)
+
+
+def extract_with_rules(html, adapter):
+    """Mağazanın sıralı fiyat kurallarını arşivlenmiş HTML'e uygular
+
+    Tarayıcıdaki kural zinciriyle (waits.CASCADE_SCRIPT) aynı sırayla
+    denenir ve metinler StoreAdapter.parse ile okunur. Hiçbir kural
+    eşleşmezse, canlı hızlı yolda olduğu gibi JSON-LD/meta denenir.
+    Sonucun "rule" alanı eşleşen kuralın adıdır.
+    """
+    info = adapter.price_info(cascade(html, adapter.rules))
+    if info is None:
+        info = extract_structured(html, adapter)
+        if info:
+            info["rule"] = STRUCTURED_RULE
+    return info
+
+
+def _extract_batch(batch):
+    """Süreç havuzunda çalışır: (özet, mağaza, yol) listesindeki sayfalardan fiyat çıkarır"""
+    results = []
+    for digest, store, path in batch:
+        try:
+            adapter = _registry.get(store)
+            if adapter is None:
+                raise ValueError(f"Desteklenmeyen mağaza: {store}")
+            info = extract_with_rules(load_snapshot(path), adapter)
+            results.append((digest, store, info, None))
+        except Exception as e:
+            results.append((digest, store, None, str(e)))
+    return results
+
+
+def reextract(
+    directory,
+    store=None,
+    since=None,
+    workers=None,
+    batch_size=50,
+    samples=20,
+    store_settings=None,
+):
+    """Arşivdeki görüntülerden mağaza kurallarıyla fiyatları yeniden okur
+
+    Her farklı içerik (özet, mağaza) bir kez işlenir; işler batch_size'lık
+    parçalar halinde süreç havuzuna dağıtılır. store_settings konfigürasyonun
+    "stores" bölümüdür; yerleşik mağazalarla birleştirilip her sürece verilir.
+    Sonuçlar kayıt anında okunan fiyatla karşılaştırılır: aynı, değişen,
+    kaybedilen (önceden okunuyordu, artık okunmuyor) ve kazanılan fiyatlar,
+    mağaza başına da hangi kuralın eşleştiği sayılır.
+    """
+    # Hatalı mağaza tanımı süreçler başlamadan bildirilir
+    StoreRegistry(store_settings)
+    directory = os.path.abspath(directory)
+    index_path = os.path.join(directory, INDEX_NAME)
+    if not os.path.exists(index_path):
+        raise FileNotFoundError(f"Sayfa görüntüsü dizini bulunamadı: {index_path}")
+
+    sql = "SELECT digest, url, store, source, taken_at, price FROM snapshots WHERE taken_at >= ?"
+    params = [since or 0]
+    if store:
+        sql += " AND store = ?"
+        params.append(store.lower())
+    with connect(index_path) as conn:
+        rows = conn.execute(sql + " ORDER BY taken_at", params).fetchall()
+
+    jobs = sorted(
+        {
+            (digest, row_store, object_path(directory, digest))
+            for digest, _, row_store, _, _, _ in rows
+        }
+    )
+    batches = [jobs[i : i + batch_size] for i in range(0, len(jobs), batch_size)]
+    started = time.monotonic()
+    extracted = {}
+    if batches:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(store_settings,)
+        ) as executor:
+            for results in executor.map(_extract_batch, batches):
+                for digest, row_store, info, error in results:
+                    extracted[(digest, row_store)] = (info, error)
+    elapsed = time.monotonic() - started
+
+    report = {
+        "snapshots": len(rows),
+        "unique_pages": len(jobs),
+        "seconds": round(elapsed, 2),
+        "pages_per_second": round(len(jobs) / elapsed, 1) if elapsed > 0 else None,
+        "stores": {},
+        "mismatches": [],
+    }
+    for digest, url, row_store, source, taken_at, recorded in rows:
+        info, error = extracted[(digest, row_store)]
+        price = info["current_price"] if info else None
+        rule = info["rule"] if info else None
+        if error is not None:
+            # Başka bir sürecin temizliğinde silinmiş ya da bozuk nesne
+            outcome = "unreadable"
+        elif recorded is None and price is None:
+            outcome = "missing"
+        elif recorded is None:
+            outcome = "gained"
+        elif price is None:
+            outcome = "lost"
+        elif abs(price - recorded) > 0.005:
+            outcome = "changed"
+        else:
+            outcome = "same"
+        counts = report["stores"].setdefault(
+            row_store,
+            {
+                "same": 0,
+                "changed": 0,
+                "lost": 0,
+                "gained": 0,
+                "missing": 0,
+                "unreadable": 0,
+                "rules": {},
+            },
+        )
+        counts[outcome] += 1
+        if rule is not None:
+            counts["rules"][rule] = counts["rules"].get(rule, 0) + 1
+        if outcome in ("changed", "lost") and len(report["mismatches"]) < samples:
+            report["mismatches"].append(
+                {
+                    "url": url,
+                    "store": row_store,
+                    "source": source,
+                    "taken_at": taken_at,
+                    "digest": digest,
+                    "recorded": recorded,
+                    "extracted": price,
+                    "rule": rule,
+                    "error": error,
+                }
+            )
+    return report
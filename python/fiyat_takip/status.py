@@ -0,0 +1,145 @@
+"""Makine tarafından okunabilir durum dosyası ve Prometheus metrikleri"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("price_tracker.status")
+
+# Kontrol süresi histogramının kova sınırları (saniye)
+DURATION_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60)
+
+
+def write_json_atomic(path, data):
+    """JSON'u geçici dosyaya yazıp yerine taşır; okuyan hiçbir zaman yarım dosya görmez"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, ensure_ascii=False, default=str)
+    os.replace(tmp, path)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    inner = ",".join(
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for key, value in sorted(labels.items())
+    )
+    return "{" + inner + "}"
+
+
+class Metrics:
+    """Sayaç, gösterge ve histogramları tutan basit, iş parçacığı güvenli kayıt"""
+
+    def __init__(self, prefix="fiyat_takip"):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.help = {}
+
+    def _key(self, name, labels):
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name, value=1, help=None, **labels):
+        with self.lock:
+            key = self._key(name, labels)
+            self.counters[key] = self.counters.get(key, 0) + value
+            if help:
+                self.help[name] = ("counter", help)
+
+    def set(self, name, value, help=None, **labels):
+        with self.lock:
+            self.gauges[self._key(name, labels)] = value
+            if help:
+                self.help[name] = ("gauge", help)
+
+    def observe(self, name, value, help=None, buckets=DURATION_BUCKETS, **labels):
+        with self.lock:
+            key = self._key(name, labels)
+            entry = self.histograms.get(key)
+            if entry is None:
+                entry = self.histograms[key] = {
+                    "buckets": tuple(buckets),
+                    "counts": [0] * len(buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for i, bound in enumerate(entry["buckets"]):
+                if value <= bound:
+                    entry["counts"][i] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+            if help:
+                self.help[name] = ("histogram", help)
+
+    def value(self, name, **labels):
+        with self.lock:
+            key = self._key(name, labels)
+            return self.counters.get(key, self.gauges.get(key))
+
+    def render(self):
+        """Prometheus metin biçiminde çıktı"""
+        lines = []
+        with self.lock:
+            names = {}
+            for (name, labels), value in self.counters.items():
+                names.setdefault(name, []).append((labels, value))
+            for (name, labels), value in self.gauges.items():
+                names.setdefault(name, []).append((labels, value))
+            for name in sorted(names):
+                kind, text = self.help.get(name, ("untyped", name))
+                full = f"{self.prefix}_{name}"
+                lines.append(f"# HELP {full} {text}")
+                lines.append(f"# TYPE {full} {kind}")
+                for labels, value in names[name]:
+                    lines.append(f"{full}{_labels(dict(labels))} {value}")
+
+            histograms = {}
+            for (name, labels), entry in self.histograms.items():
+                histograms.setdefault(name, []).append((dict(labels), entry))
+            for name in sorted(histograms):
+                full = f"{self.prefix}_{name}"
+                text = self.help.get(name, ("histogram", name))[1]
+                lines.append(f"# HELP {full} {text}")
+                lines.append(f"# TYPE {full} histogram")
+                for labels, entry in histograms[name]:
+                    for bound, count in zip(entry["buckets"], entry["counts"]):
+                        lines.append(
+                            f"{full}_bucket{_labels({**labels, 'le': bound})} {count}"
+                        )
+                    lines.append(
+                        f"{full}_bucket{_labels({**labels, 'le': '+Inf'})} {entry['count']}"
+                    )
+                    lines.append(f"{full}_sum{_labels(labels)} {entry['sum']}")
+                    lines.append(f"{full}_count{_labels(labels)} {entry['count']}")
+        return "\n".join(lines) + "\n"
+
+
+class StatusWriter:
+    """Durum anlık görüntüsünü en fazla her `interval` saniyede bir dosyaya yazar"""
+
+    def __init__(self, path, interval=5.0):
+        self.path = path
+        self.interval = interval
+        self.last_write = 0.0
+        self.snapshot = {}
+
+    def maybe_write(self, build, force=False):
+        """Süre dolduysa build() ile anlık görüntüyü üretip yazar"""
+        now = time.monotonic()
+        if not force and now - self.last_write < self.interval:
+            return False
+        self.last_write = now
+        self.snapshot = build()
+        try:
+            write_json_atomic(self.path, self.snapshot)
+        except OSError as e:
+            logger.warning(f"Durum dosyası yazılamadı: {e}")
+            return False
+        return True
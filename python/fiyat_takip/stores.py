@@ -0,0 +1,217 @@
+"""Mağaza bağdaştırıcıları: sıralı fiyat seçici kuralları ve yerel ayara göre fiyat ayrıştırma
+
+Her mağaza, sayfadaki fiyatı hangi seçicilerle ve hangi sırayla arayacağını
+(kural zinciri) ve fiyat metnindeki binlik/ondalık ayırıcılarını bildirir.
+Yerleşik mağazalar burada tanımlıdır; konfigürasyonun "stores" bölümü
+bunları değiştirebilir ya da kod yazmadan yeni mağaza ekleyebilir.
+fast_path açık mağazalar önce tarayıcısız denenir; yerleşik olmayan
+mağazalarda hızlı yol yalnızca JSON-LD/meta fiyatını okuyabilir:
+
+    "stores": {
+        "bershka": {
+            "label": "Bershka",
+            "locale": "tr",
+            "fast_path": false,
+            "rules": [
+                {"name": "sale", "current": ".current-price-elem", "old": ".old-price-elem"},
+                {"name": "regular", "current": ".price-elem"}
+            ]
+        }
+    }
+"""
+
+import html as htmllib
+import logging
+import re
+import threading
+
+logger = logging.getLogger("price_tracker.stores")
+
+# Dil kodu -> (binlik ayırıcı, ondalık ayırıcı)
+LOCALES = {
+    "tr": (".", ","),
+    "de": (".", ","),
+    "es": (".", ","),
+    "it": (".", ","),
+    "nl": (".", ","),
+    "pt": (".", ","),
+    "en": (",", "."),
+}
+
+PRICE_CHARS = re.compile(r"[^\d.,]")
+PLAIN_NUMBER = re.compile(r"^\d+(\.\d+)?$")
+
+BUILTIN_STORES = {
+    "zara": {
+        "label": "Zara",
+        "locale": "tr",
+        "fast_path": True,
+        "rules": [
+            # İndirimde: güncel fiyat ve üstü çizili liste fiyatı
+            {
+                "name": "sale",
+                "current": 'span[data-qa-qualifier="price-amount-current"] .money-amount__main',
+                "old": 'span[data-qa-qualifier="price-amount-old"] .money-amount__main',
+            },
+            # Yalnızca liste fiyatı varsa o güncel fiyattır
+            {
+                "name": "list",
+                "current": 'span[data-qa-qualifier="price-amount-old"] .money-amount__main',
+            },
+        ],
+    },
+    "pull&bear": {
+        "label": "Pull&Bear",
+        "locale": "tr",
+        "fast_path": True,
+        "rules": [
+            {"name": "current", "current": ".price-current-price"},
+            {"name": "alternative", "current": ".price span"},
+        ],
+    },
+}
+
+
+class StoreAdapter:
+    """Bir mağazanın fiyat kural zinciri ve fiyat biçimi"""
+
+    def __init__(self, name, rules, locale="tr", label=None, fast_path=False):
+        self.name = name
+        self.label = label or name
+        self.fast_path = bool(fast_path)
+        self.rules = []
+        for index, rule in enumerate(rules):
+            if not rule.get("current"):
+                raise ValueError(f"{name}: {index + 1}. kuralda 'current' seçicisi yok")
+            self.rules.append(
+                {
+                    "name": rule.get("name") or f"rule{index + 1}",
+                    "current": rule["current"],
+                    "old": rule.get("old"),
+                }
+            )
+        if not self.rules:
+            raise ValueError(f"{name}: fiyat kuralı tanımlanmadı")
+        language = re.split(r"[-_]", locale or "tr")[0].lower()
+        if language not in LOCALES:
+            raise ValueError(f"{name}: desteklenmeyen yerel ayar: {locale}")
+        self.locale = locale
+        self.thousands, self.decimal = LOCALES[language]
+
+    def parse(self, text):
+        """'1.299,95 TL' (tr) ya da '$1,299.95' (en) biçimindeki fiyatı sayıya çevirir"""
+        if isinstance(text, (int, float)):
+            return float(text)
+        digits = PRICE_CHARS.sub("", htmllib.unescape(str(text)))
+        digits = digits.replace(self.thousands, "").replace(self.decimal, ".")
+        digits = digits.strip(".")
+        if not digits:
+            raise ValueError(f"Fiyat metninde sayı yok: {text!r}")
+        return float(digits)
+
+    def parse_number(self, value):
+        """Yapısal verideki (JSON-LD, meta) fiyat: '1299.95' ya da 1299.95
+
+        Düz ondalık sayı olarak yazılmamış değerler (ör. '1.299' ya da
+        '1.299,95') mağazanın yerel biçimiyle okunur.
+        """
+        if isinstance(value, (int, float)):
+            return float(value)
+        text = htmllib.unescape(str(value)).strip()
+        if PLAIN_NUMBER.match(text) and not (
+            self.thousands == "." and re.match(r"^\d{1,3}(\.\d{3})+$", text)
+        ):
+            return float(text)
+        return self.parse(text)
+
+    def price_info(self, match):
+        """Kural zincirinin sonucunu fiyat bilgisine çevirir; eşleşme yoksa None"""
+        if not match or match.get("rule") is None:
+            return None
+        current_text = match["current"]
+        old_text = match.get("old")
+        return {
+            "current_price": self.parse(current_text),
+            "old_price": self.parse(old_text) if old_text else None,
+            "current_price_text": current_text,
+            "old_price_text": old_text,
+            "rule": self.rules[match["rule"]]["name"],
+        }
+
+
+class StoreRegistry:
+    """Yerleşik ve konfigürasyondan gelen mağazalar ile kural isabet sayaçları
+
+    İşçiler aynı kaydı paylaşır; her tarayıcı kontrolünde hangi kuralın
+    eşleştiği (ya da hiçbirinin eşleşmediği) sayılır. Hiç isabet almayan
+    kurallar, sitenin değişen tasarımını gösterir.
+    """
+
+    def __init__(self, settings=None):
+        definitions = {name: dict(spec) for name, spec in BUILTIN_STORES.items()}
+        # PHP boş nesneyi liste olarak kodlayabilir
+        if not isinstance(settings, dict):
+            settings = {}
+        for name, spec in settings.items():
+            definitions.setdefault(name.lower(), {}).update(spec or {})
+        self.adapters = {}
+        for name, spec in definitions.items():
+            self.adapters[name] = StoreAdapter(
+                name,
+                spec.get("rules", []),
+                locale=spec.get("locale", "tr"),
+                label=spec.get("label"),
+                fast_path=spec.get("fast_path", False),
+            )
+        custom = sorted(set(self.adapters) - set(BUILTIN_STORES))
+        if custom:
+            logger.info(f"Konfigürasyondan eklenen mağazalar: {', '.join(custom)}")
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def __contains__(self, store):
+        return store in self.adapters
+
+    def get(self, store):
+        return self.adapters.get(store)
+
+    def names(self):
+        return list(self.adapters)
+
+    def fast_path_stores(self):
+        """Tarayıcısız hızlı yolu açık mağazalar"""
+        return [name for name, adapter in self.adapters.items() if adapter.fast_path]
+
+    def record(self, store, rule):
+        """Bir kontrolde eşleşen kuralı sayar; rule None ise hiçbir kural eşleşmemiştir"""
+        with self.lock:
+            entry = self.counts.setdefault(
+                store, {"checks": 0, "misses": 0, "hits": {}}
+            )
+            entry["checks"] += 1
+            if rule is None:
+                entry["misses"] += 1
+            else:
+                entry["hits"][rule] = entry["hits"].get(rule, 0) + 1
+
+    def summary(self):
+        """Mağaza başına kontrol, ıska ve zincir sırasıyla kural isabet oranları"""
+        summary = {}
+        with self.lock:
+            for store, entry in self.counts.items():
+                adapter = self.adapters[store]
+                checks = entry["checks"]
+                summary[store] = {
+                    "checks": checks,
+                    "misses": entry["misses"],
+                    "rules": {
+                        rule["name"]: {
+                            "hits": entry["hits"].get(rule["name"], 0),
+                            "rate": round(
+                                entry["hits"].get(rule["name"], 0) / checks, 3
+                            ),
+                        }
+                        for rule in adapter.rules
+                    },
+                }
+        return summary
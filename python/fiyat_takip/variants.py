@@ -0,0 +1,274 @@
+"""Tek sayfa yüklemesinden ürünün renk/beden varyantlarını ve stok durumlarını çıkarır"""
+
+import json
+import logging
+import re
+
+logger = logging.getLogger("price_tracker.variants")
+
+# Yapısal veri bulunamazsa okunan renk ve beden seçicileri
+DOM_SELECTORS = {
+    "zara": {
+        "color": ".product-color-extended-name, .product-detail-selected-color",
+        "sizes": ".size-selector-list li, .size-selector-sizes__size",
+    },
+    "pull&bear": {
+        "color": ".product-colors .selected, .product-colors [aria-checked='true']",
+        "sizes": ".product-sizes span, .product-sizes li",
+    },
+}
+
+# Stokta olmayan bedenlerin sınıf ve öznitelik işaretleri
+UNAVAILABLE_MARKERS = re.compile(
+    r"\bdisabled\b|out-of-stock|unavailable|sold-out|aria-disabled=\"true\"", re.I
+)
+
+# schema.org ve mağaza verilerindeki stok dışı durumlar
+UNAVAILABLE_STATES = ("outofstock", "out_of_stock", "soldout", "discontinued")
+
+# Gömülü verileri ve seçicileri tek bir tarayıcı çağrısında toplar
+VARIANT_SCRIPT = """
+var selectors = arguments[0] || {};
+var out = {ld: [], payload: null, color: null, sizes: []};
+var scripts = document.querySelectorAll('script[type="application/ld+json"]');
+for (var i = 0; i < scripts.length; i++) {
+    out.ld.push(scripts[i].textContent);
+}
+try {
+    if (window.zara && window.zara.viewPayload) {
+        out.payload = JSON.stringify(window.zara.viewPayload);
+    }
+} catch (e) {}
+if (selectors.color) {
+    var color = document.querySelector(selectors.color);
+    out.color = color ? (color.innerText || color.textContent).trim() : null;
+}
+if (selectors.sizes) {
+    var items = document.querySelectorAll(selectors.sizes);
+    for (var j = 0; j < items.length; j++) {
+        var el = items[j];
+        var marks = (el.getAttribute('class') || '') + ' ' +
+            (el.getAttribute('aria-disabled') === 'true' ? 'disabled' : '');
+        out.sizes.push({
+            name: (el.innerText || el.textContent).trim(),
+            available: !(el.disabled || /disabled|out-of-stock|unavailable|sold-out/i.test(marks))
+        });
+    }
+}
+return out;
+"""
+
+
+def normalize_name(value):
+    """Renk ve beden adlarını karşılaştırma için sadeleştirir"""
+    if value is None or str(value).strip() == "":
+        return None
+    return " ".join(str(value).split()).casefold()
+
+
+def variant_spec(entry):
+    """Ürün kaydındaki renk/beden seçimini döndürür; seçim yoksa None
+
+    Seçim "variant": {"color": ..., "size": ...} ya da doğrudan kaydın
+    color/size alanlarıyla verilebilir.
+    """
+    source = entry.get("variant") if isinstance(entry.get("variant"), dict) else entry
+    spec = {
+        name: str(source[name]).strip()
+        for name in ("color", "size")
+        if normalize_name(source.get(name)) is not None
+    }
+    return spec or None
+
+
+def variant_key(spec):
+    """Seçimin 'renk/beden' anahtarı; seçim yoksa boş metin"""
+    if not spec:
+        return ""
+    return "/".join(normalize_name(spec.get(name)) or "*" for name in ("color", "size"))
+
+
+def variant_label(spec):
+    parts = []
+    if spec.get("color"):
+        parts.append(f"Renk: {spec['color']}")
+    if spec.get("size"):
+        parts.append(f"Beden: {spec['size']}")
+    return ", ".join(parts)
+
+
+def _number(value, adapter):
+    """Yapısal verideki fiyatı mağazanın yerel biçimiyle sayıya çevirir"""
+    try:
+        return adapter.parse_number(value)
+    except ValueError:
+        return None
+
+
+def _cents(value):
+    return value / 100.0 if isinstance(value, (int, float)) and value else None
+
+
+def _availability(value):
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return value
+    state = str(value).rsplit("/", 1)[-1].lower()
+    return not any(marker in state for marker in UNAVAILABLE_STATES)
+
+
+def _variant(color, size, price, old_price=None, available=None):
+    return {
+        "color": color,
+        "size": size,
+        "current_price": price,
+        "old_price": old_price if old_price and price and old_price > price else None,
+        "available": available,
+    }
+
+
+def _from_payload(payload):
+    """Zara'nın gömülü ürün verisi; fiyatlar kuruş cinsindendir"""
+    product = payload.get("product") if isinstance(payload, dict) else None
+    detail = (product or {}).get("detail") or {}
+    variants = []
+    for color in detail.get("colors") or []:
+        name = color.get("name")
+        price = _cents(color.get("price"))
+        old_price = _cents(color.get("oldPrice"))
+        sizes = color.get("sizes") or []
+        if not sizes:
+            variants.append(_variant(name, None, price, old_price))
+        for size in sizes:
+            variants.append(
+                _variant(
+                    name,
+                    size.get("name"),
+                    _cents(size.get("price")) or price,
+                    _cents(size.get("oldPrice")) or old_price,
+                    _availability(size.get("availability")),
+                )
+            )
+    return variants
+
+
+def _offer(offers, adapter):
+    """İlk fiyatlı teklifin fiyatı ve ilk bildirilen stok durumu"""
+    available = None
+    for offer in offers if isinstance(offers, list) else [offers]:
+        if not isinstance(offer, dict):
+            continue
+        if available is None:
+            available = _availability(offer.get("availability"))
+        price = offer.get("price", offer.get("lowPrice"))
+        if price is None and isinstance(offer.get("priceSpecification"), dict):
+            price = offer["priceSpecification"].get("price")
+        if price is not None:
+            return _number(price, adapter), _availability(offer.get("availability"))
+    return None, available
+
+
+def _name(value):
+    # schema.org'da beden metin ya da SizeSpecification olabilir
+    return value.get("name") if isinstance(value, dict) else value
+
+
+def _walk_variants(node, adapter, inherited=(None, None)):
+    """JSON-LD ağacındaki renk/beden taşıyan ürünleri dolaşır
+
+    Kendi teklifi olmayan varyantlar üst ürün grubunun fiyatını alır.
+    """
+    if isinstance(node, list):
+        for item in node:
+            yield from _walk_variants(item, adapter, inherited)
+    elif isinstance(node, dict):
+        if "@graph" in node:
+            yield from _walk_variants(node["@graph"], adapter, inherited)
+        price, available = _offer(node.get("offers"), adapter)
+        if price is None:
+            price = inherited[0]
+        if available is None:
+            available = inherited[1]
+        if "hasVariant" in node:
+            yield from _walk_variants(node["hasVariant"], adapter, (price, available))
+        elif "color" in node or "size" in node:
+            yield _variant(
+                _name(node.get("color")),
+                _name(node.get("size")),
+                price,
+                available=available,
+            )
+
+
+def _from_json_ld(blocks, adapter):
+    variants = []
+    for block in blocks:
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        variants.extend(_walk_variants(data, adapter))
+    return variants
+
+
+def build_variants(sources, price_info, adapter):
+    """Toplanan kaynaklardan varyant listesini oluşturur
+
+    Önce mağazanın gömülü verisi, sonra JSON-LD kullanılır. İkisi de yoksa
+    sayfadaki beden listesi sayfanın fiyatıyla eşlenir (renk yalnızca
+    seçili renk bilinirse doldurulur). JSON-LD fiyatları mağaza
+    bağdaştırıcısının (stores.StoreAdapter) parse_number'ıyla okunur.
+    """
+    variants = []
+    payload = sources.get("payload")
+    if payload:
+        try:
+            variants = _from_payload(json.loads(payload))
+        except (ValueError, AttributeError, TypeError) as e:
+            logger.debug(f"Gömülü ürün verisi okunamadı: {e}")
+    if not variants:
+        variants = _from_json_ld(sources.get("ld") or [], adapter)
+    variants = [variant for variant in variants if variant["current_price"]]
+    if variants:
+        return variants
+
+    current = price_info["current_price"]
+    old_price = price_info.get("old_price")
+    color = sources.get("color") or None
+    sizes = [size for size in sources.get("sizes") or [] if size.get("name")]
+    if sizes:
+        return [
+            _variant(color, size["name"], current, old_price, size.get("available"))
+            for size in sizes
+        ]
+    if color:
+        return [_variant(color, None, current, old_price)]
+    return []
+
+
+def match_variant(variants, spec):
+    """Takipçinin seçimine uyan varyantın fiyat bilgisini döndürür; uyan yoksa None
+
+    Yalnızca renk seçildiyse o rengin stoktaki bedenlerinin en düşük fiyatı
+    kullanılır; hiçbiri stokta değilse available False olur.
+    """
+    color = normalize_name(spec.get("color"))
+    size = normalize_name(spec.get("size"))
+    matches = [
+        variant
+        for variant in variants or []
+        if (color is None or normalize_name(variant["color"]) == color)
+        and (size is None or normalize_name(variant["size"]) == size)
+    ]
+    if not matches:
+        return None
+    available = [variant for variant in matches if variant["available"] is not False]
+    best = min(available or matches, key=lambda variant: variant["current_price"])
+    return {
+        "current_price": best["current_price"],
+        "old_price": best["old_price"],
+        "available": bool(available),
+        "color": best["color"],
+        "size": best["size"],
+    }
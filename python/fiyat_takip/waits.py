@@ -0,0 +1,150 @@
+"""Sabit beklemeler yerine sayfa hazır olunca dönen bekleme katmanı"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger("price_tracker.waits")
+
+# Mağaza başına varsayılan azami bekleme (saniye)
+DEFAULT_WAIT_CAP = 20
+
+# Histogram kova sınırları (saniye)
+BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 16, 32)
+
+# Tüm seçicileri tek bir tarayıcı çağrısında sorgular
+PROBE_SCRIPT = """
+var selectors = arguments[0];
+var out = {ready: document.readyState, texts: {}};
+for (var key in selectors) {
+    var el = document.querySelector(selectors[key]);
+    out.texts[key] = el ? (el.innerText || el.textContent) : null;
+}
+return out;
+"""
+
+# Fiyat kurallarını sırayla dener; ilk eşleşen kuralın sırasını ve metinlerini döndürür
+CASCADE_SCRIPT = """
+var rules = arguments[0];
+function text(selector) {
+    var el = selector ? document.querySelector(selector) : null;
+    var value = el ? (el.innerText || el.textContent || '').trim() : '';
+    return value || null;
+}
+for (var i = 0; i < rules.length; i++) {
+    var current = text(rules[i].current);
+    if (current) {
+        return {ready: document.readyState, rule: i, current: current, old: text(rules[i].old)};
+    }
+}
+return {ready: document.readyState, rule: null};
+"""
+
+
+def wait_for_selectors(driver, selectors, cap=DEFAULT_WAIT_CAP, poll=0.25):
+    """Seçicilerden herhangi biri eşleşene ya da süre dolana kadar bekler
+
+    Bütün seçiciler her yoklamada birlikte okunur, bu yüzden güncel ve eski
+    fiyat gibi ilişkili elementler tek bir beklemeyle çözülür. Eşleşen
+    metinleri, geçen süreyi ve eşleşme olup olmadığını döndürür.
+    """
+    started = time.monotonic()
+    deadline = started + cap
+    texts = dict.fromkeys(selectors)
+    while True:
+        result = driver.execute_script(PROBE_SCRIPT, selectors) or {}
+        texts = {
+            key: (text.strip() or None) if text else None
+            for key, text in (result.get("texts") or {}).items()
+        }
+        if any(texts.values()):
+            return texts, time.monotonic() - started, True
+        if time.monotonic() >= deadline:
+            logger.warning(
+                f"{cap} sn içinde fiyat elementi bulunamadı (readyState={result.get('ready')})"
+            )
+            return texts, time.monotonic() - started, False
+        time.sleep(poll)
+
+
+def wait_for_cascade(driver, rules, cap=DEFAULT_WAIT_CAP, poll=0.25):
+    """Mağazanın fiyat kurallarından biri eşleşene ya da süre dolana kadar bekler
+
+    Her yoklama tek bir betik çağrısıdır: kurallar sayfada öncelik sırasıyla
+    denenir ve ilk eşleşenin sırası ile güncel/eski fiyat metinleri döner.
+    Sonucu (eşleşme yoksa rule None), geçen süreyi ve eşleşme olup olmadığını
+    döndürür.
+    """
+    started = time.monotonic()
+    deadline = started + cap
+    while True:
+        result = driver.execute_script(CASCADE_SCRIPT, rules) or {}
+        if result.get("rule") is not None:
+            return result, time.monotonic() - started, True
+        if time.monotonic() >= deadline:
+            logger.warning(
+                f"{cap} sn içinde fiyat elementi bulunamadı (readyState={result.get('ready')})"
+            )
+            return result, time.monotonic() - started, False
+        time.sleep(poll)
+
+
+class WaitHistogram:
+    """Mağaza başına bekleme süresi histogramı; limitleri ayarlamak için"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self.lock = threading.RLock()
+        self.stores = {}
+
+    def observe(self, store, seconds, matched=True):
+        with self.lock:
+            entry = self.stores.setdefault(
+                store,
+                {
+                    "count": 0,
+                    "sum": 0.0,
+                    "timeouts": 0,
+                    "counts": [0] * (len(self.buckets) + 1),
+                },
+            )
+            entry["count"] += 1
+            entry["sum"] += seconds
+            if not matched:
+                entry["timeouts"] += 1
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    entry["counts"][i] += 1
+                    break
+            else:
+                entry["counts"][-1] += 1
+
+    def quantile(self, store, q):
+        """Kova sınırlarından yaklaşık yüzdelik değeri döndürür"""
+        with self.lock:
+            entry = self.stores.get(store)
+            if not entry or not entry["count"]:
+                return None
+            rank = q * entry["count"]
+            seen = 0
+            for i, count in enumerate(entry["counts"]):
+                seen += count
+                if seen >= rank:
+                    return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return None
+
+    def summary(self):
+        summary = {}
+        with self.lock:
+            for store, entry in self.stores.items():
+                summary[store] = {
+                    "count": entry["count"],
+                    "avg": entry["sum"] / entry["count"] if entry["count"] else 0.0,
+                    "timeouts": entry["timeouts"],
+                    "p50": self.quantile(store, 0.5),
+                    "p95": self.quantile(store, 0.95),
+                    "buckets": dict(
+                        zip([str(b) for b in self.buckets] + ["+Inf"], entry["counts"])
+                    ),
+                }
+        return summary
@@ -1,560 +1,436 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
-import time
-import smtplib
-from email.mime.text import MIMEText
-from datetime import datetime
-import json
 import argparse
-import sys
+import json
 import logging
 import os
+import signal
+import socket
+import subprocess
+import sys
 
+from fiyat_takip.logs import setup_logging
+from fiyat_takip.monitor import PriceMonitor
 
-# DEBUG bilgilerini yazdır
-print("========== BAŞLATILIYOR ==========")
-print(f"Çalışma dizini: {os.getcwd()}")
-print(f"Script konumu: {os.path.dirname(os.path.abspath(__file__))}")
-print("=================================")
-
-# Argüman parser'ı ayarlama
-parser = argparse.ArgumentParser(description="Fiyat Takip Uygulaması")
-parser.add_argument("--config", help="Konfigürasyon JSON dosyası yolu")
-parser.add_argument("--log", help="Log dosyası yolu")
-parser.add_argument("--base-dir", help="Laravel projesinin kök dizini")
-args = parser.parse_args()
-
-# DEBUG: Argümanları yazdır
-print(f"Alınan argümanlar: {args}")
-
-# Base directory'i kullan
-if args.base_dir:
-    try:
-        print(f"Çalışma dizini değiştiriliyor: {args.base_dir}")
-        os.chdir(args.base_dir)
-        print(f"Çalışma dizini değiştirildi. Yeni dizin: {os.getcwd()}")
-    except Exception as e:
-        print(f"HATA: Çalışma dizini değiştirilemedi: {e}")
-
-# Log ayarları
-if args.log:
-    log_path = os.path.abspath(args.log)
-    print(f"Log dosyası yolu: {log_path}")
-    log_dir = os.path.dirname(log_path)
+logger = logging.getLogger("price_tracker")
 
-    # Log dizini yoksa oluştur
-    if not os.path.exists(log_dir):
-        try:
-            os.makedirs(log_dir)
-            print(f"Log dizini oluşturuldu: {log_dir}")
-        except Exception as e:
-            print(f"Log dizini oluşturulamadı: {e}")
 
-    logging.basicConfig(
-        filename=log_path,
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
+def build_parser():
+    """Komut satırı argümanlarını tanımlar"""
+    parser = argparse.ArgumentParser(description="Fiyat Takip Uygulaması")
+    parser.add_argument("--config", help="Konfigürasyon JSON dosyası yolu")
+    parser.add_argument("--log", help="Log dosyası yolu")
+    parser.add_argument("--base-dir", help="Laravel projesinin kök dizini")
+    parser.add_argument(
+        "--log-format",
+        choices=["text", "json"],
+        default="text",
+        help="Log satır biçimi",
     )
-    # Hem konsola hem de dosyaya yazmak için
-    console = logging.StreamHandler()
-    console.setLevel(logging.INFO)
-    logging.getLogger("").addHandler(console)
-else:
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
+    parser.add_argument(
+        "--log-max-bytes",
+        type=int,
+        default=10 * 1024 * 1024,
+        help="Log dosyası bu boyutu aşınca döndürülür",
     )
+    parser.add_argument(
+        "--log-backups",
+        type=int,
+        default=5,
+        help="Saklanacak sıkıştırılmış log parçası",
+    )
+    parser.add_argument(
+        "--log-level",
+        action="append",
+        default=[],
+        metavar="BİLEŞEN=SEVİYE",
+        help="Bileşen başına log seviyesi, ör. price_tracker.browser=WARNING",
+    )
+    parser.add_argument(
+        "--role",
+        choices=["standalone", "coordinator", "worker"],
+        help="standalone: tek süreç; coordinator: kuyruğu ve bildirimleri yönetir; "
+        "worker: kuyruktan kontrol kiralar (varsayılan: queue.enabled ise coordinator)",
+    )
+    parser.add_argument(
+        "--queue-db", help="Paylaşılan kira kuyruğu SQLite dosyası (queue.db yerine)"
+    )
+    parser.add_argument(
+        "--reextract",
+        metavar="DİZİN",
+        help="Sayfa görüntüsü arşivindeki fiyatları güncel çıkarıcılarla yeniden okur, "
+        "raporu JSON olarak stdout'a yazar ve çıkar (konfigürasyon gerekmez; --config "
+        "verilirse oradaki mağaza tanımları da kullanılır)",
+    )
+    parser.add_argument(
+        "--store", help="--reextract yalnızca bu mağazanın görüntülerini işler"
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        help="--reextract için süreç sayısı (varsayılan: işlemci sayısı)",
+    )
+    parser.add_argument(
+        "--analytics",
+        action="store_true",
+        help="Fiyat geçmişinden ürün başına istatistikleri JSON olarak stdout'a yazar ve çıkar",
+    )
+    parser.add_argument(
+        "--history-db",
+        help="--analytics için fiyat geçmişi veritabanı (konfigürasyondaki history_db yerine)",
+    )
+    parser.add_argument(
+        "--days", type=int, default=90, help="--analytics pencere uzunluğu (gün)"
+    )
+    parser.add_argument("--url", help="--analytics yalnızca bu sayfayı raporlar")
+    parser.add_argument(
+        "--check-once",
+        action="store_true",
+        help="Ürünleri bir kez kontrol eder, sonuçları JSON olarak stdout'a yazar ve çıkar",
+    )
+    return parser
 
-logger = logging.getLogger("price_tracker")
 
-# Config dosyası kontrolü
-if args.config:
+def resolve_config_path(config_arg):
+    """Konfigürasyon dosyasının yolunu bulur; bulunamazsa programı sonlandırır"""
+    if not config_arg:
+        logger.error("HATA: Konfigürasyon dosya yolu belirtilmedi")
+        sys.exit(1)
+
     # Mutlak yola dönüştür
-    config_path = os.path.abspath(args.config)
+    config_path = os.path.abspath(config_arg)
     logger.info(f"Konfigürasyon dosyası okunuyor (mutlak yol): {config_path}")
-    print(f"Konfigürasyon dosyası mutlak yolu: {config_path}")
-    print(f"Dosya var mı: {os.path.exists(config_path)}")
-
-    if not os.path.exists(config_path):
-        logger.error(f"Konfigürasyon dosyası bulunamadı: {config_path}")
-        logger.error(f"Mevcut çalışma dizini: {os.getcwd()}")
-
-        # Dizin içeriğini listele
-        parent_dir = os.path.dirname(config_path)
-        if os.path.exists(parent_dir):
-            logger.error(f"Dizin içeriği ({parent_dir}):")
-            for item in os.listdir(parent_dir):
-                logger.error(f" - {item}")
-
-        # Son bir deneme daha yap - göreli yoldan
-        rel_config_path = args.config
-        logger.info(f"Göreli yoldan deneniyor: {rel_config_path}")
-        print(f"Göreli yoldan deneniyor: {rel_config_path}")
-        print(f"Göreli yol var mı: {os.path.exists(rel_config_path)}")
-
-        if os.path.exists(rel_config_path):
-            logger.info(f"Göreli yoldan bulundu: {rel_config_path}")
-            config_path = rel_config_path
-        else:
-            logger.error("Hem mutlak hem de göreli yoldan bulunamadı!")
-            sys.exit(1)
-    else:
+    logger.debug(f"Konfigürasyon dosyası mutlak yolu: {config_path}")
+    logger.debug(f"Dosya var mı: {os.path.exists(config_path)}")
+
+    if os.path.exists(config_path):
         logger.info(f"Konfigürasyon dosyası bulundu: {config_path}")
-else:
-    logger.error("HATA: Konfigürasyon dosya yolu belirtilmedi")
+        return config_path
+
+    logger.error(f"Konfigürasyon dosyası bulunamadı: {config_path}")
+    logger.error(f"Mevcut çalışma dizini: {os.getcwd()}")
+
+    # Dizin içeriğini listele
+    parent_dir = os.path.dirname(config_path)
+    if os.path.exists(parent_dir):
+        logger.error(f"Dizin içeriği ({parent_dir}):")
+        for item in os.listdir(parent_dir):
+            logger.error(f" - {item}")
+
+    # Son bir deneme daha yap - göreli yoldan
+    rel_config_path = config_arg
+    logger.info(f"Göreli yoldan deneniyor: {rel_config_path}")
+    logger.debug(f"Göreli yoldan deneniyor: {rel_config_path}")
+    logger.debug(f"Göreli yol var mı: {os.path.exists(rel_config_path)}")
+
+    if os.path.exists(rel_config_path):
+        logger.info(f"Göreli yoldan bulundu: {rel_config_path}")
+        return rel_config_path
+    logger.error("Hem mutlak hem de göreli yoldan bulunamadı!")
     sys.exit(1)
 
-# Konfigürasyonu oku
-try:
-    with open(config_path, "r") as f:
-        config = json.load(f)
-
-    email = config.get("email")
-    app_password = config.get("app_password")
-    products = config.get("products", [])
-    check_interval = config.get("check_interval", 300)
 
-    logger.info(f"Konfigürasyon başarıyla yüklendi: {len(products)} ürün bulundu")
-    print(f"Konfigürasyon başarıyla yüklendi: {len(products)} ürün bulundu")
-except Exception as e:
-    logger.error(f"Konfigürasyon dosyası okuma hatası: {e}")
-    print(f"HATA: Konfigürasyon dosyası okunamadı: {e}")
-    # Dosya içeriğini göster
+def load_config(config_path):
+    """Konfigürasyonu okur; okunamazsa programı sonlandırır"""
     try:
         with open(config_path, "r") as f:
-            content = f.read()
-        print(f"Dosya içeriği ({len(content)} karakter): {content[:200]}...")
-    except Exception as e2:
-        print(f"Dosya içeriği okunamadı: {e2}")
-    sys.exit(1)
-
-
-class PriceMonitor:
-    def __init__(self):
-        self.products = []
-        self.email_sender = None
-        self.email_password = None
-        self.setup_driver()
-        self.stores = {1: "zara", 2: "pull&bear"}
-
-    def parse_price(self, price_text):
-        """Fiyat metnini sayıya çevirir"""
-        try:
-            # TL ve boşlukları kaldır
-            price_text = price_text.replace("TL", "").strip()
-            # Binlik ayracı olan virgülü kaldır
-            price_text = price_text.replace(",", "")
-            # Sayıya çevir
-            return float(price_text)
-        except Exception as e:
-            logger.error(f"Fiyat ayrıştırma hatası: {e}")
-            return None
-
-    def setup_driver(self):
-        """Selenium driver'ı ayarlar"""
-        logger.info("Chrome Driver ayarlanıyor...")
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument(
-            "user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+            config = json.load(f)
+        logger.info(
+            f"Konfigürasyon başarıyla yüklendi: {len(config.get('products', []))} ürün bulundu"
         )
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option("useAutomationExtension", False)
-
+        return config
+    except Exception as e:
+        logger.error(f"Konfigürasyon dosyası okuma hatası: {e}")
+        # Dosya içeriğini göster
         try:
-            self.driver = webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()), options=chrome_options
-            )
-            self.driver.execute_script(
-                "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-            )
-            self.wait = WebDriverWait(self.driver, 20)
-            logger.info("Chrome Driver başarıyla ayarlandı")
-        except Exception as e:
-            logger.error(f"Chrome Driver ayarlanırken hata oluştu: {e}")
-            raise
-
-    def add_product(self, url, target_price, store="zara"):
-        self.products.append(
-            {
-                "url": url,
-                "target_price": float(target_price),
-                "store": store.lower(),
-                "last_price": None,
-                "last_check": None,
-            }
+            with open(config_path, "r") as f:
+                content = f.read()
+            logger.error(f"Dosya içeriği ({len(content)} karakter): {content[:200]}...")
+        except Exception as e2:
+            logger.error(f"Dosya içeriği okunamadı: {e2}")
+        sys.exit(1)
+
+
+def start_local_workers(count, queue_path, args, config_path):
+    """Koordinatörle aynı makinede kuyruk işçisi süreçleri başlatır"""
+    processes = []
+    for index in range(count):
+        cmd = [
+            sys.executable,
+            os.path.abspath(__file__),
+            "--config",
+            config_path,
+            "--role",
+            "worker",
+            "--queue-db",
+            queue_path,
+            "--log-format",
+            args.log_format,
+            "--log-max-bytes",
+            str(args.log_max_bytes),
+            "--log-backups",
+            str(args.log_backups),
+        ]
+        # Her süreç kendi log dosyasını döndürür
+        if args.log:
+            root, ext = os.path.splitext(os.path.abspath(args.log))
+            cmd += ["--log", f"{root}-worker{index + 1}{ext}"]
+        for item in args.log_level:
+            cmd += ["--log-level", item]
+        processes.append(
+            subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         )
+    if processes:
         logger.info(
-            f"Ürün eklendi: {url}, Hedef Fiyat: {target_price} TL, Mağaza: {store}"
+            f"{len(processes)} yerel kuyruk işçisi başlatıldı: "
+            f"{', '.join(str(p.pid) for p in processes)}"
         )
+    return processes
 
-    def check_zara_price(self, url):
+
+def stop_local_workers(processes, timeout=30):
+    for process in processes:
+        process.terminate()
+    for process in processes:
         try:
-            logger.info(f"Zara sayfası yükleniyor: {url}")
-            self.driver.get(url)
-            time.sleep(10)
-
-            logger.info("Fiyat elementleri aranıyor...")
-            current_price_text = None
-            old_price_text = None
-            current_price = None
-            old_price = None
-
-            # İndirimli fiyatı kontrol et
-            try:
-                current_price_element = self.wait.until(
-                    EC.presence_of_element_located(
-                        (
-                            By.CSS_SELECTOR,
-                            'span[data-qa-qualifier="price-amount-current"] .money-amount__main',
-                        )
-                    )
-                )
-                current_price_text = current_price_element.text
-                logger.info(f"İndirimli fiyat bulundu: {current_price_text}")
-                current_price = float(
-                    current_price_text.replace("TL", "")
-                    .replace(".", "")
-                    .replace(",", ".")
-                    .strip()
-                )
-            except Exception as e:
-                logger.warning(f"İndirimli fiyat bulunamadı: {e}")
-
-            # Normal fiyatı kontrol et
-            try:
-                old_price_element = self.wait.until(
-                    EC.presence_of_element_located(
-                        (
-                            By.CSS_SELECTOR,
-                            'span[data-qa-qualifier="price-amount-old"] .money-amount__main',
-                        )
-                    )
-                )
-                old_price_text = old_price_element.text
-                logger.info(f"Normal fiyat bulundu: {old_price_text}")
-                old_price = float(
-                    old_price_text.replace("TL", "")
-                    .replace(".", "")
-                    .replace(",", ".")
-                    .strip()
-                )
-            except Exception as e:
-                logger.warning(f"Normal fiyat bulunamadı: {e}")
-
-            # İndirimli fiyat varsa onu, yoksa normal fiyatı kullan
-            if current_price is not None:
-                return {
-                    "current_price": current_price,
-                    "old_price": old_price,
-                    "current_price_text": current_price_text,
-                    "old_price_text": old_price_text,
-                }
-            elif old_price is not None:
-                return {
-                    "current_price": old_price,
-                    "old_price": None,
-                    "current_price_text": old_price_text,
-                    "old_price_text": None,
-                }
-            else:
-                logger.warning("Hiçbir fiyat bulunamadı!")
-                return None
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
 
-        except Exception as e:
-            logger.error(f"Zara fiyat kontrolünde genel hata: {e}")
-            return None
 
-    def check_pull_and_bear_price(self, url):
-        try:
-            logger.info(f"Pull&Bear sayfası yükleniyor: {url}")
-            self.driver.get(url)
-            time.sleep(10)  # Sayfanın yüklenmesi için bekle
+def handle_sigterm(signum, frame):
+    """kill ile gelen SIGTERM'i temiz kapanış için KeyboardInterrupt'a çevirir"""
+    raise KeyboardInterrupt
 
-            # Page source'u al ve analiz et
-            logger.info("Sayfa yüklendi, fiyat aranıyor...")
 
-            # Daha genel bir seçici deneyelim
-            price_elements = self.driver.find_elements(
-                By.CSS_SELECTOR, ".price-current-price"
-            )
+def check_once(config):
+    """Konfigürasyondaki ürünleri bir kez kontrol eder ve sonuçları stdout'a yazar
 
-            if price_elements:
-                price_text = price_elements[0].text
-                logger.info(f"Fiyat bulundu: {price_text}")
-                # Temizle ve dönüştür
-                price = float(
-                    price_text.replace("TL", "")
-                    .replace(".", "")
-                    .replace(",", ".")
-                    .replace("\xa0", "")
-                    .strip()
-                )
-                return price
-
-            # Alternatif seçiciler
-            price_elements = self.driver.find_elements(By.CSS_SELECTOR, ".price span")
-            if price_elements:
-                price_text = price_elements[0].text
-                logger.info(f"Alternatif fiyat bulundu: {price_text}")
-                price = float(
-                    price_text.replace("TL", "")
-                    .replace(".", "")
-                    .replace(",", ".")
-                    .replace("\xa0", "")
-                    .strip()
-                )
-                return price
+    Loglar stderr'e gider; stdout'ta yalnızca JSON sonuç bulunur. Her ürünün
+    fiyatı okunduysa 0, okunamayan varsa 1 ile çıkılır.
+    """
+    monitor = PriceMonitor(
+        workers=config.get("workers", 1),
+        wait_caps=config.get("wait_caps", {}),
+        http_first=config.get("http_first", True),
+        resource_blocking=config.get("resource_blocking", {}),
+        driver_settings=config.get("driver", {}),
+        store_settings=config.get("stores", {}),
+    )
+    for product in config.get("products", []):
+        monitor.add_product_entry(product)
+    results = monitor.check_once() if monitor.products else []
+    json.dump(
+        {"checked_pages": len(monitor.watch), "products": results},
+        sys.stdout,
+        ensure_ascii=False,
+        indent=2,
+    )
+    sys.stdout.write("\n")
+    return 0 if all(result["error"] is None for result in results) else 1
+
+
+def reextract_snapshots(args):
+    """Arşivlenmiş sayfalarda çıkarıcıları çalıştırır ve raporu stdout'a yazar
+
+    Sayfalar mağazaların sıralı fiyat kurallarıyla okunur. Kayıt anında
+    okunan bir fiyat artık okunamıyor ya da farklı okunuyorsa 1 ile çıkılır;
+    seçici değişiklikleri canlı siteye gitmeden doğrulanır.
+    """
+    from fiyat_takip.snapshots import reextract
+
+    store_settings = {}
+    if args.config:
+        store_settings = load_config(resolve_config_path(args.config)).get("stores", {})
+    report = reextract(
+        args.reextract,
+        store=args.store,
+        workers=args.processes,
+        store_settings=store_settings,
+    )
+    logger.info(
+        f"{report['snapshots']} görüntü ({report['unique_pages']} farklı sayfa) "
+        f"{report['seconds']} sn içinde yeniden okundu"
+    )
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    regressions = sum(
+        counts["lost"] + counts["changed"] for counts in report["stores"].values()
+    )
+    return 1 if regressions else 0
 
-            logger.warning(
-                "Hiçbir fiyat seçici eşleşmedi, sayfa kaynağını kontrol edelim..."
-            )
 
-            # İkinci bir yaklaşım olarak JavaScript kullanarak deneyebilirsiniz
-            price_js = self.driver.execute_script(
-                """
-                return document.querySelector('.price-current-price') ? 
-                    document.querySelector('.price-current-price').textContent : null;
-            """
-            )
+def print_analytics(history_db, args):
+    """Fiyat geçmişi istatistiklerini stdout'a JSON olarak yazar"""
+    from fiyat_takip.analytics import report
+    from fiyat_takip.fanout import normalize_url
 
-            if price_js:
-                logger.info(f"JavaScript ile fiyat bulundu: {price_js}")
-                price = float(
-                    price_js.replace("TL", "")
-                    .replace(".", "")
-                    .replace(",", ".")
-                    .replace("\xa0", "")
-                    .strip()
-                )
-                return price
+    if not history_db:
+        logger.error(
+            "Fiyat geçmişi veritabanı belirtilmedi (--history-db ya da history_db)"
+        )
+        return 1
+    result = report(
+        os.path.abspath(history_db),
+        days=max(1, args.days),
+        url=normalize_url(args.url) if args.url else None,
+    )
+    logger.info(
+        f"{len(result['products'])} ürünün istatistikleri {result['seconds']} sn içinde "
+        f"hesaplandı ({result['backend']})"
+    )
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return 0
 
-            logger.warning("Hiçbir fiyat bulunamadı!")
-            return None
 
-        except Exception as e:
-            logger.error(f"Pull&Bear fiyat kontrolünde genel hata: {e}")
-            return None
+def main(argv=None):
+    args = build_parser().parse_args(argv)
 
-    def send_notification(
-        self, product, current_price, old_price=None, is_price_drop=False
-    ):
+    # Base directory'i kullan
+    chdir_error = None
+    if args.base_dir:
         try:
-            logger.info("Email bildirimi hazırlanıyor...")
-
-            # Email içeriği oluştur
-            if is_price_drop:
-                subject = "Fiyat Düştü! - İndirim Alarmı"
-                content_lines = [
-                    f"Ürün: {product['url']}",
-                    f"Mevcut Fiyat: {current_price} TL",
-                ]
-
-                # Eski fiyat bilgisi varsa ekle
-                if old_price:
-                    content_lines.append(f"Önceki Fiyat: {old_price} TL")
-                    discount_percent = ((old_price - current_price) / old_price) * 100
-                    content_lines.append(f"İndirim Oranı: %{discount_percent:.2f}")
-
-                content_lines.extend(
-                    [
-                        f"Hedef Fiyat: {product['target_price']} TL",
-                        f"Kontrol Zamanı: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                    ]
-                )
-            else:
-                subject = "Hedef Fiyata Ulaşıldı! - Fiyat Uyarısı"
-                content_lines = [
-                    f"Ürün: {product['url']}",
-                    f"Güncel Fiyat: {current_price} TL (Hedef fiyata ulaşıldı)",
-                    f"Hedef Fiyat: {product['target_price']} TL",
-                    f"Kontrol Zamanı: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                ]
-
-            email_content = "\n".join(content_lines)
-            logger.info(f"Email içeriği:\n{email_content}")
-
-            msg = MIMEText(email_content)
-            msg["Subject"] = subject
-            msg["From"] = self.email_sender
-            msg["To"] = self.email_sender
-
-            logger.info("SMTP sunucusuna bağlanılıyor...")
-            try:
-                with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-                    logger.info("SMTP sunucusuna bağlantı başarılı")
-                    logger.info("Giriş yapılıyor...")
-                    smtp.login(self.email_sender, self.email_password)
-                    logger.info("Giriş başarılı")
-                    logger.info("Email gönderiliyor...")
-                    smtp.send_message(msg)
-                    logger.info("Email başarıyla gönderildi")
-            except smtplib.SMTPAuthenticationError:
-                logger.error(
-                    "SMTP kimlik doğrulama hatası! Lütfen email ve app password'ü kontrol edin."
-                )
-            except smtplib.SMTPException as e:
-                logger.error(f"SMTP hatası: {e}")
-
+            os.chdir(args.base_dir)
         except Exception as e:
-            logger.error(f"Email gönderiminde genel hata: {e}")
-            logger.error(f"Hata detayı: {str(e.__class__.__name__)}")
+            chdir_error = e
+
+    # Log ayarları
+    setup_logging(
+        log_path=os.path.abspath(args.log) if args.log else None,
+        log_format=args.log_format,
+        max_bytes=args.log_max_bytes,
+        backup_count=args.log_backups,
+        levels=dict(item.split("=", 1) for item in args.log_level if "=" in item),
+    )
 
-    def monitor_prices(self, check_interval=300):
-        logger.info("\nFiyat takibi başlatılıyor...")
-        try:
-            # İlk çalıştırmada mevcut indirimler için bildirim yapılıp yapılmayacağı
-            first_run = True
-
-            while True:
-                for product in self.products:
-                    logger.info(f"\nÜrün kontrol ediliyor: {product['url']}")
-                    price_info = None
-                    old_price = None
-
-                    if product["store"] == "zara":
-                        price_info = self.check_zara_price(product["url"])
-                        if price_info:
-                            current_price = price_info["current_price"]
-                            old_price = price_info[
-                                "old_price"
-                            ]  # Eski fiyat bilgisini al
-
-                            logger.info(
-                                f"Mevcut fiyat: {current_price}, Eski liste fiyatı: {old_price}"
-                            )
-                        else:
-                            current_price = None
-                    elif product["store"] == "pull&bear":
-                        current_price = self.check_pull_and_bear_price(product["url"])
-                        logger.info(f"Pull&Bear fiyat: {current_price}")
-                    else:
-                        logger.warning(f"Desteklenmeyen mağaza: {product['store']}")
-                        current_price = None
-
-                    if current_price:
-                        # İlk kontrol ise, son fiyat olarak kaydet
-                        if product["last_price"] is None:
-                            product["last_price"] = current_price
-                            product["last_check"] = datetime.now()
-                            logger.info(
-                                f"İlk kontrol: Fiyat {current_price} TL olarak kaydedildi."
-                            )
-
-                            # İlk çalıştırmada mevcut indirimler için bildirim gönder
-                            if first_run and old_price and old_price > current_price:
-                                logger.info(
-                                    f"Mevcut indirim tespit edildi! Orijinal fiyat: {old_price} TL, İndirimli fiyat: {current_price} TL"
-                                )
-                                self.send_notification(
-                                    product,
-                                    current_price,
-                                    old_price,
-                                    is_price_drop=True,
-                                )
-                            continue
-
-                        logger.info(
-                            f"Karşılaştırma: Son fiyat = {product['last_price']}, Şimdiki fiyat = {current_price}, Hedef fiyat = {product['target_price']}"
-                        )
-
-                        # Fiyat düşüşü varsa bildirim gönder
-                        if current_price < product["last_price"]:
-                            logger.info(
-                                f"Fiyat düşüşü tespit edildi! {product['last_price']} TL -> {current_price} TL"
-                            )
-                            self.send_notification(
-                                product,
-                                current_price,
-                                product["last_price"],
-                                is_price_drop=True,
-                            )
-                        # Hedef fiyatı yakaladıysa ve ilk defa hedef fiyata ulaşıyorsa bildirim gönder
-                        elif (
-                            current_price <= product["target_price"]
-                            and product["last_price"] > product["target_price"]
-                        ):
-                            logger.info(
-                                f"Hedef fiyata ulaşıldı! Hedef: {product['target_price']} TL, Güncel: {current_price} TL"
-                            )
-                            self.send_notification(
-                                product, current_price, old_price, is_price_drop=False
-                            )
-
-                        # Son fiyat ve kontrol zamanını güncelle
-                        product["last_price"] = current_price
-                        product["last_check"] = datetime.now()
-                    else:
-                        logger.warning("Fiyat alınamadı!")
-
-                # İlk tur tamamlandı
-                first_run = False
-                logger.info(f"\n{check_interval} saniye bekleniyor...")
-                time.sleep(check_interval)
-
-        except KeyboardInterrupt:
-            logger.info("\nProgram durduruluyor...")
-        finally:
-            self.driver.quit()
+    # Başlangıç bilgileri yalnızca DEBUG seviyesinde
+    logger.debug(f"Çalışma dizini: {os.getcwd()}")
+    logger.debug(f"Script konumu: {os.path.dirname(os.path.abspath(__file__))}")
+    logger.debug(f"Alınan argümanlar: {args}")
+    if chdir_error:
+        logger.error(f"HATA: Çalışma dizini değiştirilemedi: {chdir_error}")
+
+    if args.reextract:
+        sys.exit(reextract_snapshots(args))
+    if args.analytics and args.history_db:
+        sys.exit(print_analytics(args.history_db, args))
 
+    # Config dosyası kontrolü ve okunması
+    config_path = resolve_config_path(args.config)
+    config = load_config(config_path)
+    if args.analytics:
+        sys.exit(print_analytics(config.get("history_db"), args))
+
+    products = config.get("products", [])
+    check_interval = config.get("check_interval", 300)
+    jitter = config.get("jitter", 0.1)
+    control_settings = config.get("control", {})
+    queue_settings = config.get("queue", {})
+    listing_settings = config.get("listings", {})
 
-def main():
     try:
+        # Laravel'in stop isteği SIGTERM gönderir; driver'ların kapanması için yakala
+        signal.signal(signal.SIGTERM, handle_sigterm)
+
+        if args.check_once:
+            sys.exit(check_once(config))
+
         # Konfigürasyon dosyasından verileri al
         logger.info("Ana program başlatılıyor...")
 
-        if not products:
+        role = args.role or (
+            "coordinator" if queue_settings.get("enabled") else "standalone"
+        )
+        lease_queue = None
+        if role != "standalone":
+            queue_db = args.queue_db or queue_settings.get("db")
+            if not queue_db:
+                logger.error(
+                    "Kuyruk veritabanı belirtilmedi (--queue-db ya da queue.db)"
+                )
+                sys.exit(1)
+            from fiyat_takip.leases import LeaseQueue
+
+            lease_queue = LeaseQueue(
+                queue_db,
+                lease_seconds=queue_settings.get("lease_seconds", 120),
+                max_attempts=queue_settings.get("max_attempts", 3),
+            )
+            logger.info(f"Rol: {role}, kuyruk: {lease_queue.path}")
+
+        if role == "worker":
+            # İşçi ürün listesi, geçmiş ve bildirimlerle ilgilenmez
+            monitor = PriceMonitor(
+                workers=config.get("workers", 1),
+                wait_caps=config.get("wait_caps", {}),
+                http_first=config.get("http_first", True),
+                resource_blocking=config.get("resource_blocking", {}),
+                driver_settings=config.get("driver", {}),
+                snapshot_settings=config.get("snapshots", {}),
+                store_settings=config.get("stores", {}),
+            )
+            monitor.serve_queue(lease_queue, f"{socket.gethostname()}:{os.getpid()}")
+            return
+
+        # Kontrol kanalı açıkken ürünler sonradan eklenebilir
+        if not products and not control_settings.get("enabled"):
             logger.warning("\nHiç ürün eklenmedi. Program sonlandırılıyor...")
             return
 
         # Price Monitor'ı başlat
-        monitor = PriceMonitor()
+        monitor = PriceMonitor(
+            workers=config.get("workers", 1),
+            wait_caps=config.get("wait_caps", {}),
+            http_first=config.get("http_first", True),
+            jitter=jitter,
+            history_db=config.get("history_db"),
+            smtp_settings=config.get("smtp", {}),
+            resource_blocking=config.get("resource_blocking", {}),
+            driver_settings=config.get("driver", {}),
+            control_settings=control_settings,
+            status_file=config.get("status_file"),
+            lease_queue=lease_queue,
+            adaptive_settings=config.get("adaptive", {}),
+            store_limits=config.get("store_limits", {}),
+            listing_settings=listing_settings,
+            snapshot_settings=config.get("snapshots", {}),
+            stats_window=config.get("stats_window", 90),
+            store_settings=config.get("stores", {}),
+        )
 
         # Email ayarlarını güncelle
-        monitor.email_sender = email
-        monitor.email_password = app_password
+        monitor.email_sender = config.get("email")
+        monitor.email_password = config.get("app_password")
 
         # Ürünleri ekle
         for product in products:
-            # API'den gelen ürünler ile CLI'dan gelen ürünlerin yapıları farklı olabilir
-            if isinstance(product, dict):
-                if (
-                    "url" in product
-                    and ("target_price" in product or "targetPrice" in product)
-                    and "store" in product
-                ):
-                    target_price = product.get(
-                        "target_price", product.get("targetPrice")
-                    )
-                    monitor.add_product(
-                        url=product["url"],
-                        target_price=target_price,
-                        store=product["store"],
-                    )
-                else:
-                    logger.warning(f"Geçersiz ürün formatı: {product}")
-            else:
-                logger.warning(f"Geçersiz ürün tipi: {type(product)}")
+            monitor.add_product_entry(product)
+        for entry in listing_settings.get("pages", []):
+            monitor.add_listing(entry)
 
         logger.info("\n=== Program Başlatılıyor ===")
-        logger.info(f"Takip edilen ürün sayısı: {len(monitor.products)}")
-        logger.info(f"Kontrol aralığı: {check_interval} saniye")
+        logger.info(
+            f"Takip edilen ürün sayısı: {len(monitor.products)} ({len(monitor.watch)} farklı sayfa)"
+        )
+        logger.info(
+            f"Kontrol aralığı: {check_interval} saniye (±%{jitter * 100:.0f} sapma)"
+        )
+        if lease_queue is None:
+            logger.info(f"İşçi sayısı: {monitor.pool.size}")
         logger.info("----------------------------")
 
         # Fiyat takibini başlat
-        monitor.monitor_prices(check_interval=check_interval)
+        local_workers = []
+        if lease_queue is not None:
+            local_workers = start_local_workers(
+                queue_settings.get("local_workers", 1),
+                lease_queue.path,
+                args,
+                config_path,
+            )
+        try:
+            monitor.monitor_prices(check_interval=check_interval)
+        finally:
+            stop_local_workers(local_workers)
 
     except KeyboardInterrupt:
         logger.info("\nProgram kullanıcı tarafından durduruldu.")
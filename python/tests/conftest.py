@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# fiyat_takip paketi ve benchmark sunucuları (benchmarks/run.py ile aynı düzen)
+sys.path.insert(0, PYTHON_DIR)
+sys.path.insert(0, os.path.join(PYTHON_DIR, "benchmarks"))
+
+
+class FakeClock:
+    """Elle ilerletilen saat; clock parametresi alan sınıflar için"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,74 @@
+import pytest
+
+from fiyat_takip.adaptive import AdaptivePolicy
+
+
+def price(current, old=None):
+    return {"current_price": current, "old_price": old}
+
+
+@pytest.fixture
+def policy():
+    return AdaptivePolicy(min_interval=60, max_interval=1200, backoff=2)
+
+
+def test_stable_price_backs_off_to_max(policy):
+    intervals = [policy.observe("a", price(100.0), 100.0, 300, now=t) for t in range(5)]
+
+    assert intervals == [600, 1200, 1200, 1200, 1200]
+
+
+def test_change_drops_to_min_interval(policy):
+    policy.observe("a", price(100.0), None, 300, now=0)
+    policy.observe("a", price(100.0), 100.0, 300, now=600)
+
+    assert policy.observe("a", price(90.0), 100.0, 300, now=1800) == 60
+    assert policy.changes == 1
+    assert list(policy.detection_gaps) == [1200]
+
+
+def test_discount_caps_interval_at_base(policy):
+    assert policy.observe("a", price(80.0, old=100.0), None, 300, now=0) == 60
+    intervals = [
+        policy.observe("a", price(80.0, old=100.0), 80.0, 300, now=t)
+        for t in range(1, 5)
+    ]
+
+    assert intervals == [120, 240, 300, 300]
+
+
+def test_default_bounds_follow_base_interval():
+    policy = AdaptivePolicy(backoff=10)
+
+    assert policy.observe("a", price(100.0), 100.0, 400) == 3200
+    assert policy.observe("a", price(90.0), 100.0, 400) == 100
+
+
+def test_budget_scales_every_interval():
+    policy = AdaptivePolicy(min_interval=60, max_interval=60, budget_per_hour=60)
+
+    # İki sayfa saatte 120 yükleme ister; bütçe 60 olduğu için aralıklar iki katına çıkar
+    policy.observe("a", price(1.0), 1.0, 60)
+    assert policy.observe("b", price(1.0), 1.0, 60) == 120
+    assert policy.summary()["scale"] == 2
+
+
+def test_forget_releases_load(policy):
+    policy.observe("a", price(100.0), None, 300)
+    policy.forget("a")
+
+    assert policy.load == pytest.approx(0.0)
+    assert policy.summary()["pages"] == 0
+
+
+def test_summary_reports_savings(policy):
+    for key in ("a", "b"):
+        for t in range(3):
+            policy.observe(key, price(100.0), 100.0, 300, now=t)
+
+    summary = policy.summary(base=300)
+
+    assert summary["pages"] == 2
+    assert summary["loads_per_hour"] == 6.0
+    assert summary["fixed_loads_per_hour"] == 24.0
+    assert summary["saved_pct"] == 75.0
@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from fiyat_takip import analytics
+from fiyat_takip.history import LEVELS_SCHEMA, SCHEMA, SECONDS_PER_DAY, connect
+
+NOW = 1_750_000_000.0
+TODAY = int(NOW // SECONDS_PER_DAY)
+
+
+def write_levels(path, levels, state=()):
+    """(ürün, gün farkı, fiyat, eski fiyat, adet) satırlarını doğrudan yazar"""
+    with connect(path) as conn:
+        conn.executescript(SCHEMA)
+        conn.executescript(LEVELS_SCHEMA)
+        conn.executemany(
+            "INSERT INTO price_levels VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (key, TODAY - age, price, old, count, NOW, NOW)
+                for key, age, price, old, count in levels
+            ],
+        )
+        conn.executemany("INSERT INTO product_state VALUES (?, ?, ?, ?, ?)", state)
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "history.db")
+    write_levels(
+        path,
+        [
+            ("zara:a", 0, 100.0, 0, 6),
+            ("zara:a", 1, 80.0, 100.0, 3),
+            ("zara:a", 2, 120.0, 0, 1),
+            # Pencere dışında
+            ("zara:a", 40, 10.0, 0, 50),
+            ("zara:b", 0, 50.0, 0, 2),
+        ],
+        [
+            ("zara:a", "https://x.com/a", "zara", 80.0, NOW),
+            ("zara:b", "https://x.com/b", "zara", 55.0, NOW),
+        ],
+    )
+    return path
+
+
+def test_python_stats(db):
+    stats = analytics.price_stats(db, days=30, now=NOW, vectorized=False)
+
+    a = stats["zara:a"]
+    assert a["observations"] == 10
+    assert (a["min"], a["max"]) == (80.0, 120.0)
+    assert a["mean"] == 96.0
+    assert a["percentiles"] == {
+        "p10": 80.0,
+        "p25": 80.0,
+        "p50": 100.0,
+        "p75": 100.0,
+        "p90": 100.0,
+    }
+    assert a["discount"] == {"share_pct": 30.0, "mean_pct": 20.0, "max_pct": 20.0}
+    assert a["is_window_low"]
+    assert a["vs_mean_pct"] == -16.7
+
+    b = stats["zara:b"]
+    assert b["discount"]["mean_pct"] is None
+    assert not b["is_window_low"]
+    assert b["vs_mean_pct"] == 10.0
+
+
+def test_keys_filter(db):
+    stats = analytics.price_stats(db, days=30, keys=["zara:b"], now=NOW)
+
+    assert list(stats) == ["zara:b"]
+    assert stats["zara:b"]["url"] == "https://x.com/b"
+
+
+def test_missing_database(tmp_path):
+    assert analytics.price_stats(str(tmp_path / "yok.db")) == {}
+
+
+def test_numpy_matches_python(tmp_path):
+    pytest.importorskip("numpy")
+    rng = random.Random(7)
+    levels = []
+    for product in range(60):
+        prices = rng.sample(range(50, 500), rng.randint(1, 12))
+        for age in range(rng.randint(1, 20)):
+            for price in rng.sample(prices, rng.randint(1, len(prices))):
+                old = rng.choice([0, 0, price + rng.randint(1, 200)])
+                levels.append(
+                    (f"s:{product}", age, price + 0.95, old, rng.randint(1, 40))
+                )
+    path = str(tmp_path / "history.db")
+    write_levels(path, levels)
+
+    python = analytics.price_stats(path, days=14, now=NOW, vectorized=False)
+    vectorized = analytics.price_stats(path, days=14, now=NOW, vectorized=True)
+
+    assert python.keys() == vectorized.keys()
+    for key in python:
+        assert vectorized[key] == python[key], key
@@ -0,0 +1,76 @@
+from fiyat_takip.blocking import (
+    DEFAULT_BLOCKED_URLS,
+    PageMetrics,
+    ResourceBlocker,
+    measure_page,
+)
+
+
+class CdpDriver:
+    def __init__(self, fail=False):
+        self.commands = []
+        self.fail = fail
+
+    def execute_cdp_cmd(self, command, params):
+        if self.fail:
+            raise RuntimeError("DevTools kapalı")
+        self.commands.append((command, params))
+
+    def execute_script(self, script):
+        raise RuntimeError("sayfa yok")
+
+
+def test_store_rules_extend_and_relax_defaults():
+    blocker = ResourceBlocker(
+        {
+            "stores": {
+                "zara": {"allow": ["*.svg", "*.woff*"], "deny": ["*zara.net/stories*"]}
+            }
+        }
+    )
+
+    patterns = blocker.patterns_for("zara")
+
+    assert "*.svg" not in patterns
+    assert "*.woff" not in patterns and "*.woff2" not in patterns
+    assert "*.png" in patterns
+    assert patterns[-1] == "*zara.net/stories*"
+    assert blocker.patterns_for("pull&bear") == DEFAULT_BLOCKED_URLS
+
+
+def test_apply_sends_blocked_urls():
+    driver = CdpDriver()
+
+    ResourceBlocker().apply(driver, "zara")
+
+    assert driver.commands[0] == ("Network.enable", {})
+    assert driver.commands[1] == (
+        "Network.setBlockedURLs",
+        {"urls": DEFAULT_BLOCKED_URLS},
+    )
+
+
+def test_disabled_blocker_does_nothing():
+    blocker = ResourceBlocker({"enabled": False})
+    driver = CdpDriver()
+
+    blocker.apply(driver, "zara")
+
+    assert driver.commands == []
+    assert blocker.chrome_prefs() == {}
+
+
+def test_cdp_errors_are_not_raised():
+    ResourceBlocker().apply(CdpDriver(fail=True), "zara")
+    assert measure_page(CdpDriver()) == {}
+
+
+def test_page_metrics_averages():
+    metrics = PageMetrics()
+    metrics.observe("zara", {"bytes": 2048, "requests": 10, "load_ms": 800})
+    metrics.observe("zara", {"bytes": 4096, "requests": 20, "load_ms": 1200})
+    metrics.observe("zara", {})
+
+    assert metrics.summary() == {
+        "zara": {"pages": 2, "avg_kb": 3.0, "avg_requests": 15.0, "avg_load_ms": 1000.0}
+    }
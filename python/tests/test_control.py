@@ -0,0 +1,113 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from fiyat_takip.control import ControlServer
+
+
+@pytest.fixture
+def server():
+    control = ControlServer(port=0, token="gizli", reply_timeout=5)
+    control.start()
+    yield control
+    control.shutdown()
+
+
+def request(server, method, path, body=None, token="gizli"):
+    host, port = server.address
+    data = body if isinstance(body, bytes) else None
+    if body is not None and data is None:
+        data = json.dumps(body).encode("utf-8")
+    req = urllib.request.Request(
+        f"http://{host}:{port}{path}", data=data, method=method
+    )
+    if token:
+        req.add_header("X-Control-Token", token)
+    try:
+        with urllib.request.urlopen(req, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def answer_commands(server, count):
+    """Monitör döngüsünün yerine komutları çekip yanıtlar"""
+    received = []
+
+    def run():
+        while len(received) < count:
+            command = server.commands.get(timeout=5)
+            received.append((command.name, command.payload))
+            command.respond(200, {"status": "ok", "command": command.name})
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return received, thread
+
+
+def test_commands_are_queued_for_the_loop(server):
+    received, thread = answer_commands(server, 2)
+
+    assert request(
+        server, "POST", "/products", {"url": "https://zara.com/p1", "store": "zara"}
+    ) == (
+        200,
+        {"status": "ok", "command": "add"},
+    )
+    assert request(server, "POST", "/pause/")[0] == 200
+    thread.join(5)
+
+    assert received == [
+        ("add", {"url": "https://zara.com/p1", "store": "zara"}),
+        ("pause", {}),
+    ]
+
+
+def test_read_only_routes_skip_the_queue(server):
+    server.add_route("GET", "/health", lambda: (200, {"status": "ok", "products": 3}))
+
+    assert request(server, "GET", "/health") == (200, {"status": "ok", "products": 3})
+    assert server.commands.empty()
+
+
+def test_public_routes_skip_the_token(server):
+    server.add_route("GET", "/metrics", lambda: (200, {"metrics": []}), public=True)
+    server.add_route("GET", "/health", lambda: (200, {"status": "ok"}))
+
+    assert request(server, "GET", "/metrics", token=None) == (200, {"metrics": []})
+    assert request(server, "GET", "/health", token=None)[0] == 401
+
+
+def test_token_is_required(server):
+    assert request(server, "GET", "/products", token=None)[0] == 401
+    assert request(server, "GET", "/products", token="yanlis")[0] == 401
+    assert server.commands.empty()
+
+
+def test_unknown_route_and_invalid_json(server):
+    assert request(server, "POST", "/restart")[0] == 404
+    status, body = request(server, "POST", "/products", b"{bozuk")
+    assert status == 400
+    assert body["message"] == "Geçersiz JSON"
+
+
+@pytest.mark.parametrize("body", [[1, 2], "ürün", 42, None])
+def test_payload_must_be_an_object(server, body):
+    status, _ = request(server, "POST", "/products", json.dumps(body).encode("utf-8"))
+
+    assert status == 400
+    assert server.commands.empty()
+
+
+def test_unanswered_command_times_out():
+    control = ControlServer(port=0, reply_timeout=0.1)
+    control.start()
+    try:
+        status, body = request(control, "POST", "/check", {}, token=None)
+    finally:
+        control.shutdown()
+
+    assert status == 504
@@ -0,0 +1,72 @@
+import pytest
+
+from fiyat_takip import dom
+from fiyat_takip.dom import Document, cascade, parse_selector
+from fiyat_takip.stores import StoreRegistry
+
+PAGE = """<html><body>
+<ul id="sizes"><li class="size out">XS<li class="size">S<li class="size">M</ul>
+<div class="price" data-qa="product">
+  <span data-qa-qualifier="price-amount-old"><span class="money-amount__main">1.499,95 TL</span></span>
+  <span data-qa-qualifier="price-amount-current">
+    <span class="money-amount__main"> 1.299,95
+      TL</span>
+  </span>
+</div>
+<p class="note">Son <script>var price = "1 TL";</script>fiyat<style>.note { }</style><!-- 2 TL --></p>
+<script>var price = "1 TL";</script>
+</body></html>"""
+
+
+@pytest.fixture(params=["stdlib", "lxml"])
+def backend(request, monkeypatch):
+    if request.param == "lxml":
+        if dom.BeautifulSoup is None:
+            pytest.skip("bs4 ve lxml kurulu değil")
+    else:
+        monkeypatch.setattr(dom, "BeautifulSoup", None)
+    return request.param
+
+
+@pytest.mark.parametrize(
+    "selector, expected",
+    [
+        ("#sizes > li.size", "XS"),
+        ("li.size.out", "XS"),
+        ("ul > li", "XS"),
+        (
+            '[data-qa-qualifier="price-amount-current"] .money-amount__main',
+            "1.299,95 TL",
+        ),
+        ("span[data-qa-qualifier^='price-amount-o'] span", "1.499,95 TL"),
+        ("div[data-qa] > span > span", "1.499,95 TL"),
+        ("section .price, div.price", "1.499,95 TL 1.299,95 TL"),
+        # innerText gibi betik, stil ve yorum metni katılmaz
+        ("p.note", "Son fiyat"),
+        (".missing", None),
+    ],
+)
+def test_select_text(backend, selector, expected):
+    assert Document(PAGE).text(selector) == expected
+
+
+def test_unsupported_selector_raises():
+    with pytest.raises(ValueError):
+        parse_selector("li:nth-child(2)")
+    with pytest.raises(ValueError):
+        parse_selector("a,,b")
+
+
+def test_cascade_follows_rule_order(backend):
+    zara = StoreRegistry().get("zara")
+
+    sale = zara.price_info(cascade(PAGE, zara.rules))
+    assert sale["rule"] == "sale"
+    assert (sale["current_price"], sale["old_price"]) == (1299.95, 1499.95)
+
+    regular = PAGE.replace("price-amount-current", "price-amount-none")
+    info = zara.price_info(cascade(regular, zara.rules))
+    assert info["rule"] == "list"
+    assert info["current_price"] == 1499.95
+
+    assert cascade("<html></html>", zara.rules) == {"rule": None}
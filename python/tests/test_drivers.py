@@ -0,0 +1,106 @@
+import json
+import os
+
+import pytest
+
+from fiyat_takip import drivers
+from fiyat_takip.drivers import DriverLifecycle, process_tree_rss
+
+
+@pytest.fixture
+def driver_binary(tmp_path):
+    path = tmp_path / "chromedriver"
+    path.write_text("#!/bin/sh\n")
+    path.chmod(0o755)
+    return str(path)
+
+
+def test_driver_path_is_cached_between_runs(tmp_path, driver_binary):
+    cache_file = str(tmp_path / "cache" / "driver.json")
+    first = DriverLifecycle({"driver_path": driver_binary, "cache_file": cache_file})
+    first._store_path(driver_binary)
+
+    lifecycle = DriverLifecycle({"cache_file": cache_file})
+
+    assert lifecycle.driver_path() == driver_binary
+    assert json.load(open(cache_file)) == {"driver_path": driver_binary}
+
+
+def test_invalidate_drops_cached_path(tmp_path, driver_binary):
+    cache_file = tmp_path / "driver.json"
+    cache_file.write_text(json.dumps({"driver_path": driver_binary}))
+    lifecycle = DriverLifecycle({"cache_file": str(cache_file)})
+    lifecycle.driver_path()
+
+    lifecycle.invalidate()
+
+    assert lifecycle.resolved_path is None
+    assert not cache_file.exists()
+
+
+def test_stale_cache_entry_is_ignored(tmp_path):
+    cache_file = tmp_path / "driver.json"
+    cache_file.write_text(json.dumps({"driver_path": str(tmp_path / "silinmiş")}))
+
+    assert DriverLifecycle({"cache_file": str(cache_file)})._cached_path() is None
+
+
+def test_recycle_thresholds():
+    lifecycle = DriverLifecycle({"max_page_loads": 100, "max_rss_mb": 1000})
+
+    assert lifecycle.should_recycle(10, 200) is None
+    assert lifecycle.should_recycle(100, 200) == "100 sayfa yüklendi"
+    assert lifecycle.should_recycle(10, 1200) == "bellek 1200 MB"
+
+
+def test_report_accumulates_restarts():
+    lifecycle = DriverLifecycle()
+    lifecycle.report("worker-0", rss_mb=300.0, page_loads=5)
+    lifecycle.report("worker-0", restarts=1, page_loads=0)
+    lifecycle.report("worker-0", restarts=1, crashes=1)
+
+    assert lifecycle.summary() == {
+        "worker-0": {"rss_mb": 300.0, "page_loads": 0, "restarts": 2, "crashes": 1}
+    }
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="/proc yok")
+def test_proc_rss_of_current_process(monkeypatch):
+    monkeypatch.setattr(drivers, "psutil", None)
+
+    assert process_tree_rss(os.getpid()) > 0
+
+
+def test_driver_without_service_reports_zero():
+    assert DriverLifecycle().driver_rss(object()) == 0.0
+
+
+class FakeDriver:
+    def __init__(self, pid):
+        self.service = type(
+            "Service", (), {"process": type("Process", (), {"pid": pid})()}
+        )()
+
+
+def test_rss_is_sampled_at_most_every_interval(monkeypatch):
+    calls = []
+
+    def fake_rss(pid):
+        calls.append(pid)
+        return 100 * 1024 * 1024 * len(calls)
+
+    now = [0.0]
+    monkeypatch.setattr(drivers, "process_tree_rss", fake_rss)
+    monkeypatch.setattr(drivers.time, "monotonic", lambda: now[0])
+    lifecycle = DriverLifecycle({"rss_interval": 30})
+    driver = FakeDriver(4321)
+
+    assert lifecycle.driver_rss(driver) == 100.0
+    now[0] = 29.0
+    assert lifecycle.driver_rss(driver) == 100.0
+    assert calls == [4321]
+
+    now[0] = 30.0
+    assert lifecycle.driver_rss(driver) == 200.0
+    assert lifecycle.driver_rss(FakeDriver(99)) == 300.0
+    assert calls == [4321, 4321, 99]
@@ -0,0 +1,131 @@
+import pytest
+
+from fiyat_takip.fanout import PriceTrack, WatchIndex, group_key, normalize_url
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        (
+            "HTTPS://WWW.Zara.com/tr/ceket-p1.html?v1=2&utm_source=x#reviews",
+            "https://www.zara.com/tr/ceket-p1.html?v1=2",
+        ),
+        (
+            "https://www.zara.com/tr/ceket-p1.html/?b=2&a=1&gclid=abc&fbclid=1",
+            "https://www.zara.com/tr/ceket-p1.html?a=1&b=2",
+        ),
+        ("https://www.zara.com", "https://www.zara.com/"),
+        ("  https://x.com/a?empty=&ref=mail  ", "https://x.com/a?empty="),
+        # Yol büyük/küçük harfe duyarlıdır
+        ("https://x.com/Tr/A", "https://x.com/Tr/A"),
+    ],
+)
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+def test_group_key_ignores_store_case_and_tracking():
+    assert group_key("https://x.com/a?utm_medium=1", "Zara") == group_key(
+        "https://x.com/a", "zara"
+    )
+
+
+def watcher(id, target, url="https://x.com/a", variant=None, interval=None):
+    return {
+        "id": id,
+        "url": url,
+        "store": "zara",
+        "target_price": target,
+        "variant": variant,
+        "check_interval": interval,
+    }
+
+
+@pytest.fixture
+def track():
+    track = PriceTrack()
+    for id, target in ((1, 100.0), (2, 150.0), (3, 150.0), (4, 200.0)):
+        track.add(watcher(id, target))
+    return track
+
+
+@pytest.mark.parametrize(
+    "last, current, expected",
+    [
+        (250.0, 180.0, [4]),
+        (250.0, 150.0, [2, 3, 4]),
+        (200.0, 150.0, [2, 3]),
+        (150.0, 100.0, [1]),
+        # Hedefin tam üstünden inmeyen fiyat tetiklemez
+        (150.0, 149.0, []),
+        (120.0, 130.0, []),
+        (250.0, 50.0, [1, 2, 3, 4]),
+    ],
+)
+def test_crossed(track, last, current, expected):
+    assert [w["id"] for w in track.crossed(last, current)] == expected
+
+
+def test_set_target_moves_watcher(track):
+    track.set_target(track.watchers[1], "175")
+
+    assert track.watchers[1]["target_price"] == 175.0
+    assert [w["id"] for w in track.crossed(180.0, 170.0)] == [1]
+    assert [w["id"] for w in track.crossed(120.0, 90.0)] == []
+
+
+def test_invalid_target_keeps_watcher(track):
+    with pytest.raises(ValueError):
+        track.set_target(track.watchers[1], "ucuz")
+
+    assert track.watchers[1]["target_price"] == 100.0
+    assert [w["id"] for w in track.crossed(120.0, 90.0)] == [1]
+
+
+def test_remove_and_nearest(track):
+    track.remove(track.watchers[4])
+
+    assert len(track) == 3
+    assert track.crossed(250.0, 180.0) == []
+    assert track.nearest(180.0)["target_price"] == 150.0
+
+
+def test_index_groups_same_page():
+    index = WatchIndex()
+    first = watcher(1, 100.0, url="https://x.com/a?utm_source=x")
+    second = watcher(2, 80.0, url="HTTPS://X.COM/a/", interval=600)
+    third = watcher(3, 90.0, url="https://x.com/b", interval=300)
+
+    assert index.add(first) is not None
+    assert index.add(second) is None
+    assert index.add(third) is not None
+    assert len(index) == 2
+
+    group = index.group_of(first)
+    assert group is index.group_of(second)
+    assert len(group) == 2
+    assert group.interval() == 600
+
+
+def test_index_splits_variants_into_tracks():
+    index = WatchIndex()
+    index.add(watcher(1, 100.0))
+    index.add(watcher(2, 100.0, variant={"color": "Siyah", "size": "M"}))
+    group = next(iter(index))
+
+    assert len(group.tracks) == 2
+    assert group.track_of(watcher(2, 0, variant={"color": "Siyah", "size": "M"}))
+
+
+def test_index_remove_returns_empty_group():
+    index = WatchIndex()
+    first = watcher(1, 100.0)
+    second = watcher(2, 90.0)
+    index.add(first)
+    index.add(second)
+
+    assert index.remove(first) is None
+    removed = index.remove(second)
+    assert removed is not None
+    assert removed.key == first["group"]
+    assert len(index) == 0
@@ -0,0 +1,199 @@
+import json
+
+import pytest
+
+from servers import FixtureServer, format_price
+
+from fiyat_takip.fastpath import HttpPriceFetcher, extract_price
+from fiyat_takip.guard import BlockedError, StoreUnavailableError
+from fiyat_takip.stores import StoreRegistry
+
+JSON_LD_PAGE = """<html><head><title>Ceket</title>
+<script type="application/ld+json">%s</script>
+</head><body><h1>Ceket</h1></body></html>"""
+
+META_PAGE = """<html><head>
+<meta property="product:price:amount" content="%s">
+<meta property="product:price:currency" content="TRY">
+</head><body></body></html>"""
+
+ZARA_PAGE = """<div class="product-detail-info">
+<span data-qa-qualifier="price-amount-old"><span class="money-amount__main">1.599,95 TL</span></span>
+<span data-qa-qualifier="price-amount-current"><span class="money-amount__main">1.299,95 TL</span></span>
+</div>"""
+
+
+STORES = StoreRegistry()
+
+
+def test_zara_markup_reads_current_and_old():
+    info = extract_price(ZARA_PAGE, STORES.get("zara"))
+
+    assert info["current_price"] == 1299.95
+    assert info["old_price"] == 1599.95
+    assert info["current_price_text"] == "1.299,95 TL"
+
+
+def test_zara_list_price_only_is_current():
+    page = ZARA_PAGE.split("\n")[1]
+
+    info = extract_price(page, STORES.get("zara"))
+
+    assert info["current_price"] == 1599.95
+    assert info["old_price"] is None
+
+
+def test_json_ld_graph_offers():
+    data = {
+        "@context": "https://schema.org",
+        "@graph": [
+            {"@type": "BreadcrumbList"},
+            {"@type": "Product", "offers": [{"price": "749.90"}]},
+        ],
+    }
+
+    info = extract_price(JSON_LD_PAGE % json.dumps(data), STORES.get("pull&bear"))
+
+    assert info["current_price"] == 749.9
+
+
+def test_invalid_json_ld_falls_through_to_meta():
+    page = JSON_LD_PAGE % "{broken" + META_PAGE % "1.099,00"
+
+    info = extract_price(page, STORES.get("pull&bear"))
+
+    assert info["current_price"] == 1099.0
+    assert info["current_price_text"] == "1.099,00"
+
+
+def test_page_without_price():
+    page = "<html><body><h1>Bulunamadı</h1></body></html>"
+
+    assert extract_price(page, STORES.get("zara")) is None
+
+
+@pytest.fixture(scope="module")
+def server():
+    fixtures = FixtureServer().start()
+    yield fixtures
+    fixtures.shutdown()
+
+
+@pytest.fixture
+def fetcher():
+    pytest.importorskip("urllib3")
+    # Yapısal veri sayfaları yerleşik olmayan, hızlı yolu açık bir mağazaya ait
+    stores = StoreRegistry(
+        {
+            "plain": {
+                "fast_path": True,
+                "rules": [{"current": ".price"}],
+            },
+        }
+    )
+    fetcher = HttpPriceFetcher(stores=stores, timeout=5)
+    yield fetcher
+    fetcher.http.clear()
+
+
+def test_fixture_prices_use_store_format():
+    assert format_price(1299.95) == "1.299,95"
+    assert format_price(399) == "399,00"
+
+
+def test_zara_sale_price(server, fetcher):
+    server.set_price("zara", "sale", 1299.95, old=1599.95)
+
+    info = fetcher.fetch_price(server.url_for("zara", "sale"), "zara")
+
+    assert info["current_price"] == 1299.95
+    assert info["old_price"] == 1599.95
+    assert fetcher.summary()["zara"]["hits"] == 1
+
+
+def test_pull_and_bear_price(server, fetcher):
+    server.set_price("pull&bear", "tee", 399.99)
+
+    info = fetcher.fetch_price(server.url_for("pull&bear", "tee"), "pull&bear")
+
+    assert info["current_price"] == 399.99
+    assert info["old_price"] is None
+
+
+def test_not_found_falls_back(server, fetcher):
+    assert fetcher.fetch_price(server.url_for("zara", "missing"), "zara") is None
+    assert fetcher.summary()["zara"] == {"hits": 0, "fallbacks": 1, "blocked": 0}
+
+
+def test_follows_redirect_chain(server, fetcher):
+    server.set_price("zara", "moved", 849.5)
+    target = server.url_for("zara", "moved")
+    server.set_redirect("/r/1", "/r/2", status=301)
+    server.set_redirect("/r/2", "/r/3")
+    server.set_redirect("/r/3", target, status=307)
+
+    info = fetcher.fetch_price(f"{server.base_url}/r/1", "zara")
+
+    assert info["current_price"] == 849.5
+
+
+def test_redirect_loop_falls_back(server, fetcher):
+    server.set_redirect("/loop/a", "/loop/b")
+    server.set_redirect("/loop/b", "/loop/a")
+
+    assert fetcher.fetch_price(f"{server.base_url}/loop/a", "zara") is None
+    assert fetcher.summary()["zara"]["fallbacks"] == 1
+
+
+def test_json_ld_offer_price(server, fetcher):
+    data = {
+        "@context": "https://schema.org",
+        "@type": "Product",
+        "name": "Ceket",
+        "offers": {"@type": "Offer", "price": "1299.95", "priceCurrency": "TRY"},
+    }
+    server.set_page("/plain/ld.html", JSON_LD_PAGE % json.dumps(data))
+
+    info = fetcher.fetch_price(f"{server.base_url}/plain/ld.html", "plain")
+
+    assert info["current_price"] == 1299.95
+    assert info["current_price_text"] == "1299.95"
+
+
+def test_block_page_raises(server, fetcher):
+    server.set_page(
+        "/plain/blocked.html",
+        "<html><head><title>Just a moment...</title></head><body></body></html>",
+    )
+
+    with pytest.raises(BlockedError):
+        fetcher.fetch_price(f"{server.base_url}/plain/blocked.html", "plain")
+    assert fetcher.summary()["plain"]["blocked"] == 1
+
+
+def test_server_error_raises_store_unavailable(fetcher, monkeypatch):
+    response = type("Response", (), {"status": 502, "data": b""})()
+    monkeypatch.setattr(fetcher.http, "request", lambda *args, **kwargs: response)
+
+    with pytest.raises(StoreUnavailableError):
+        fetcher.fetch_price("https://www.zara.com/tr/tr/ceket-p1.html", "zara")
+    assert "zara" not in fetcher.summary()
+
+
+def test_meta_price(server, fetcher):
+    server.set_page("/plain/meta.html", META_PAGE % "1.299")
+
+    info = fetcher.fetch_price(f"{server.base_url}/plain/meta.html", "plain")
+
+    # tr mağazasında nokta binlik ayırıcıdır
+    assert info["current_price"] == 1299.0
+
+
+def test_store_without_fast_path_is_not_supported():
+    pytest.importorskip("urllib3")
+    stores = StoreRegistry({"bershka": {"rules": [{"current": ".price"}]}})
+    fetcher = HttpPriceFetcher(stores=stores)
+
+    assert fetcher.supports("zara")
+    assert not fetcher.supports("bershka")
+    assert not fetcher.supports("unknown")
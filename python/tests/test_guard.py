@@ -0,0 +1,161 @@
+import pytest
+
+from fiyat_takip import guard
+from fiyat_takip.guard import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    BlockedError,
+    CircuitBreaker,
+    StoreGuard,
+    StoreUnavailableError,
+    detect_block,
+    is_store_failure,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+    # Beklemeler tam süre olsun
+    monkeypatch.setattr(guard, "_jittered", lambda seconds: seconds)
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(
+        failure_threshold=3, backoff=5, cooldown=100, probe_timeout=30, clock=clock
+    )
+
+
+def test_backoff_doubles_until_threshold(breaker, clock):
+    assert breaker.check() == 0
+    assert not breaker.failure("HTTP 500")
+    assert breaker.check() == 5
+    assert not breaker.failure("HTTP 500")
+    assert breaker.check() == 10
+    assert breaker.failure("HTTP 500")
+    assert breaker.state == OPEN
+    assert breaker.check() == 100
+
+
+def test_block_opens_immediately(breaker):
+    assert breaker.failure("Engellendi", blocked=True)
+    assert breaker.state == OPEN
+
+
+def test_half_open_allows_single_probe(breaker, clock):
+    breaker.failure(blocked=True)
+    clock.advance(100)
+
+    assert breaker.check("a") == 0
+    assert breaker.state == HALF_OPEN
+    assert breaker.check("b") == breaker.probe_wait
+
+    breaker.success()
+    assert breaker.state == CLOSED
+    assert breaker.check("b") == 0
+
+
+def test_failed_probe_doubles_cooldown(breaker, clock):
+    breaker.failure(blocked=True)
+    clock.advance(100)
+    breaker.check("a")
+
+    assert breaker.failure("HTTP 503")
+    assert breaker.state == OPEN
+    assert breaker.check() == 200
+
+
+def test_probe_released_by_key(breaker, clock):
+    breaker.failure(blocked=True)
+    clock.advance(100)
+    breaker.check("a")
+
+    breaker.release("other")
+    assert breaker.check("b") == breaker.probe_wait
+    breaker.release("a")
+    assert breaker.check("b") == 0
+
+
+def test_stuck_probe_expires(breaker, clock):
+    breaker.failure(blocked=True)
+    clock.advance(100)
+    breaker.check("a")
+
+    clock.advance(29)
+    assert breaker.check("b") == breaker.probe_wait
+    clock.advance(1)
+    assert breaker.check("b") == 0
+    assert breaker.probe == "b"
+
+
+def test_store_failures_are_classified():
+    assert is_store_failure(BlockedError("zara", "HTTP 403"))
+    assert is_store_failure(StoreUnavailableError("zara", "HTTP 502"))
+    # Kuyruk işçilerinden metin olarak gelen hatalar
+    assert is_store_failure(str(BlockedError("zara", "HTTP 429")))
+    assert is_store_failure(str(StoreUnavailableError("zara", "zaman aşımı")))
+    assert not is_store_failure(ValueError("HTTP 404"))
+    assert not is_store_failure("Fiyat bulunamadı")
+    assert not is_store_failure(None)
+
+
+def test_page_failures_do_not_open_circuit():
+    store_guard = StoreGuard({"default": {"failure_threshold": 2}})
+    for _ in range(5):
+        assert store_guard.acquire("zara") == 0
+        store_guard.record("zara", False, ValueError("Fiyat bulunamadı"))
+        store_guard.stores["zara"]["breaker"].retry_at = 0.0
+
+    summary = store_guard.summary()["zara"]
+    assert summary["state"] == CLOSED
+    assert summary["failures"] == 0
+    assert summary["page_failures"] == 5
+
+
+def test_block_opens_store_only():
+    store_guard = StoreGuard()
+    store_guard.acquire("zara")
+    store_guard.acquire("pull&bear")
+
+    store_guard.record("pull&bear", False, BlockedError("pull&bear", "HTTP 403"))
+    store_guard.record("zara", True)
+
+    assert store_guard.acquire("pull&bear") > 0
+    assert store_guard.acquire("zara") == 0
+    summary = store_guard.summary()
+    assert summary["pull&bear"]["state"] == OPEN
+    assert summary["pull&bear"]["blocked"] == 1
+    assert summary["pull&bear"]["deferred"] == 1
+    assert summary["zara"]["state"] == CLOSED
+
+
+def test_page_failure_releases_probe(clock):
+    store_guard = StoreGuard()
+    store_guard.record("zara", False, BlockedError("zara", "HTTP 403"))
+    breaker = store_guard.stores["zara"]["breaker"]
+    breaker.clock = clock
+    breaker.retry_at = clock.now
+
+    assert store_guard.acquire("zara", "a") == 0
+    assert store_guard.acquire("zara", "b") > 0
+    store_guard.record("zara", False, "Fiyat bulunamadı", key="a")
+
+    assert breaker.state == HALF_OPEN
+    assert store_guard.acquire("zara", "b") == 0
+
+
+def test_rate_limit(monkeypatch):
+    store_guard = StoreGuard({"zara": {"rate_per_minute": 60, "burst": 2}})
+
+    assert store_guard.acquire("zara") == 0
+    assert store_guard.acquire("zara") == 0
+    assert store_guard.acquire("zara") > 0
+    assert store_guard.acquire("pull&bear") == 0
+
+
+def test_detect_block():
+    assert detect_block(status=429) == "HTTP 429"
+    assert detect_block("<title>Access Denied</title>").startswith("doğrulama")
+    assert detect_block('<div class="g-recaptcha"></div>').startswith("bot")
+    assert detect_block("<title>Ceket</title><p>1.299,95 TL</p>") is None
@@ -0,0 +1,122 @@
+import sqlite3
+
+import pytest
+
+from fiyat_takip.history import (
+    SCHEMA,
+    SECONDS_PER_DAY,
+    HistoryStore,
+    ensure_price_levels,
+    product_key,
+)
+
+ZARA = {"url": "https://www.zara.com/tr/tr/ceket-p1.html", "store": "zara"}
+PB = {"url": "https://www.pullandbear.com/tr/tisort-l2.html", "store": "pull&bear"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    history = HistoryStore(
+        str(tmp_path / "data" / "history.sqlite3"), flush_interval=0.05
+    )
+    yield history
+    history.close()
+
+
+def test_close_flushes_pending_rows(store):
+    store.record(ZARA, {"current_price": 1299.95, "old_price": 1599.95}, checked_at=10)
+    store.record(ZARA, {"current_price": 1199.95}, checked_at=20)
+    store.record(PB, error=ValueError("fiyat yok"), checked_at=15)
+    store.close()
+
+    assert store.written == 3
+    assert store.history(ZARA["url"], "zara") == [
+        (10, 1299.95, 1599.95, 1, None),
+        (20, 1199.95, None, 1, None),
+    ]
+    assert store.history(PB["url"], "pull&bear") == [(15, None, None, 0, "fiyat yok")]
+
+
+def test_state_keeps_latest_successful_check(store):
+    store.record(ZARA, {"current_price": 999.0}, checked_at=30)
+    store.record(ZARA, {"current_price": 1099.0}, checked_at=20)
+    store.record(ZARA, error="zaman aşımı", checked_at=40)
+    store.close()
+
+    state = store.load_state()
+
+    assert state == {product_key(ZARA["url"], "zara"): (999.0, 30)}
+
+
+def test_history_since_and_limit(store):
+    for t in range(10):
+        store.record(ZARA, {"current_price": 100.0 + t}, checked_at=t)
+    store.close()
+
+    rows = store.history(ZARA["url"], "zara", since=5, limit=3)
+
+    assert [row[0] for row in rows] == [5, 6, 7]
+
+
+def test_batches_are_written_in_background(tmp_path):
+    history = HistoryStore(str(tmp_path / "h.sqlite3"), batch_size=2, flush_interval=60)
+    try:
+        history.record(ZARA, {"current_price": 10.0}, checked_at=1)
+        history.record(ZARA, {"current_price": 11.0}, checked_at=2)
+        for _ in range(100):
+            if history.written == 2:
+                break
+            history.thread.join(0.02)
+        assert history.written == 2
+    finally:
+        history.close()
+
+
+def levels(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(
+            "SELECT day, price, old_price, count, first_at, last_at FROM price_levels ORDER BY day, price"
+        ).fetchall()
+
+
+def test_price_levels_count_observations_per_day(tmp_path):
+    path = str(tmp_path / "h.sqlite3")
+    history = HistoryStore(path)
+    day = SECONDS_PER_DAY * 20000
+    history.record(ZARA, {"current_price": 1299.95}, checked_at=day + 10)
+    history.record(ZARA, {"current_price": 1299.95}, checked_at=day + 20)
+    history.record(
+        ZARA, {"current_price": 999.95, "old_price": 1299.95}, checked_at=day + 30
+    )
+    history.record(ZARA, error="zaman aşımı", checked_at=day + 40)
+    history.record(ZARA, {"current_price": 1299.95}, checked_at=day + SECONDS_PER_DAY)
+    history.close()
+
+    assert levels(path) == [
+        (20000, 999.95, 1299.95, 1, day + 30, day + 30),
+        (20000, 1299.95, 0.0, 2, day + 10, day + 20),
+        (20001, 1299.95, 0.0, 1, day + SECONDS_PER_DAY, day + SECONDS_PER_DAY),
+    ]
+
+
+def test_existing_database_is_backfilled_once(tmp_path):
+    path = str(tmp_path / "eski.sqlite3")
+    # price_levels tablosu eklenmeden önce oluşturulmuş veritabanı
+    with sqlite3.connect(path) as conn:
+        conn.executescript(SCHEMA)
+        conn.executemany(
+            "INSERT INTO observations (product_key, url, store, price, old_price, checked_at, ok, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                ("zara:u", "u", "zara", 100.0, None, 10, 1, None),
+                ("zara:u", "u", "zara", 100.0, None, 20, 1, None),
+                ("zara:u", "u", "zara", None, None, 30, 0, "hata"),
+            ],
+        )
+
+    HistoryStore(path).close()
+    assert levels(path) == [(0, 100.0, 0.0, 2, 10, 20)]
+
+    with sqlite3.connect(path) as conn:
+        assert ensure_price_levels(conn) == 0
+    assert levels(path) == [(0, 100.0, 0.0, 2, 10, 20)]
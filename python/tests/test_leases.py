@@ -0,0 +1,165 @@
+import sqlite3
+
+import pytest
+
+from fiyat_takip import leases
+from fiyat_takip.leases import LeasePool, LeaseQueue
+
+
+class WallClock:
+    """leases modülünün time.time() çağrıları için elle ilerletilen saat"""
+
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def wall(monkeypatch):
+    wall = WallClock()
+    monkeypatch.setattr(leases.time, "time", wall.time)
+    return wall
+
+
+@pytest.fixture
+def queue(tmp_path, wall):
+    queue = LeaseQueue(str(tmp_path / "queue.db"), lease_seconds=60, max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def item(key, **options):
+    return {"key": key, "url": f"https://example.com/{key}", "store": "zara", **options}
+
+
+def test_enqueue_is_idempotent(queue):
+    assert queue.enqueue(item("a"))
+    assert not queue.enqueue(item("a"))
+    assert queue.depth() == 1
+
+
+def test_lease_is_exclusive_until_expiry(queue, wall):
+    queue.enqueue(item("a"))
+    queue.enqueue(item("b"))
+
+    first = queue.lease("w1", 1)
+    second = queue.lease("w2", 5)
+
+    assert [task["key"] for task in first] == ["a"]
+    assert [task["key"] for task in second] == ["b"]
+    assert queue.lease("w3", 5) == []
+
+    # Kirası dolan görev başka işçiye geçer
+    wall.advance(61)
+    assert sorted(task["key"] for task in queue.lease("w3", 5)) == ["a", "b"]
+
+
+def test_heartbeat_extends_lease(queue, wall):
+    queue.enqueue(item("a"))
+    queue.lease("w1", 1)
+
+    wall.advance(50)
+    queue.heartbeat("w1")
+    wall.advance(50)
+
+    assert queue.lease("w2", 1) == []
+
+
+def test_complete_after_expiry_is_discarded(queue, wall):
+    queue.enqueue(item("a"))
+    task = queue.lease("w1", 1)[0]
+    wall.advance(61)
+    queue.lease("w2", 1)
+
+    assert not queue.complete("w1", task, {"current_price": 1.0}, None, 1.0, wall.now)
+    assert queue.complete("w2", task, {"current_price": 2.0}, None, 1.0, wall.now)
+
+    results = queue.collect()
+    assert len(results) == 1
+    assert results[0]["owner"] == "w2"
+    assert results[0]["price_info"] == {"current_price": 2.0}
+    assert queue.depth() == 0
+
+
+def test_release_requeues_without_counting_attempt(queue):
+    queue.enqueue(item("a"))
+    queue.lease("w1", 1)
+    queue.release("w1")
+
+    # max_attempts=2: bırakılan kira deneme sayılmaz
+    assert len(queue.lease("w2", 1)) == 1
+    queue.release("w2")
+    assert len(queue.lease("w3", 1)) == 1
+
+
+def test_abandoned_after_max_attempts(queue, wall):
+    queue.enqueue(item("a"))
+    queue.lease("w1", 1)
+    wall.advance(61)
+    queue.lease("w2", 1)
+    wall.advance(61)
+
+    assert queue.lease("w3", 1) == []
+    results = queue.collect()
+    assert len(results) == 1
+    assert results[0]["price_info"] is None
+    assert "2 denemede" in results[0]["error"]
+    assert queue.depth() == 0
+
+
+def test_listing_options_survive_lease(queue):
+    queue.enqueue(item("list", max_pages=3, max_scrolls=0, page_param="sayfa"))
+
+    (task,) = queue.lease("w1", 1)
+
+    assert task == item("list", max_pages=3, max_scrolls=0, page_param="sayfa")
+
+
+def test_queue_file_without_options_is_upgraded(tmp_path, wall):
+    path = str(tmp_path / "eski.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE check_tasks (key TEXT PRIMARY KEY, url TEXT NOT NULL, "
+            "store TEXT NOT NULL, enqueued_at REAL NOT NULL, lease_owner TEXT, "
+            "lease_expires REAL, attempts INTEGER NOT NULL DEFAULT 0)"
+        )
+        conn.execute(
+            "INSERT INTO check_tasks (key, url, store, enqueued_at) VALUES (?, ?, ?, ?)",
+            ("a", "https://example.com/a", "zara", 1.0),
+        )
+
+    queue = LeaseQueue(path)
+    try:
+        queue.enqueue(item("b", max_pages=2))
+        tasks = queue.lease("w1", 5)
+    finally:
+        queue.close()
+
+    assert tasks == [item("a"), item("b", max_pages=2)]
+
+
+def test_cancel_removes_task(queue):
+    queue.enqueue(item("a"))
+    queue.cancel("a")
+
+    assert queue.lease("w1", 1) == []
+    assert queue.depth() == 0
+
+
+def test_lease_pool_returns_worker_results(queue, wall):
+    pool = LeasePool(queue, poll_interval=0.01)
+    pool.submit(item("a"))
+    task = queue.lease("w1", 1)[0]
+    queue.complete("w1", task, {"current_price": 1299.95}, None, 2.5, wall.now)
+
+    result = pool.get_result(timeout=1)
+
+    assert result.item == {"key": "a", "url": "https://example.com/a", "store": "zara"}
+    assert result.value == {"current_price": 1299.95}
+    assert (result.error, result.duration, result.worker) == (None, 2.5, "w1")
+    assert pool.get_result(timeout=0.05) is None
@@ -0,0 +1,159 @@
+import json
+
+import pytest
+
+from fiyat_takip.listings import (
+    Listing,
+    harvest_tiles,
+    is_listing,
+    listing_page_url,
+    product_id,
+    store_of,
+    tiles_from_html,
+)
+from fiyat_takip.stores import StoreRegistry
+
+STORES = StoreRegistry()
+
+ZARA_TILE = """<li class="product-grid-product" data-productid="1">
+<a href="/tr/tr/ceket-p0478604{n}.html?v1=1">Ceket</a>
+<span data-qa-qualifier="price-amount-old"><span class="money-amount__main">{old} TL</span></span>
+<span data-qa-qualifier="price-amount-current"><span class="money-amount__main">{current} TL</span></span>
+</li>"""
+
+
+@pytest.mark.parametrize(
+    "url, store, expected",
+    [
+        ("https://www.zara.com/tr/tr/ceket-p04786041.html?v1=2", "zara", "04786041"),
+        ("https://www.pullandbear.com/tr/tisort-l03240520", "pull&bear", "03240520"),
+        (
+            "https://www.pullandbear.com/tr/tisort-l03240520.html/",
+            "pull&bear",
+            "03240520",
+        ),
+        ("https://www.zara.com/tr/tr/kadin-ceketler-l1114.html", "zara", None),
+        (None, "zara", None),
+    ],
+)
+def test_product_id(url, store, expected):
+    assert product_id(url, store) == expected
+
+
+def test_store_of():
+    assert store_of("https://www.zara.com/tr/") == "zara"
+    assert store_of("https://www.pullandbear.com/tr/") == "pull&bear"
+    assert store_of("https://example.com/") is None
+
+
+def test_listing_page_url():
+    url = "https://www.zara.com/tr/tr/kadin-l1114.html?v1=5&page=3"
+
+    assert listing_page_url(url, 1) == url
+    assert (
+        listing_page_url(url, 2)
+        == "https://www.zara.com/tr/tr/kadin-l1114.html?v1=5&page=2"
+    )
+    assert listing_page_url(url, 4, "sayfa").endswith("page=3&sayfa=4")
+
+
+def test_tiles_from_server_markup():
+    html = (
+        "<ul>"
+        + ZARA_TILE.format(n=1, old="1.599,95", current="1.299,95")
+        + ZARA_TILE.format(n=2, old="899,95", current="749,95")
+        + "</ul>"
+    )
+
+    tiles = tiles_from_html(
+        html, STORES.get("zara"), "https://www.zara.com/tr/tr/kadin-l1114.html"
+    )
+
+    assert tiles[0] == {
+        "href": "https://www.zara.com/tr/tr/ceket-p04786041.html?v1=1",
+        "current": "1.299,95 TL",
+        "old": "1.599,95 TL",
+    }
+    assert tiles[1]["current"] == "749,95 TL"
+
+
+def test_tiles_from_json_ld_item_list():
+    data = {
+        "@type": "ItemList",
+        "itemListElement": [
+            {
+                "@type": "ListItem",
+                "item": {"url": "/tr/tisort-l03240520", "offers": {"price": "399.99"}},
+            },
+            {
+                "@type": "ListItem",
+                "item": {"url": "/tr/etek-l03240521", "offers": [{"lowPrice": 549}]},
+            },
+            {"@type": "ListItem", "item": {"url": "/tr/fiyatsiz-l03240522"}},
+        ],
+    }
+    html = f'<script type="application/ld+json">{json.dumps(data)}</script>'
+
+    tiles = tiles_from_html(
+        html, STORES.get("pull&bear"), "https://www.pullandbear.com/tr/kadin-n6417"
+    )
+
+    assert [(tile["href"], tile["current"]) for tile in tiles] == [
+        ("https://www.pullandbear.com/tr/tisort-l03240520", 399.99),
+        ("https://www.pullandbear.com/tr/etek-l03240521", 549.0),
+    ]
+
+
+def test_harvest_tiles_matches_products_once():
+    tiles = [
+        {
+            "href": "https://www.zara.com/tr/tr/ceket-p04786041.html",
+            "current": "1.299,95 TL",
+            "old": "1.599,95 TL",
+        },
+        {
+            "href": "https://www.zara.com/tr/tr/ceket-p04786041.html?v1=2",
+            "current": "9,99 TL",
+            "old": None,
+        },
+        {
+            "href": "https://www.zara.com/tr/tr/etek-p04786042.html",
+            "current": None,
+            "old": "899,95 TL",
+        },
+        {
+            "href": "https://www.zara.com/tr/tr/yok-p04786043.html",
+            "current": "fiyat yok",
+            "old": None,
+        },
+        {
+            "href": "https://www.zara.com/tr/tr/kadin-l1114.html",
+            "current": "1 TL",
+            "old": None,
+        },
+    ]
+
+    prices = harvest_tiles(tiles, STORES.get("zara"))
+
+    assert set(prices) == {"04786041", "04786042"}
+    assert prices["04786041"]["current_price"] == 1299.95
+    assert prices["04786041"]["old_price"] == 1599.95
+    # Yalnızca liste fiyatı olan kartta o fiyat güncel fiyattır
+    assert prices["04786042"]["current_price"] == 899.95
+    assert prices["04786042"]["old_price"] is None
+
+
+def test_listing_page_record():
+    listing = Listing(
+        "https://www.zara.com/tr/tr/kadin-l1114.html?utm_source=x", max_pages="2"
+    )
+
+    assert listing.store == "zara"
+    assert listing.key == "listing:zara:https://www.zara.com/tr/tr/kadin-l1114.html"
+    assert listing.page["kind"] == "listing"
+    assert listing.page["max_pages"] == 2
+    assert is_listing({"key": listing.key})
+    assert not is_listing({"key": "zara:https://www.zara.com/tr/tr/ceket-p1.html"})
+
+    with pytest.raises(ValueError):
+        Listing("https://example.com/liste")
@@ -0,0 +1,121 @@
+import gzip
+import json
+import logging
+
+import pytest
+
+from fiyat_takip.logs import (
+    CompressingRotatingFileHandler,
+    JsonFormatter,
+    TailIndex,
+    read_tail,
+    setup_logging,
+)
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = str(tmp_path / "tracker.log")
+    handler = CompressingRotatingFileHandler(path, 10_000, 2, index_capacity=8)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger(f"price_tracker.test.{tmp_path.name}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    yield path, logger, handler
+    logger.removeHandler(handler)
+    handler.close()
+
+
+def test_read_tail_returns_last_records(log):
+    path, logger, _ = log
+    for i in range(20):
+        logger.info(f"kayıt {i}")
+
+    assert read_tail(path, 3) == ["kayıt 17", "kayıt 18", "kayıt 19"]
+    # İndeks kapasitesinden (8) fazlası istenirse kapasite kadar döner
+    assert read_tail(path, 50) == [f"kayıt {i}" for i in range(12, 20)]
+
+
+def test_read_tail_without_index(tmp_path):
+    assert read_tail(str(tmp_path / "yok.log")) == []
+
+
+def test_rollover_compresses_and_resets_index(log):
+    path, logger, handler = log
+    for i in range(400):
+        logger.info(f"kayıt {i:04d} " + "x" * 40)
+
+    with gzip.open(f"{path}.1.gz", "rt", encoding="utf-8") as f:
+        assert f.readline().startswith("kayıt")
+    assert read_tail(path, 2) == [
+        f"kayıt 0398 {'x' * 40}",
+        f"kayıt 0399 {'x' * 40}",
+    ]
+    assert handler.index.count <= 400
+
+
+def test_tail_index_persists_and_wraps(tmp_path):
+    path = str(tmp_path / "x.idx")
+    index = TailIndex(path, capacity=4)
+    for offset in range(0, 60, 10):
+        index.append(offset)
+    index.close()
+
+    reopened = TailIndex(path, capacity=4)
+    assert reopened.count == 6
+    reopened.close()
+
+    # Kapasite değişirse indeks sıfırlanır
+    resized = TailIndex(path, capacity=5)
+    assert resized.count == 0
+    resized.close()
+
+
+def test_json_formatter_writes_one_object_per_record():
+    record = logging.LogRecord(
+        "price_tracker.fastpath",
+        logging.WARNING,
+        __file__,
+        1,
+        "fiyat %s",
+        ("yok",),
+        None,
+    )
+
+    data = json.loads(JsonFormatter().format(record))
+
+    assert data["level"] == "WARNING"
+    assert data["logger"] == "price_tracker.fastpath"
+    assert data["msg"] == "fiyat yok"
+
+
+@pytest.fixture
+def restore_logging():
+    root = logging.getLogger("")
+    handlers, level = list(root.handlers), root.level
+    yield
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_unknown_level_falls_back_to_info(tmp_path, restore_logging):
+    path = str(tmp_path / "tracker.log")
+
+    setup_logging(
+        path,
+        console=False,
+        levels={
+            "price_tracker.test.known": "debug",
+            "price_tracker.test.typo": "verbos",
+        },
+    )
+
+    assert logging.getLogger("price_tracker.test.known").level == logging.DEBUG
+    assert logging.getLogger("price_tracker.test.typo").level == logging.INFO
+    with open(path, encoding="utf-8") as f:
+        assert "price_tracker.test.typo=VERBOS" in f.read()
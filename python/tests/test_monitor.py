@@ -0,0 +1,286 @@
+import pytest
+
+from fiyat_takip.control import ControlCommand
+from fiyat_takip.monitor import PriceMonitor
+from fiyat_takip.pool import CheckResult
+
+JACKET = "https://www.zara.com/tr/tr/ceket-p04786041.html"
+
+
+class StubNotifier:
+    def __init__(self):
+        self.messages = []
+
+    def send(self, subject, body):
+        self.messages.append((subject, body))
+
+
+@pytest.fixture
+def monitor():
+    monitor = PriceMonitor(http_first=False)
+    monitor.notifier = StubNotifier()
+    return monitor
+
+
+def add(monitor, target, url=JACKET, **extra):
+    return monitor.add_product_entry(
+        {"url": url, "store": "zara", "target_price": target, **extra}
+    )
+
+
+def check(monitor, product, current, old=None, variants=None):
+    group = monitor.watch.group_of(product)
+    value = {"current_price": current, "old_price": old}
+    if variants is not None:
+        value["variants"] = variants
+    monitor.process_result(CheckResult(group.page, value, None, 1.0, "worker-0", 0.0))
+
+
+def subjects(monitor):
+    return [subject for subject, _ in monitor.notifier.messages]
+
+
+def test_watchers_of_one_page_share_a_check(monitor):
+    first = add(monitor, 1000)
+    add(monitor, 900, url=JACKET + "?utm_source=mail")
+    add(monitor, 500, url="https://www.zara.com/tr/tr/etek-p04786042.html")
+    monitor.schedule_products(monitor.products, 300)
+
+    assert len(monitor.products) == 3
+    assert len(monitor.watch) == 2
+    assert len(monitor.scheduler) == 2
+    assert monitor.watch.group_of(first).page["url"] == JACKET
+
+
+def test_target_crossing_notifies_each_watcher(monitor):
+    first = add(monitor, 1000)
+    add(monitor, 900)
+
+    check(monitor, first, 1299.95)
+    assert subjects(monitor) == []
+
+    check(monitor, first, 950.0)
+    assert subjects(monitor) == ["Hedef Fiyata Ulaşıldı! - Fiyat Uyarısı"]
+
+    check(monitor, first, 850.0)
+    assert len(monitor.notifier.messages) == 2
+    assert "Hedef Fiyat: 900.0 TL" in monitor.notifier.messages[-1][1]
+
+
+def test_drop_without_crossing_sends_one_drop_alert(monitor):
+    first = add(monitor, 500)
+    add(monitor, 400)
+
+    check(monitor, first, 1299.95)
+    check(monitor, first, 1199.95)
+
+    assert subjects(monitor) == ["Fiyat Düştü! - İndirim Alarmı"]
+    assert "Önceki Fiyat: 1299.95 TL" in monitor.notifier.messages[0][1]
+
+
+def test_existing_discount_is_reported_once(monitor):
+    product = add(monitor, 500)
+
+    check(monitor, product, 1299.95, old=1599.95)
+    check(monitor, product, 1299.95, old=1599.95)
+
+    assert subjects(monitor) == ["Fiyat Düştü! - İndirim Alarmı"]
+
+
+def test_variant_watchers_follow_their_own_price(monitor):
+    black = add(monitor, 1000, color="Siyah", size="M")
+    add(monitor, 1000, color="Bej", size="M")
+
+    def variants(black_price, beige_available):
+        return [
+            {
+                "color": "Siyah",
+                "size": "M",
+                "current_price": black_price,
+                "old_price": None,
+                "available": True,
+            },
+            {
+                "color": "Bej",
+                "size": "M",
+                "current_price": 900.0,
+                "old_price": None,
+                "available": beige_available,
+            },
+        ]
+
+    check(monitor, black, 1299.95, variants=variants(1299.95, False))
+    check(monitor, black, 1299.95, variants=variants(950.0, False))
+
+    assert len(monitor.notifier.messages) == 1
+    assert "Renk: Siyah, Beden: M" in monitor.notifier.messages[0][1]
+
+
+def command(monitor, name, payload=None):
+    request = ControlCommand(name, payload or {})
+    monitor.handle_command(request)
+    return request.reply.get_nowait()
+
+
+def test_control_commands_edit_the_product_list(monitor):
+    status, body = command(
+        monitor, "add", {"url": JACKET, "store": "zara", "targetPrice": "999"}
+    )
+    assert status == 201
+    assert body["product"]["target_price"] == 999.0
+    assert len(monitor.scheduler) == 1
+
+    status, body = command(
+        monitor, "update", {"url": JACKET + "#yorumlar", "target_price": 850}
+    )
+    assert status == 200
+    assert body["products"][0]["target_price"] == 850.0
+
+    assert command(monitor, "pause")[1]["paused"] is True
+    assert command(monitor, "health")[1]["products"] == 1
+
+    assert command(monitor, "remove", {"url": JACKET})[1]["removed"] == 1
+    assert len(monitor.scheduler) == 0
+    assert command(monitor, "update", {"url": JACKET, "target_price": 1})[0] == 404
+
+
+def test_sync_keeps_existing_products(monitor):
+    kept = add(monitor, 1000)
+    add(monitor, 500, url="https://www.zara.com/tr/tr/etek-p04786042.html")
+
+    status, body = command(
+        monitor,
+        "sync",
+        {
+            "products": [
+                {"url": JACKET, "store": "zara", "target_price": 950},
+                {"url": JACKET, "store": "zara", "target_price": 700, "size": "M"},
+            ]
+        },
+    )
+
+    assert status == 200
+    assert (body["added"], body["removed"], body["pages"]) == (1, 1, 1)
+    assert kept in monitor.products
+    assert kept["target_price"] == 950.0
+
+
+@pytest.mark.parametrize(
+    "name, payload",
+    [
+        ("remove", {}),
+        ("add", {"url": JACKET, "store": "zara", "target_price": "ucuz"}),
+        (
+            "add",
+            {"url": JACKET, "store": "zara", "target_price": 1, "check_interval": "5"},
+        ),
+        ("update", {"url": JACKET, "check_interval": 0}),
+        ("update", {"url": ["liste"], "target_price": 1}),
+        ("sync", {"products": "hepsi"}),
+        ("check", [JACKET]),
+    ],
+)
+def test_invalid_command_payload_is_rejected(monitor, name, payload):
+    product = add(monitor, 1000)
+
+    status, body = command(monitor, name, payload)
+
+    assert status == 400
+    assert body["status"] == "error"
+    assert monitor.products == [product]
+    assert product["target_price"] == 1000.0
+
+
+def test_sync_rejects_the_whole_list_on_one_bad_entry(monitor):
+    product = add(monitor, 1000)
+
+    status, _ = command(
+        monitor,
+        "sync",
+        {
+            "products": [
+                {
+                    "url": "https://www.zara.com/tr/tr/etek-p04786042.html",
+                    "store": "zara",
+                    "target_price": 500,
+                },
+                {
+                    "url": JACKET,
+                    "store": "zara",
+                    "target_price": None,
+                    "check_interval": -1,
+                },
+            ]
+        },
+    )
+
+    assert status == 400
+    assert monitor.products == [product]
+
+
+def test_command_errors_do_not_stop_the_loop(monitor, monkeypatch):
+    def broken(payload):
+        raise RuntimeError("beklenmeyen")
+
+    monkeypatch.setattr(monitor, "command_list", broken)
+
+    status, body = command(monitor, "list")
+
+    assert status == 500
+    assert "beklenmeyen" in body["message"]
+    assert command(monitor, "health")[0] == 200
+
+
+def test_adaptive_interval_survives_target_edits():
+    monitor = PriceMonitor(
+        http_first=False,
+        adaptive_settings={
+            "enabled": True,
+            "min_interval": 60,
+            "max_interval": 1200,
+            "backoff": 2,
+        },
+    )
+    monitor.notifier = StubNotifier()
+    product = add(monitor, 500, check_interval=300)
+    monitor.schedule_products(monitor.products, 300)
+    key = monitor.watch.group_of(product).key
+
+    def interval():
+        return monitor.scheduler.entries[key]["interval"]
+
+    check(monitor, product, 1299.95)
+    check(monitor, product, 1299.95)
+    assert interval() == 1200
+
+    command(monitor, "update", {"url": JACKET, "target_price": 450})
+    command(
+        monitor,
+        "add",
+        {"url": JACKET, "store": "zara", "target_price": 400, "check_interval": 600},
+    )
+    assert interval() == 1200
+
+    command(monitor, "update", {"url": JACKET, "check_interval": 120})
+    assert interval() == 120
+    assert key not in monitor.adaptive.pages
+
+
+def test_gauges_refresh_without_status_file(monitor, monkeypatch):
+    assert monitor.status is None
+    now = [100.0]
+    monkeypatch.setattr("fiyat_takip.monitor.time.monotonic", lambda: now[0])
+    add(monitor, 1000)
+
+    monitor.refresh_gauges()
+    assert monitor.metrics.value("products") == 1
+
+    add(monitor, 500, url="https://www.zara.com/tr/tr/etek-p1.html")
+    now[0] += 1
+    monitor.refresh_gauges()
+    assert monitor.metrics.value("products") == 1
+
+    now[0] += monitor.gauge_interval
+    monitor.refresh_gauges()
+    assert monitor.metrics.value("products") == 2
+    assert monitor.metrics.value("pages") == 2
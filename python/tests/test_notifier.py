@@ -0,0 +1,140 @@
+import smtplib
+
+import pytest
+
+from fiyat_takip import notifier
+from fiyat_takip.notifier import Notifier
+
+
+class StubSMTP:
+    """smtplib.SMTP yerine geçen, gönderilenleri kaydeden sahte bağlantı"""
+
+    instances = []
+    failures = []
+    attempts = 0
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.quit_called = False
+        self.closed = False
+        StubSMTP.instances.append(self)
+
+    def login(self, user, password):
+        pass
+
+    def noop(self):
+        return (250, b"OK")
+
+    def send_message(self, msg):
+        StubSMTP.attempts += 1
+        if StubSMTP.failures:
+            raise StubSMTP.failures.pop(0)
+        self.sent.append(msg)
+
+    def quit(self):
+        self.quit_called = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def stub_smtp(monkeypatch):
+    StubSMTP.instances = []
+    StubSMTP.failures = []
+    StubSMTP.attempts = 0
+    monkeypatch.setattr(notifier.smtplib, "SMTP", StubSMTP)
+    return StubSMTP
+
+
+def make_notifier(**kwargs):
+    return Notifier(
+        "takip@example.com",
+        "secret",
+        host="localhost",
+        port=25,
+        use_ssl=False,
+        **kwargs,
+    )
+
+
+def sent_subjects():
+    return [msg["Subject"] for smtp in StubSMTP.instances for msg in smtp.sent]
+
+
+def test_connection_is_reused_and_closed(stub_smtp):
+    sender = make_notifier()
+    sender.send("Fiyat düştü: ceket", "1.299,95 TL")
+    sender.send("Fiyat düştü: tişört", "399,99 TL")
+    sender.close()
+
+    assert sent_subjects() == ["Fiyat düştü: ceket", "Fiyat düştü: tişört"]
+    assert len(stub_smtp.instances) == 1
+    assert stub_smtp.instances[0].quit_called
+    assert (sender.sent, sender.failed) == (2, 0)
+
+
+def test_reconnects_once_after_disconnect(stub_smtp):
+    stub_smtp.failures = [smtplib.SMTPServerDisconnected("bağlantı kapandı")]
+    sender = make_notifier()
+    sender.send("Fiyat düştü", "gövde")
+    sender.close()
+
+    assert len(stub_smtp.instances) == 2
+    assert sent_subjects() == ["Fiyat düştü"]
+    assert (sender.sent, sender.failed) == (1, 0)
+
+
+def test_gives_up_after_second_disconnect(stub_smtp):
+    stub_smtp.failures = [ConnectionResetError("reset"), ConnectionResetError("reset")]
+    sender = make_notifier()
+    sender.send("Fiyat düştü", "gövde")
+    sender.close()
+
+    assert sent_subjects() == []
+    assert (sender.sent, sender.failed) == (0, 1)
+
+
+def test_refused_recipient_is_not_resent(stub_smtp):
+    # SMTPException OSError'ın alt sınıfıdır; bağlantı kopması sayılmamalı
+    stub_smtp.failures = [
+        smtplib.SMTPRecipientsRefused({"takip@example.com": (550, b"yok")})
+    ]
+    sender = make_notifier()
+    sender.send("Fiyat düştü", "gövde")
+    sender.close()
+
+    assert stub_smtp.attempts == 1
+    assert len(stub_smtp.instances) == 1
+    assert stub_smtp.instances[0].quit_called
+    assert (sender.sent, sender.failed) == (0, 1)
+
+
+def test_digest_combines_queued_alerts(stub_smtp):
+    sender = make_notifier(digest=True, digest_window=60)
+    for name in ("ceket", "tişört", "pantolon"):
+        sender.send(f"Fiyat düştü: {name}", f"{name} ucuzladı")
+    sender.close()
+
+    assert sent_subjects() == ["Fiyat Uyarıları (3 ürün)"]
+    body = stub_smtp.instances[0].sent[0].get_payload(decode=True).decode()
+    assert "pantolon ucuzladı" in body
+
+
+def test_delivers_through_local_smtp_sink():
+    from servers import SmtpSink
+
+    sink = SmtpSink().start()
+    try:
+        host, port = sink.address
+        sender = Notifier(
+            "takip@example.com", None, host=host, port=port, use_ssl=False
+        )
+        for i in range(3):
+            sender.send(f"Fiyat düştü {i}", "gövde")
+        sender.close()
+    finally:
+        sink.shutdown()
+
+    assert (sender.sent, sender.failed) == (3, 0)
+    assert sink.count == 3
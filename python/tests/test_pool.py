@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from fiyat_takip.pool import WorkerPool
+
+
+class EchoWorker:
+    """Ürünü iki katına çıkaran, 'fail' gelince hata veren sahte tarayıcı işçisi"""
+
+    closed = []
+
+    def __init__(self, name):
+        self.name = name
+
+    def check(self, item):
+        if item == "fail":
+            raise ValueError("fiyat bulunamadı")
+        return item * 2
+
+    def close(self):
+        EchoWorker.closed.append(self.name)
+
+
+@pytest.fixture
+def pool():
+    EchoWorker.closed = []
+    pool = WorkerPool(EchoWorker, size=3)
+    pool.start()
+    yield pool
+    pool.shutdown(timeout=5)
+
+
+def test_run_pass_collects_every_result(pool):
+    results = []
+
+    stats = pool.run_pass(range(20), on_result=results.append)
+
+    assert sorted(result.value for result in results) == [i * 2 for i in range(20)]
+    assert stats["products"] == 20
+    assert stats["workers"] == 3
+    assert sum(stats["per_worker"].values()) == 20
+
+
+def test_check_errors_are_returned(pool):
+    pool.submit("fail")
+
+    result = pool.get_result(timeout=5)
+
+    assert result.value is None
+    assert isinstance(result.error, ValueError)
+    assert result.worker.startswith("worker-")
+
+
+def test_shutdown_closes_workers(pool):
+    pool.shutdown(timeout=5)
+
+    assert sorted(EchoWorker.closed) == ["worker-0", "worker-1", "worker-2"]
+    assert pool.alive == 0
+
+
+def test_failed_workers_do_not_block_start():
+    lock = threading.Lock()
+    created = []
+
+    def factory(name):
+        with lock:
+            created.append(name)
+            if len(created) > 1:
+                raise RuntimeError("Chrome başlatılamadı")
+        return EchoWorker(name)
+
+    pool = WorkerPool(factory, size=3)
+    pool.start()
+    try:
+        assert pool.alive == 1
+        assert pool.run_pass([1, 2])["products"] == 2
+    finally:
+        pool.shutdown(timeout=5)
+
+
+def test_start_fails_without_workers():
+    def factory(name):
+        raise RuntimeError("Chrome yok")
+
+    pool = WorkerPool(factory, size=2)
+    with pytest.raises(RuntimeError):
+        pool.start()
+    with pytest.raises(RuntimeError):
+        pool.submit(1)
@@ -0,0 +1,113 @@
+import pytest
+
+from fiyat_takip.scheduler import Scheduler
+
+
+@pytest.fixture
+def scheduler(clock):
+    return Scheduler(default_interval=60, jitter=0, clock=clock)
+
+
+def test_pop_due_in_due_order(scheduler, clock):
+    scheduler.add("b", delay=20)
+    scheduler.add("a", delay=10)
+    scheduler.add("c", delay=30)
+
+    assert scheduler.pop_due() == []
+    assert scheduler.time_until_next() == 10
+
+    clock.advance(25)
+    assert scheduler.pop_due() == ["a", "b"]
+    assert scheduler.time_until_next() == 5
+
+
+def test_complete_reschedules_with_own_interval(scheduler, clock):
+    scheduler.add("fast", interval=30)
+    scheduler.add("default")
+    assert sorted(scheduler.pop_due()) == ["default", "fast"]
+
+    scheduler.complete("fast")
+    scheduler.complete("default")
+
+    clock.advance(30)
+    assert scheduler.pop_due() == ["fast"]
+    clock.advance(30)
+    assert scheduler.pop_due() == ["default"]
+
+
+def test_in_flight_is_not_popped_again(scheduler, clock):
+    scheduler.add("a")
+    assert scheduler.pop_due() == ["a"]
+
+    # Çalışırken yeniden planlama yok sayılır
+    scheduler.reschedule("a")
+    clock.advance(1000)
+    assert scheduler.pop_due() == []
+    assert scheduler.time_until_next() is None
+
+
+def test_remove_discards_heap_entry(scheduler, clock):
+    scheduler.add("a", delay=5)
+    scheduler.add("b", delay=10)
+    scheduler.remove("a")
+
+    assert "a" not in scheduler
+    assert len(scheduler) == 1
+    clock.advance(10)
+    assert scheduler.pop_due() == ["b"]
+
+    # Çalışırken kaldırılan ürün tamamlanınca yeniden planlanmaz
+    scheduler.remove("b")
+    scheduler.complete("b")
+    assert scheduler.time_until_next() is None
+
+
+def test_reschedule_and_defer(scheduler, clock):
+    scheduler.add("a", delay=100)
+    scheduler.reschedule("a", delay=5)
+    clock.advance(5)
+    assert scheduler.pop_due() == ["a"]
+
+    scheduler.defer("a", 20)
+    clock.advance(19)
+    assert scheduler.pop_due() == []
+    clock.advance(1)
+    assert scheduler.pop_due() == ["a"]
+
+
+def test_set_interval_applies_on_next_completion(scheduler, clock):
+    scheduler.add("a")
+    scheduler.pop_due()
+    scheduler.set_interval("a", 600)
+    scheduler.complete("a")
+
+    assert scheduler.time_until_next() == 600
+
+
+def test_jitter_stays_within_bounds(clock):
+    scheduler = Scheduler(default_interval=100, jitter=0.1, clock=clock)
+    for i in range(200):
+        scheduler.add(i)
+    scheduler.pop_due()
+    for i in range(200):
+        scheduler.complete(i)
+
+    dues = [entry["due"] - clock.now for entry in scheduler.entries.values()]
+    assert min(dues) >= 90
+    assert max(dues) <= 110
+    assert len(set(dues)) > 1
+
+
+def test_lag_summary(scheduler, clock):
+    scheduler.add("a")
+    scheduler.add("b")
+    due = clock.now
+    scheduler.pop_due()
+
+    scheduler.complete("a", started=due + 2)
+    scheduler.complete("b", started=due + 4)
+
+    lag = scheduler.lag_summary()
+    assert lag["count"] == 2
+    assert lag["avg"] == 3
+    assert lag["max"] == 4
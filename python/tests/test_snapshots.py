@@ -0,0 +1,163 @@
+import hashlib
+import os
+import threading
+
+import pytest
+
+from fiyat_takip.snapshots import SnapshotStore, load_snapshot, object_path, reextract
+
+ZARA = "https://www.zara.com/tr/tr/ceket-p04786041.html"
+PB = "https://www.pullandbear.com/tr/tisort-l03240520"
+
+
+def zara_page(price):
+    return (
+        '<span data-qa-qualifier="price-amount-current">'
+        f'<span class="money-amount__main">{price} TL</span></span>'
+    )
+
+
+def pb_page(price):
+    return f'<span class="price-current-price">{price} TL</span>'
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / "snapshots")
+
+
+def test_identical_pages_are_stored_once(directory):
+    store = SnapshotStore(directory)
+    store.record(ZARA, "zara", zara_page("1.299,95"), {"current_price": 1299.95})
+    store.record(ZARA, "zara", zara_page("1.299,95"), {"current_price": 1299.95})
+    store.record(
+        ZARA, "zara", zara_page("999,95"), {"current_price": 999.95}, source="browser"
+    )
+    store.close()
+
+    summary = store.summary()
+    assert (summary["written"], summary["deduplicated"], summary["objects"]) == (
+        3,
+        1,
+        2,
+    )
+    objects = [
+        name
+        for _, _, names in os.walk(os.path.join(directory, "objects"))
+        for name in names
+    ]
+    assert len(objects) == 2
+    assert all(name.endswith(".html.gz") for name in objects)
+
+
+def test_failures_only_skips_successful_checks(directory):
+    store = SnapshotStore(directory, failures_only=True)
+    store.record(ZARA, "zara", zara_page("1.299,95"), {"current_price": 1299.95})
+    store.record(ZARA, "zara", "<html>doğrulama</html>")
+    store.record(ZARA, "zara", "")
+    store.close()
+
+    assert store.summary()["written"] == 1
+
+
+def test_full_backlog_drops_snapshots(directory):
+    store = SnapshotStore(directory, backlog=1)
+    # Yazıcı diske takılmış gibi bekletilir; kontroller yine de beklememeli
+    release = threading.Event()
+    store._store = lambda conn, item: release.wait(5)
+    for price in ("1", "2", "3"):
+        store.record(ZARA, "zara", zara_page(price))
+    release.set()
+    store.close()
+
+    assert store.summary()["dropped"] >= 1
+
+
+def test_oldest_snapshots_are_evicted(directory):
+    store = SnapshotStore(directory, max_bytes=1)
+    store.record(ZARA, "zara", zara_page("1.299,95"))
+    store.record(ZARA, "zara", zara_page("999,95") + "x" * 5000)
+    store.close()
+
+    summary = store.summary()
+    assert summary["evicted"] == 2
+    assert summary["objects"] == 0
+    assert summary["bytes"] == 0
+
+
+def test_reextract_compares_with_recorded_prices(directory):
+    store = SnapshotStore(directory)
+    store.record(ZARA, "zara", zara_page("1.299,95"), {"current_price": 1299.95})
+    store.record(ZARA, "zara", zara_page("999,95"), {"current_price": 1099.95})
+    store.record(PB, "pull&bear", "<html>fiyat yok</html>", {"current_price": 399.99})
+    store.record(PB, "pull&bear", pb_page("349,99"))
+    store.close()
+
+    report = reextract(directory, workers=1, batch_size=2)
+
+    assert report["snapshots"] == 4
+    assert report["unique_pages"] == 4
+    assert report["stores"]["zara"]["same"] == 1
+    assert report["stores"]["zara"]["changed"] == 1
+    assert report["stores"]["pull&bear"]["lost"] == 1
+    assert report["stores"]["pull&bear"]["gained"] == 1
+    assert {m["recorded"] for m in report["mismatches"]} == {1099.95, 399.99}
+
+    only_zara = reextract(directory, store="Zara", workers=1)
+    assert set(only_zara["stores"]) == {"zara"}
+
+
+def test_reextract_reports_missing_objects(directory):
+    store = SnapshotStore(directory)
+    store.record(ZARA, "zara", zara_page("1.299,95"), {"current_price": 1299.95})
+    store.close()
+    for root, _, names in os.walk(os.path.join(directory, "objects")):
+        for name in names:
+            os.remove(os.path.join(root, name))
+
+    report = reextract(directory, workers=1)
+
+    assert report["stores"]["zara"]["unreadable"] == 1
+
+
+def test_reextract_requires_an_index(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        reextract(str(tmp_path / "yok"))
+
+
+def test_object_round_trip(directory):
+    store = SnapshotStore(directory)
+    store.record(ZARA, "zara", "<html>ürün</html>")
+    store.close()
+
+    digest = hashlib.sha256("<html>ürün</html>".encode("utf-8")).hexdigest()
+    assert load_snapshot(object_path(directory, digest)) == "<html>ürün</html>"
+
+
+def test_reextract_reports_matched_rules(directory):
+    store = SnapshotStore(directory)
+    # İndirimsiz sayfada yalnızca liste fiyatı vardır
+    regular = zara_page("999,95").replace("price-amount-current", "price-amount-old")
+    store.record(ZARA, "zara", zara_page("1.299,95"), {"current_price": 1299.95})
+    store.record(ZARA, "zara", regular, {"current_price": 1099.95})
+    store.close()
+
+    report = reextract(directory, workers=1)
+
+    assert report["stores"]["zara"]["rules"] == {"sale": 1, "list": 1}
+    assert report["mismatches"][0]["rule"] == "list"
+
+
+def test_reextract_uses_configured_store_rules(directory):
+    store = SnapshotStore(directory)
+    store.record(ZARA, "bershka", '<b class="fiyat">1.199,95 TL</b>')
+    store.close()
+
+    report = reextract(
+        directory,
+        workers=1,
+        store_settings={"bershka": {"rules": [{"name": "b", "current": ".fiyat"}]}},
+    )
+
+    assert report["stores"]["bershka"]["gained"] == 1
+    assert report["stores"]["bershka"]["rules"] == {"b": 1}
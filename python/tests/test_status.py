@@ -0,0 +1,68 @@
+import json
+
+from fiyat_takip.status import Metrics, StatusWriter, write_json_atomic
+
+
+def test_render_counters_gauges_and_histograms():
+    metrics = Metrics()
+    metrics.inc("checks_total", help="Toplam kontrol", store="zara", result="ok")
+    metrics.inc("checks_total", store="zara", result="ok")
+    metrics.set("products", 12, help="Takip edilen ürün")
+    metrics.observe(
+        "check_seconds", 1.5, help="Kontrol süresi", buckets=(1, 2), store="zara"
+    )
+
+    text = metrics.render()
+
+    assert "# TYPE fiyat_takip_checks_total counter" in text
+    assert 'fiyat_takip_checks_total{result="ok",store="zara"} 2' in text
+    assert "# TYPE fiyat_takip_products gauge" in text
+    assert "fiyat_takip_products 12" in text
+    assert "# TYPE fiyat_takip_check_seconds histogram" in text
+    assert 'fiyat_takip_check_seconds_bucket{le="1",store="zara"} 0' in text
+    assert 'fiyat_takip_check_seconds_bucket{le="2",store="zara"} 1' in text
+    assert 'fiyat_takip_check_seconds_bucket{le="+Inf",store="zara"} 1' in text
+    assert 'fiyat_takip_check_seconds_sum{store="zara"} 1.5' in text
+
+
+def test_label_values_are_escaped():
+    metrics = Metrics()
+    metrics.set("last_price", 1, product='ceket "siyah" \\ yeni')
+
+    assert 'product="ceket \\"siyah\\" \\\\ yeni"' in metrics.render()
+
+
+def test_value_reads_counters_and_gauges():
+    metrics = Metrics()
+    metrics.inc("errors_total", 3, store="zara")
+    metrics.set("paused", 0)
+
+    assert metrics.value("errors_total", store="zara") == 3
+    assert metrics.value("paused") == 0
+    assert metrics.value("errors_total", store="pull&bear") is None
+
+
+def test_write_json_atomic(tmp_path):
+    path = tmp_path / "run" / "status.json"
+
+    write_json_atomic(str(path), {"ürün": "ceket", "fiyat": 1299.95})
+
+    assert json.loads(path.read_text()) == {"ürün": "ceket", "fiyat": 1299.95}
+    assert [p.name for p in path.parent.iterdir()] == ["status.json"]
+
+
+def test_status_writer_throttles(tmp_path):
+    path = tmp_path / "status.json"
+    writer = StatusWriter(str(path), interval=60)
+    builds = []
+
+    def build():
+        builds.append(len(builds))
+        return {"build": len(builds)}
+
+    assert writer.maybe_write(build)
+    assert not writer.maybe_write(build)
+    assert writer.maybe_write(build, force=True)
+
+    assert builds == [0, 1]
+    assert json.loads(path.read_text()) == {"build": 2}
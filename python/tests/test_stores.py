@@ -0,0 +1,103 @@
+import pytest
+
+from fiyat_takip.stores import StoreAdapter, StoreRegistry
+
+RULES = [{"current": ".price"}]
+
+
+@pytest.mark.parametrize(
+    "locale, text, expected",
+    [
+        ("tr", "1.299,95 TL", 1299.95),
+        ("tr", "899 TL", 899.0),
+        ("tr", "12.345.678,90 TL", 12345678.9),
+        ("tr", "₺1.299", 1299.0),
+        ("tr", "1.299,95&nbsp;TL", 1299.95),
+        ("tr-TR", "49,90", 49.9),
+        ("de", "1.299,95 €", 1299.95),
+        ("en", "$1,299.95", 1299.95),
+        ("en_US", "1,299", 1299.0),
+        ("en", "£49.90.", 49.9),
+    ],
+)
+def test_parse(locale, text, expected):
+    assert StoreAdapter("x", RULES, locale=locale).parse(text) == expected
+
+
+def test_parse_numbers_and_errors():
+    adapter = StoreAdapter("x", RULES)
+
+    assert adapter.parse(1299) == 1299.0
+    with pytest.raises(ValueError):
+        adapter.parse("Tükendi")
+
+
+@pytest.mark.parametrize(
+    "locale, value, expected",
+    [
+        ("tr", "1299.95", 1299.95),
+        ("tr", 1299.95, 1299.95),
+        ("tr", "1.299", 1299.0),
+        ("tr", "1.299,95", 1299.95),
+        ("tr", "49.9", 49.9),
+        ("en", "1.299", 1.299),
+        ("en", "1,299.95", 1299.95),
+    ],
+)
+def test_parse_number(locale, value, expected):
+    assert StoreAdapter("x", RULES, locale=locale).parse_number(value) == expected
+
+
+def test_invalid_definitions():
+    with pytest.raises(ValueError):
+        StoreAdapter("x", [])
+    with pytest.raises(ValueError):
+        StoreAdapter("x", [{"old": ".old"}])
+    with pytest.raises(ValueError):
+        StoreAdapter("x", RULES, locale="xx")
+
+
+def test_price_info_names_rule():
+    adapter = StoreAdapter(
+        "x", [{"name": "sale", "current": ".now", "old": ".was"}, {"current": ".p"}]
+    )
+
+    info = adapter.price_info({"rule": 0, "current": "79,90 TL", "old": "99,90 TL"})
+    assert info["rule"] == "sale"
+    assert (info["current_price"], info["old_price"]) == (79.9, 99.9)
+
+    info = adapter.price_info({"rule": 1, "current": "99,90 TL", "old": None})
+    assert info["rule"] == "rule2"
+    assert info["old_price"] is None
+
+    assert adapter.price_info({"rule": None}) is None
+
+
+def test_registry_merges_configuration():
+    registry = StoreRegistry(
+        {
+            "Bershka": {"label": "Bershka", "rules": RULES},
+            "zara": {"fast_path": False},
+        }
+    )
+
+    assert "bershka" in registry
+    assert registry.get("bershka").label == "Bershka"
+    # Kurallar verilmeyen yerleşik mağaza kendi kurallarını korur
+    assert [rule["name"] for rule in registry.get("zara").rules] == ["sale", "list"]
+    assert registry.fast_path_stores() == ["pull&bear"]
+    # PHP'nin boş dizisi
+    assert StoreRegistry([]).names() == ["zara", "pull&bear"]
+
+
+def test_registry_rule_counts():
+    registry = StoreRegistry()
+    registry.record("zara", "sale")
+    registry.record("zara", "list")
+    registry.record("zara", "sale")
+    registry.record("zara", None)
+
+    summary = registry.summary()["zara"]
+    assert summary["checks"] == 4
+    assert summary["misses"] == 1
+    assert summary["rules"]["sale"] == {"hits": 2, "rate": 0.5}
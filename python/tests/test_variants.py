@@ -0,0 +1,164 @@
+import json
+
+import pytest
+
+from fiyat_takip.fastpath import page_sources
+from fiyat_takip.variants import (
+    build_variants,
+    match_variant,
+    variant_key,
+    variant_label,
+    variant_spec,
+)
+from fiyat_takip.stores import StoreRegistry
+
+STORES = StoreRegistry()
+ZARA = STORES.get("zara")
+PULL_AND_BEAR = STORES.get("pull&bear")
+
+PAGE_PRICE = {"current_price": 1299.95, "old_price": None}
+
+ZARA_PAYLOAD = {
+    "product": {
+        "detail": {
+            "colors": [
+                {
+                    "name": "Siyah",
+                    "price": 129995,
+                    "oldPrice": 159995,
+                    "sizes": [
+                        {"name": "S", "availability": "in_stock"},
+                        {"name": "M", "availability": "out_of_stock"},
+                    ],
+                },
+                {
+                    "name": "Bej",
+                    "price": 129995,
+                    "sizes": [
+                        {"name": "S", "price": 119995, "availability": "low_on_stock"}
+                    ],
+                },
+            ]
+        }
+    }
+}
+
+PRODUCT_GROUP = {
+    "@context": "https://schema.org",
+    "@type": "ProductGroup",
+    "offers": {"price": "749.90", "availability": "https://schema.org/InStock"},
+    "hasVariant": [
+        {"@type": "Product", "color": "Mavi", "size": {"name": "38"}},
+        {
+            "@type": "Product",
+            "color": "Mavi",
+            "size": "40",
+            "offers": {"price": 699.9, "availability": "https://schema.org/OutOfStock"},
+        },
+    ],
+}
+
+
+def test_zara_payload_prices_are_in_cents():
+    variants = build_variants({"payload": json.dumps(ZARA_PAYLOAD)}, PAGE_PRICE, ZARA)
+
+    assert [
+        (v["color"], v["size"], v["current_price"], v["old_price"], v["available"])
+        for v in variants
+    ] == [
+        ("Siyah", "S", 1299.95, 1599.95, True),
+        ("Siyah", "M", 1299.95, 1599.95, False),
+        ("Bej", "S", 1199.95, None, True),
+    ]
+
+
+def test_json_ld_variants_inherit_group_offer():
+    variants = build_variants(
+        {"ld": [json.dumps(PRODUCT_GROUP)]}, PAGE_PRICE, PULL_AND_BEAR
+    )
+
+    assert [(v["size"], v["current_price"], v["available"]) for v in variants] == [
+        ("38", 749.9, True),
+        ("40", 699.9, False),
+    ]
+
+
+def test_json_ld_variant_prices_use_store_locale():
+    group = {
+        "@type": "ProductGroup",
+        "hasVariant": [
+            {"color": "Siyah", "size": "S", "offers": {"price": "1.299"}},
+            {"color": "Siyah", "size": "M", "offers": {"price": "1.299,95"}},
+            {"color": "Siyah", "size": "L", "offers": {"price": "1299.95"}},
+        ],
+    }
+
+    variants = build_variants({"ld": [json.dumps(group)]}, PAGE_PRICE, PULL_AND_BEAR)
+
+    # tr mağazasında nokta binlik ayırıcıdır
+    assert [v["current_price"] for v in variants] == [1299.0, 1299.95, 1299.95]
+
+
+def test_size_list_falls_back_to_page_price():
+    sources = {
+        "ld": ["{bozuk"],
+        "color": "Ekru",
+        "sizes": [{"name": "S", "available": True}, {"name": "", "available": True}],
+    }
+
+    assert build_variants(sources, PAGE_PRICE, ZARA) == [
+        {
+            "color": "Ekru",
+            "size": "S",
+            "current_price": 1299.95,
+            "old_price": None,
+            "available": True,
+        }
+    ]
+    assert build_variants({}, PAGE_PRICE, ZARA) == []
+
+
+def test_page_sources_read_server_rendered_sizes():
+    html = """<ul class="size-selector-list">
+        <li class="size-selector-list__item"><span>S</span></li>
+        <li class="size-selector-list__item size-selector-list__item--out-of-stock"><span>M</span></li>
+    </ul>
+    <script>window.zara.viewPayload = {"product": {}};</script>"""
+
+    sources = page_sources(html, "zara")
+
+    assert sources["sizes"] == [
+        {"name": "S", "available": True},
+        {"name": "M", "available": False},
+    ]
+    assert sources["payload"] == '{"product": {}}'
+
+
+@pytest.fixture
+def variants():
+    return build_variants({"payload": json.dumps(ZARA_PAYLOAD)}, PAGE_PRICE, ZARA)
+
+
+def test_match_exact_variant(variants):
+    match = match_variant(variants, {"color": " siyah ", "size": "m"})
+
+    assert match["current_price"] == 1299.95
+    assert match["available"] is False
+
+
+def test_match_colour_uses_cheapest_in_stock_size(variants):
+    assert match_variant(variants, {"color": "Bej"})["current_price"] == 1199.95
+    assert match_variant(variants, {"size": "S"})["color"] == "Bej"
+    assert match_variant(variants, {"color": "Kırmızı"}) is None
+
+
+def test_variant_spec_and_key():
+    entry = {"url": "u", "store": "zara", "color": "Siyah", "size": " "}
+
+    assert variant_spec(entry) == {"color": "Siyah"}
+    assert variant_spec({"variant": {"size": "M"}, "color": "Siyah"}) == {"size": "M"}
+    assert variant_spec({"url": "u"}) is None
+    assert variant_key({"color": "Açık  Mavi", "size": "M"}) == "açık mavi/m"
+    assert variant_key({"size": "M"}) == "*/m"
+    assert variant_key(None) == ""
+    assert variant_label({"color": "Siyah", "size": "M"}) == "Renk: Siyah, Beden: M"
@@ -0,0 +1,86 @@
+from fiyat_takip import waits
+from fiyat_takip.waits import WaitHistogram, wait_for_cascade, wait_for_selectors
+
+
+class StubDriver:
+    """Sıradaki yoklama sonuçlarını döndüren sahte webdriver"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def execute_script(self, script, selectors):
+        self.calls += 1
+        if len(self.results) > 1:
+            return self.results.pop(0)
+        return self.results[0]
+
+
+SELECTORS = {"current": ".price", "original": ".old-price"}
+
+
+def test_wait_returns_as_soon_as_a_selector_matches(monkeypatch):
+    monkeypatch.setattr(waits.time, "sleep", lambda seconds: None)
+    driver = StubDriver(
+        {"ready": "loading", "texts": {"current": None, "original": None}},
+        {"ready": "interactive", "texts": {"current": " 1.299 TL ", "original": ""}},
+    )
+
+    texts, elapsed, matched = wait_for_selectors(driver, SELECTORS, cap=5)
+
+    assert matched
+    assert texts == {"current": "1.299 TL", "original": None}
+    assert driver.calls == 2
+    assert elapsed >= 0
+
+
+def test_wait_gives_up_at_cap():
+    driver = StubDriver({"ready": "complete", "texts": {"current": None}})
+
+    texts, elapsed, matched = wait_for_selectors(driver, SELECTORS, cap=0.05, poll=0.01)
+
+    assert not matched
+    assert texts == {"current": None}
+    assert elapsed >= 0.05
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = WaitHistogram(buckets=(1, 2, 4))
+    for seconds in (0.5, 0.8, 1.5, 3):
+        histogram.observe("trendyol", seconds)
+    histogram.observe("trendyol", 10, matched=False)
+
+    summary = histogram.summary()["trendyol"]
+
+    assert summary["count"] == 5
+    assert summary["timeouts"] == 1
+    assert summary["buckets"] == {"1": 2, "2": 1, "4": 1, "+Inf": 1}
+    assert summary["p50"] == 2
+    assert summary["p95"] == float("inf")
+    assert histogram.quantile("amazon", 0.5) is None
+
+
+def test_cascade_returns_first_matching_rule(monkeypatch):
+    monkeypatch.setattr(waits.time, "sleep", lambda seconds: None)
+    driver = StubDriver(
+        {"ready": "loading", "rule": None},
+        {"ready": "interactive", "rule": 1, "current": "999,95 TL", "old": None},
+    )
+    rules = [{"current": ".sale"}, {"current": ".price"}]
+
+    result, elapsed, matched = wait_for_cascade(driver, rules, cap=5)
+
+    assert matched
+    assert (result["rule"], result["current"]) == (1, "999,95 TL")
+    assert driver.calls == 2
+
+
+def test_cascade_gives_up_at_cap():
+    driver = StubDriver({"ready": "complete", "rule": None})
+
+    result, _, matched = wait_for_cascade(
+        driver, [{"current": ".price"}], cap=0.05, poll=0.01
+    )
+
+    assert not matched
+    assert result["rule"] is None
@@ -31,6 +31,8 @@
     Route::post('/start', [FiyatTakipApiController::class, 'start']);
     Route::post('/stop', [FiyatTakipApiController::class, 'stop']);
     Route::get('/status', [FiyatTakipApiController::class, 'getStatus']);
+    Route::get('/analytics', [FiyatTakipApiController::class, 'analytics']);
+    Route::post('/control/{action}', [FiyatTakipApiController::class, 'control']);
 });
 
 // İletişim Rotaları